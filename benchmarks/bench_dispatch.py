@@ -0,0 +1,114 @@
+"""Szerializáló-választás költsége: a régi részstring-lánc vs. endpoint dict.
+
+A régi ``serialize_by_context`` az útvonalon futtatott ``in`` ellenőrzések
+láncával választott; a költsége attól függött, hányadik feltétel talál. A
+``GameSerializer.serialize_for_endpoint`` egyetlen dict lookup: a mérés
+végpontonként, illetve mesterségesen felduzzasztott (sok útvonalas)
+táblával is mutatja, hogy a költség nem függ az útvonalak számától.
+
+Használat::
+
+    python -m benchmarks.bench_dispatch
+"""
+
+import argparse
+import json
+import time
+
+from my_app.backend.game_serializer import ENDPOINT_SERIALIZERS, GameSerializer
+
+# Regisztrált végpontok + néhány, a client_init nézetet kapó végpont
+ENDPOINTS = sorted(ENDPOINT_SERIALIZERS) + ["initialize_session", "strategy_hint"]
+PATHS = {
+    "force_restart_by_client_id": "/api/force_restart",
+}
+
+
+def legacy_resolve(path):
+    """A korábbi lánc (csak a választás, a nézet hívása nélkül)."""
+    p = path or ""
+    if "recover_game_state" in p:
+        return GameSerializer.serialize_recovery
+    if "split_stand_and_rewards" in p:
+        return GameSerializer.serialize_split_stand_and_rewards
+    if "add_to_players_list_by_stand" in p:
+        return GameSerializer.serialize_add_to_players_list_by_stand
+    if "add_player_from_players" in p:
+        return GameSerializer.serialize_add_player_from_players
+    if "split" in p:
+        return GameSerializer.serialize_split_hand
+    if "ins_request" in p:
+        return GameSerializer.serialize_for_insurance
+    if "double_request" in p:
+        return GameSerializer.serialize_double_state
+    if "rewards" in p:
+        return GameSerializer.serialize_reward_state
+    if "create_deck" in p:
+        return GameSerializer.serialize_create_deck
+    if "start_game" in p:
+        return GameSerializer.serialize_start_game
+    if "clear_game_state" in p:
+        return GameSerializer.serialize_clear_game_state
+    if any(x in p for x in ["hit"]):
+        return GameSerializer.serialize_initial_and_hit_state
+    if any(x in p for x in ["bet", "retake_bet", "restart"]):
+        return GameSerializer.serialize_for_client_bets
+    return GameSerializer.serialize_for_client_init
+
+
+def resolve(table, endpoint):
+    return table.get(endpoint, GameSerializer.serialize_for_client_init)
+
+
+def check():
+    """A dict pontosan a régi lánc választásait adja."""
+    for endpoint in ENDPOINTS:
+        path = PATHS.get(endpoint, f"/api/{endpoint}")
+        if legacy_resolve(path) is not resolve(ENDPOINT_SERIALIZERS, endpoint):
+            raise AssertionError(f"{endpoint}: dispatch differs from the legacy chain")
+
+
+def per_call_ns(fn, arg, number):
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        fn(arg)
+    return (time.perf_counter_ns() - start) / number
+
+
+def best_of(fn, arg, number, repeat):
+    return round(min(per_call_ns(fn, arg, number) for _ in range(repeat)), 1)
+
+
+def run(number=100_000, repeat=5, sizes=(20, 200, 2000)):
+    check()
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        path = PATHS.get(endpoint, f"/api/{endpoint}")
+        endpoints[endpoint] = {
+            "legacy_ns": best_of(legacy_resolve, path, number, repeat),
+            "dict_ns": best_of(
+                lambda name: resolve(ENDPOINT_SERIALIZERS, name), endpoint, number, repeat
+            ),
+        }
+
+    # Felduzzasztott tábla: a lookup ideje nem nő az útvonalak számával
+    scaling = {}
+    for size in sizes:
+        table = dict(ENDPOINT_SERIALIZERS)
+        for i in range(size - len(table)):
+            table[f"synthetic_route_{i}"] = GameSerializer.serialize_for_client_init
+        scaling[size] = best_of(lambda name: resolve(table, name), "hit", number, repeat)
+
+    return {"endpoints": endpoints, "dict_ns_by_route_count": scaling}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.number, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Végpont-szintű terheléses mérés a Flask test clienttel.
+
+Több párhuzamos szimulált játékos (szálanként saját test client és
+session) teljes köröket játszik: session, tét, osztás, hit / double,
+split láncok, kifizetés. Útvonalanként p50 / p95 / p99 késleltetést és
+kérés/másodpercet mér; az eredmény JSON baseline-ként menthető, és egy
+korábbi baseline-nal összevethető.
+
+Használat::
+
+    python -m benchmarks.bench_endpoints --users 8 --rounds 50 --save baseline.json
+    python -m benchmarks.bench_endpoints --users 8 --rounds 50 --baseline baseline.json
+
+Alapértelmezés szerint ideiglenes SQLite adatbázist használ; Postgreshez
+``--database-url postgresql://...``. Regresszió (a p95 a ``--tolerance``
+aránynál jobban nőtt) esetén a kilépési kód 1.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from collections import defaultdict
+
+# A split utáni lépések célfázis szerint
+SPLIT_STAND_PHASES = (
+    "SPLIT_STAND",
+    "SPLIT_STAND_DOUBLE",
+    "SPLIT_NAT21_TRANSIT",
+    "SPLIT_ACE_TRANSIT",
+)
+MAX_SPLIT_STEPS = 30
+# Ennél kevesebb mérésből a p95 zajos: az összevetés kihagyja
+MIN_COMPARE_COUNT = 30
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Player:
+    """Egy szimulált játékos: saját test client, saját véletlen döntések."""
+
+    def __init__(self, app, seed, timings, errors):
+        self.client = app.test_client()
+        self.rng = random.Random(seed)
+        self.timings = timings
+        self.errors = errors
+        self.headers = {}
+
+    def post(self, route, body=None):
+        start = time.perf_counter()
+        response = self.client.post(route, json=body or {}, headers=self.headers)
+        self.timings[route].append(time.perf_counter() - start)
+        # Stateless módban az állapot-token oda-vissza utazik
+        token = response.headers.get("X-Game-State")
+        if token:
+            self.headers["X-Game-State"] = token
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response.get_json() or {}
+
+    def play(self, rounds):
+        self.post("/api/initialize_session", {"client_id": None})
+        for _ in range(rounds):
+            self.play_round()
+
+    def play_round(self):
+        data = self.post("/api/bet", {"bet": self.rng.choice([1, 5, 10])})
+        if data.get("status") != "success":
+            self.post("/api/set_restart")
+            return
+        self.post("/api/create_deck")
+        state = self.post("/api/start_game").get("game_state", {})
+        if state.get("pre_phase") == "MAIN_STAND_REWARDS_TRANSIT":
+            self.post("/api/stand_and_rewards")
+            return
+
+        if state.get("player", {}).get("can_split"):
+            self.play_split(self.post("/api/split_request"))
+            return
+
+        if self.rng.random() < 0.2:
+            self.post("/api/double_request")
+        else:
+            while (
+                state.get("player", {}).get("sum", 21) < 16
+                and state.get("target_phase") == "MAIN_TURN"
+            ):
+                state = self.post("/api/hit").get("game_state", {})
+        self.post("/api/stand_and_rewards")
+
+    def play_split(self, data):
+        for _ in range(MAX_SPLIT_STEPS):
+            state = data.get("game_state", {})
+            phase = state.get("target_phase")
+            if phase == "SPLIT_TURN":
+                if state["player"]["can_split"] and self.rng.random() < 0.5:
+                    data = self.post("/api/split_request")
+                elif state["player"]["sum"] < 15:
+                    route = self.rng.choice(["/api/split_hit", "/api/split_double_request"])
+                    data = self.post(route)
+                else:
+                    data = self.post("/api/add_to_players_list_by_stand")
+            elif phase in SPLIT_STAND_PHASES:
+                data = self.post("/api/add_to_players_list_by_stand")
+                state = data.get("game_state", {})
+                if state.get("target_phase") == "SPLIT_ACE_TRANSIT" or state.get(
+                    "split_req", 0
+                ):
+                    data = self.post("/api/add_split_player_to_game")
+            elif phase == "SPLIT_FINISH":
+                data = self.post("/api/split_stand_and_rewards")
+                while data.get("game_state", {}).get("players"):
+                    self.post("/api/add_player_from_players")
+                    data = self.post("/api/split_stand_and_rewards")
+                return
+            elif data.get("status") == "error":
+                return
+            else:
+                data = self.post("/api/add_split_player_to_game")
+
+
+def run(app, users, rounds, seed):
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    failures = []
+
+    def worker(index):
+        local_timings = defaultdict(list)
+        local_errors = defaultdict(int)
+        try:
+            Player(app, seed * 1000 + index, local_timings, local_errors).play(rounds)
+        except Exception as e:  # a mérés többi szála fusson tovább
+            failures.append(repr(e))
+        with lock:
+            for route, values in local_timings.items():
+                timings[route].extend(values)
+            for route, count in local_errors.items():
+                errors[route] += count
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    routes = {}
+    for route, values in sorted(timings.items()):
+        values.sort()
+        routes[route] = {
+            "count": len(values),
+            "errors": errors[route],
+            "rps": round(len(values) / wall, 1),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        }
+    total = sum(route["count"] for route in routes.values())
+    return {
+        "users": users,
+        "rounds": rounds,
+        "seed": seed,
+        "wall_s": round(wall, 3),
+        "rps": round(total / wall, 1),
+        "failures": failures,
+        "routes": routes,
+    }
+
+
+def compare(report, baseline, tolerance, min_count=MIN_COMPARE_COUNT):
+    """A baseline-hoz képest ``tolerance`` aránynál jobban lassult útvonalak."""
+    regressions = []
+    for route, current in report["routes"].items():
+        previous = baseline["routes"].get(route)
+        if previous is None or previous["p95_ms"] <= 0:
+            continue
+        if min(current["count"], previous["count"]) < min_count:
+            continue
+        ratio = current["p95_ms"] / previous["p95_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                {
+                    "route": route,
+                    "p95_ms": current["p95_ms"],
+                    "baseline_p95_ms": previous["p95_ms"],
+                    "ratio": round(ratio, 2),
+                }
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--save", default=None, help="baseline JSON írása")
+    parser.add_argument("--baseline", default=None, help="összevetés egy baseline-nal")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-count", type=int, default=MIN_COMPARE_COUNT)
+    args = parser.parse_args(argv)
+
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-endpoints-"), "bench.db")
+        args.database_url = f"sqlite:///{path}"
+    # Az app importkor olvassa a konfigurációt
+    os.environ["DATABASE_URL_SIMPLE"] = args.database_url
+    from my_app.backend.app import app
+
+    report = run(app, args.users, args.rounds, args.seed)
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(
+                report, json.load(f), args.tolerance, args.min_count
+            )
+        print(json.dumps({"regressions": regressions}, indent=2))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Mikro-benchmarkok a ``Game`` forró útvonalaira és a szerializálókra.
+
+Minden eset egy előkészített (fix seedű cipőből felépített) játékon fut;
+a mutáló lépésekhez (``hit``, ``split_hand`` ...) ismétlésenként friss
+játékok készülnek a mérésen kívül, így csak maga a hívás számít. Mérés
+előtt egy bemelegítő kör fut; az eredmény hívásonkénti idő (ns)
+min / median / átlag / szórás / p95 értékekkel.
+
+Használat::
+
+    python -m benchmarks.bench_game
+    python -m benchmarks.bench_game --only serialize --json bench_game.json
+
+Minden motor-optimalizáció mellé ennek a futásnak az előtte / utána
+számai kerüljenek.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import time
+
+from my_app.backend.cards import CARD_VALUE
+from my_app.backend.game import Game
+from my_app.backend.game_serializer import GameSerializer
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import DEFAULT_RULES
+
+
+# =========================================================================
+# FIXTURE-ÖK
+# =========================================================================
+def _seeds(seed):
+    rng = random.Random(seed)
+    while True:
+        yield rng.getrandbits(64)
+
+
+def _shoe(seed, accept=None):
+    """Fix seedű cipő; ``accept(cards)`` szűrhet a lapsorrendre."""
+    for shoe_seed in _seeds(seed):
+        shoe = Shoe(seed=shoe_seed, num_decks=DEFAULT_RULES.num_decks)
+        if accept is None or accept(shoe.cards):
+            return shoe
+
+
+def _no_natural(cards):
+    # osztás sorrendje: játékos, dealer, játékos, dealer
+    player = {CARD_VALUE[cards[0]], CARD_VALUE[cards[2]]}
+    dealer = {CARD_VALUE[cards[1]], CARD_VALUE[cards[3]]}
+    return player != {1, 10} and dealer != {1, 10}
+
+
+def _hit_hand(cards):
+    values = (CARD_VALUE[cards[0]], CARD_VALUE[cards[2]])
+    return _no_natural(cards) and sum(values) <= 11 and 1 not in values
+
+
+def _pair(cards):
+    value = CARD_VALUE[cards[0]]
+    return _no_natural(cards) and value == CARD_VALUE[cards[2]] and value not in (1, 10)
+
+
+def started_game(seed, accept=_no_natural):
+    game = Game()
+    game.set_bet(10)
+    game.set_bet_list(10)
+    game.shoe = _shoe(seed, accept)
+    game.initialize_new_round()
+    return game
+
+
+def hit_game(seed):
+    return started_game(seed, _hit_hand)
+
+
+def split_game(seed):
+    game = started_game(seed, _pair)
+    game.split_hand()
+    return game
+
+
+def split_waiting_game(seed):
+    """Split után, az első kéz lezárva: a következő kéz betöltésére vár."""
+    game = split_game(seed)
+    game.add_to_players_list_by_stand()
+    return game
+
+
+def rewarded_game(seed):
+    game = started_game(seed)
+    game.stand(False)
+    game.rewards()
+    return game
+
+
+# =========================================================================
+# ESETEK
+# =========================================================================
+def _copies(factory):
+    """Friss játékok mentett állapotból (a mérésen kívül).
+
+    A seedből lustán épülő lapsorrend is itt készül el, hogy a mért lépés
+    ne fizesse meg (az külön eset: ``Shoe.cards``).
+    """
+    state = None
+
+    def make(seed):
+        nonlocal state
+        if state is None:
+            state = factory(seed).serialize()
+        game = Game.deserialize(state)
+        game.shoe.cards
+        return game
+
+    return make
+
+
+CASES = {
+    "Game.sum": (started_game, lambda game: game.sum(game.player.hand, True), False),
+    "Game.hit": (_copies(hit_game), lambda game: game.hit(False, False), True),
+    "Game.stand": (_copies(started_game), lambda game: game.stand(False), True),
+    "Game.split_hand": (_copies(lambda seed: started_game(seed, _pair)), Game.split_hand, True),
+    "Game.add_split_player_to_game": (
+        _copies(split_waiting_game),
+        Game.add_split_player_to_game,
+        True,
+    ),
+    "Game.create_deck": (lambda seed: Game(), Game.create_deck, False),
+    "Shoe.cards": (
+        lambda seed: Shoe(seed=seed, num_decks=DEFAULT_RULES.num_decks),
+        lambda shoe: shoe.cards,
+        True,
+    ),
+    "Game.serialize": (split_game, Game.serialize, False),
+    "Game.deserialize": (
+        lambda seed: split_game(seed).serialize(),
+        Game.deserialize,
+        False,
+    ),
+}
+
+# Minden GameSerializer.serialize_* egy rá jellemző állapoton
+SERIALIZER_FIXTURES = {
+    "serialize_for_client_bets": rewarded_game,
+    "serialize_clear_game_state": rewarded_game,
+    "serialize_for_client_init": rewarded_game,
+    "serialize_create_deck": rewarded_game,
+    "serialize_reward_state": rewarded_game,
+    "serialize_split_hand": split_game,
+    "serialize_add_to_players_list_by_stand": split_waiting_game,
+    "serialize_add_player_from_players": split_waiting_game,
+    "serialize_split_stand_and_rewards": split_waiting_game,
+}
+
+for _name in sorted(vars(GameSerializer)):
+    if _name.startswith("serialize_") and _name != "serialize_for_endpoint":
+        CASES[f"GameSerializer.{_name}"] = (
+            SERIALIZER_FIXTURES.get(_name, started_game),
+            getattr(GameSerializer, _name),
+            False,
+        )
+CASES["GameSerializer.serialize_for_endpoint"] = (
+    split_game,
+    lambda game: GameSerializer.serialize_for_endpoint(game, "split_hit"),
+    False,
+)
+
+
+# =========================================================================
+# MÉRÉS
+# =========================================================================
+def measure(factory, op, mutates, seed, number, repeat, warmup=1):
+    """Hívásonkénti idők (ns) ``repeat`` ismétlésből, ``number`` hívásonként."""
+    if mutates:
+        samples = []
+        for round_ in range(warmup + repeat):
+            fixtures = [factory(seed) for _ in range(number)]
+            gc.disable()
+            start = time.perf_counter_ns()
+            for fixture in fixtures:
+                op(fixture)
+            elapsed = time.perf_counter_ns() - start
+            gc.enable()
+            if round_ >= warmup:
+                samples.append(elapsed / number)
+        return samples
+
+    fixture = factory(seed)
+    samples = []
+    for round_ in range(warmup + repeat):
+        gc.disable()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            op(fixture)
+        elapsed = time.perf_counter_ns() - start
+        gc.enable()
+        if round_ >= warmup:
+            samples.append(elapsed / number)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "min_ns": round(ordered[0], 1),
+        "median_ns": round(statistics.median(ordered), 1),
+        "mean_ns": round(statistics.fmean(ordered), 1),
+        "stdev_ns": round(statistics.stdev(ordered), 1) if len(ordered) > 1 else 0.0,
+        "p95_ns": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+        "repeat": len(ordered),
+    }
+
+
+def run(seed=1, number=2000, repeat=15, only=None):
+    results = {}
+    for name, (factory, op, mutates) in CASES.items():
+        if only and only not in name:
+            continue
+        samples = measure(factory, op, mutates, seed, number, repeat)
+        results[name] = {**summarize(samples), "number": number}
+    return {
+        "seed": seed,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--number", type=int, default=2000, help="hívás ismétlésenként")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--only", default=None, help="csak a nevet tartalmazó esetek")
+    parser.add_argument("--json", default=None, help="eredmény JSON fájlba")
+    args = parser.parse_args(argv)
+
+    report = run(args.seed, args.number, args.repeat, args.only)
+    width = max((len(name) for name in report["results"]), default=0)
+    for name, row in report["results"].items():
+        print(
+            f"{name:<{width}}  median {row['median_ns']:>10.1f} ns"
+            f"  min {row['min_ns']:>10.1f}  stdev {row['stdev_ns']:>8.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Mentésenként írt bájtok: teljes JSONB újraírás vs. felső szintű patch.
+
+Használat::
+
+    python -m benchmarks.bench_state_writes --rounds 2000 --seed 1
+"""
+
+import argparse
+import json
+import random
+
+from collections import defaultdict
+
+from my_app.backend.game import Game
+from my_app.backend.game_state import json_encoder
+from my_app.backend.shoe import Shoe
+from my_app.backend.state_diff import state_patch
+
+
+def _play(rounds, seed):
+    """A végpontok sorrendjében lejátszott körök: ``(akció, régi, új)``."""
+    rng = random.Random(seed)
+    game = Game()
+    state = game.serialize()
+
+    def step(action):
+        nonlocal state
+        new = game.serialize()
+        yield action, state, new
+        state = new
+
+    for _ in range(rounds):
+        game.set_bet(10)
+        game.set_bet_list(10)
+        yield from step("bet")
+
+        if game.needs_reshuffle():
+            game.create_deck(Shoe(seed=rng.getrandbits(64), num_decks=game.rules.num_decks))
+            yield from step("create_deck")
+
+        game.initialize_new_round()
+        yield from step("start_game")
+
+        if rng.random() < 0.15:
+            game.double_request()
+            game.hit(True, False)
+            yield from step("double_request")
+        else:
+            while game.player.hand.total < 17:
+                game.hit(False, False)
+                yield from step("hit")
+
+        game.stand(False)
+        game.rewards()
+        yield from step("stand_and_rewards")
+
+
+def run(rounds, seed):
+    totals = defaultdict(lambda: [0, 0, 0])  # darab, teljes, patch
+    for action, old, new in _play(rounds, seed):
+        full = len(json_encoder.encode(new))
+        patch = state_patch(old, new)
+        written = full if patch is None else len(json_encoder.encode(patch)) if patch else 0
+        row = totals[action]
+        row[0] += 1
+        row[1] += full
+        row[2] += written
+
+    report = {}
+    for action, (count, full, written) in totals.items():
+        report[action] = {
+            "count": count,
+            "full_bytes": round(full / count, 1),
+            "patch_bytes": round(written / count, 1),
+            "ratio": round(written / full, 3),
+        }
+    count = sum(row[0] for row in totals.values())
+    report["all"] = {
+        "count": count,
+        "full_bytes": round(sum(row[1] for row in totals.values()) / count, 1),
+        "patch_bytes": round(sum(row[2] for row in totals.values()) / count, 1),
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.rounds, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Közös fixture-ök: az app friss importja adott konfigurációval.
+
+Az app importkor olvassa a környezeti változókat, ezért minden teszt
+saját importot kap, ideiglenes SQLite adatbázissal, cipőkészlet és
+időzített cache-kiírás nélkül.
+"""
+
+import importlib
+import sys
+
+import pytest
+
+from my_app.backend.shoe import Shoe
+
+APP_MODULE = "my_app.backend.app"
+
+
+class ApiClient:
+    """Test client, ami a kliens módjára visszaküldi az állapot-tokent."""
+
+    def __init__(self, module):
+        self.module = module
+        self.client = module.app.test_client()
+        self.headers = {}
+
+    def post(self, action, body=None, headers=None):
+        response = self.client.post(
+            f"/api/{action}",
+            json=body or {},
+            headers={**self.headers, **(headers or {})},
+        )
+        token = response.headers.get(self.module.STATE_TOKEN_HEADER)
+        if token:
+            self.headers[self.module.STATE_TOKEN_HEADER] = token
+        return response
+
+    def start(self):
+        """Új session; a user id-je."""
+        assert self.post("initialize_session", {"client_id": None}).status_code == 200
+        with self.client.session_transaction() as session:
+            return session["user_id"]
+
+    def deal(self, bet=10):
+        """Tét, cipő, osztás; a start_game válasza."""
+        for action, body in (("bet", {"bet": bet}), ("create_deck", None)):
+            assert self.post(action, body).status_code == 200
+        return self.post("start_game")
+
+
+@pytest.fixture
+def load_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(Shoe, "cards_source", None)
+
+    def load(**env):
+        settings = {
+            "DATABASE_URL_SIMPLE": f"sqlite:///{tmp_path / 'app.db'}",
+            "SHOE_POOL_DEPTH": "0",
+            "GAME_CACHE_FLUSH_SECONDS": "0",
+            **env,
+        }
+        for key, value in settings.items():
+            monkeypatch.setenv(key, str(value))
+        sys.modules.pop(APP_MODULE, None)
+        return importlib.import_module(APP_MODULE)
+
+    yield load
+    sys.modules.pop(APP_MODULE, None)
+
+
+@pytest.fixture
+def api():
+    return ApiClient
+
+
+@pytest.fixture
+def shoe_seeds(monkeypatch):
+    """A kérésekben kevert cipők seedjei sorban (üres lista: 0).
+
+    A 0 seed első osztása: játékos 11, osztó 15 (ász nélkül), így a hit
+    nem lehet bust.
+    """
+    seeds = []
+
+    def shuffled(cls, num_decks):
+        return cls(seed=seeds.pop(0) if seeds else 0, num_decks=num_decks)
+
+    monkeypatch.setattr(Shoe, "shuffled", classmethod(shuffled))
+    return seeds
@@ -1,23 +1,129 @@
+import hmac
 import os
 import uuid
 import logging
 import math
-from functools import wraps
+from functools import cache, wraps
 from dotenv import load_dotenv
-from flask import Flask, jsonify, render_template, request, session
+from flask import (
+    Flask,
+    after_this_request,
+    g,
+    jsonify,
+    render_template,
+    request,
+    session,
+)
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import JSON, inspect, literal, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
+from my_app.backend.cards import CARD_VALUE
+from my_app.backend.client_delta import ViewCache, delta_view
+from my_app.backend.db_profiler import DBProfiler
 from my_app.backend.game import Game
+from my_app.backend.game_cache import CacheBusy, GameCache
+from my_app.backend.game_events import REPLAY, event_data, replay
 from my_app.backend.game_serializer import GameSerializer
+from my_app.backend.game_state import decode_json, encode_json
+from my_app.backend.json_provider import MsgspecJSONProvider
+from my_app.backend.metrics import NO_STAGE, RequestMetrics, StageTimer, render_shoe_pool
 from my_app.backend.phase_state import PhaseState
+from my_app.backend.shoe import Shoe
+from my_app.backend.shoe_pool import ShoePool
+from my_app.backend.state_diff import state_patch
+from my_app.backend.state_token import StateToken, StateTokenCodec, TokenUser
+from my_app.backend.strategy import load_table
+from my_app.backend.table_rules import DEFAULT_RULES, TableRules
 
 load_dotenv()
 
 MINIMUM_BET = 1
+MAX_BATCH_ACTIONS = 16
+
+# Élő Game objektumok worker-szintű cache-e (0: kikapcsolva). Több worker
+# esetén sticky session ajánlott: a ki nem írt lépésekkel rendelkező
+# játékot a többi worker a kiírásig ütközésként (409) utasítja el.
+GAME_CACHE_SIZE = int(os.environ.get("GAME_CACHE_SIZE", "0"))
+GAME_CACHE_FLUSH_SECONDS = float(os.environ.get("GAME_CACHE_FLUSH_SECONDS", "30"))
+
+# Eseménynapló mód: kör közben csak események, pillanatkép a kör határán
+# vagy GAME_SNAPSHOT_EVERY esemény után
+GAME_EVENT_LOG = os.environ.get("GAME_EVENT_LOG", "False") == "True"
+GAME_SNAPSHOT_EVERY = int(os.environ.get("GAME_SNAPSHOT_EVERY", "20"))
+
+# Stateless mód: az állapot titkosított, hitelesített tokenben utazik
+# (X-Game-State fejléc oda-vissza). A tokenegyenleget nem módosító lépések
+# a usert és a dokumentumot nem töltik be, csak egy UPDATE-tel írják (CAS a
+# verzióra): egy régebbi token így semmilyen lépéshez nem játszható vissza,
+# a tokent elvesztő kliens (pl. oldalfrissítés) pedig a DB-ből folytatja.
+GAME_STATE_TOKENS = os.environ.get("GAME_STATE_TOKENS", "False") == "True"
+GAME_STATE_TOKEN_MAX_AGE = int(os.environ.get("GAME_STATE_TOKEN_MAX_AGE", "86400"))
+STATE_TOKEN_HEADER = "X-Game-State"
+BALANCE_ACTIONS = frozenset(
+    {
+        "bet",
+        "retake_bet",
+        "ins_request",
+        "double_request",
+        "stand_and_rewards",
+        "split_request",
+        "split_double_request",
+        "split_stand_and_rewards",
+        "set_restart",
+    }
+)
+
+# Delta válaszok (client_delta): a kliens az X-Client-View-Version fejléccel
+# jelzi a nála lévő nézetet, és csak a változásokat kapja
+DELTA_RESPONSES = os.environ.get("DELTA_RESPONSES", "False") == "True"
+DELTA_CACHE_SIZE = int(os.environ.get("DELTA_CACHE_SIZE", "10000"))
+CLIENT_VIEW_HEADER = "X-Client-View-Version"
+VIEW_VERSION_HEADER = "X-View-Version"
+
+if GAME_STATE_TOKENS and (GAME_CACHE_SIZE or GAME_EVENT_LOG):
+    raise RuntimeError("GAME_STATE_TOKENS cannot be combined with the game cache or event log.")
+
+# Kérésenkénti szakaszidők és /api/metrics (Prometheus), csak bekapcsolva; a
+# végpont csak "Authorization: Bearer <METRICS_TOKEN>" fejléccel olvasható
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "False") == "True"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+if METRICS_ENABLED and not METRICS_TOKEN:
+    raise RuntimeError("METRICS_ENABLED requires METRICS_TOKEN.")
+
+# Opcionális DB profiler: kérésenként utasításszám, DB idő, leglassabb
+# utasítás, állapotírás (Server-Timing fejléc); a keretet túllépő kérések
+# DB_PROFILE_SAMPLE_RATE arányban a "db_profiler" naplóba kerülnek
+DB_PROFILER = os.environ.get("DB_PROFILER", "False") == "True"
+DB_PROFILE_BUDGET_MS = float(os.environ.get("DB_PROFILE_BUDGET_MS", "50"))
+DB_PROFILE_MAX_STATEMENTS = int(os.environ.get("DB_PROFILE_MAX_STATEMENTS", "5"))
+DB_PROFILE_SAMPLE_RATE = float(os.environ.get("DB_PROFILE_SAMPLE_RATE", "1.0"))
+
+# jsonify msgspec-kel, a Flask alapértelmezésével bájtra azonos kimenettel
+FAST_JSON = os.environ.get("FAST_JSON", "True") == "True"
+
+# Workerenként előre kevert cipők a create_deck-hez (0: kikapcsolva); a
+# kiadott cipők lapsorrendjéből SHOE_POOL_KEEP marad meg az osztásig
+SHOE_POOL_DEPTH = int(os.environ.get("SHOE_POOL_DEPTH", "8"))
+SHOE_POOL_KEEP = int(os.environ.get("SHOE_POOL_KEEP", "1000"))
+
+# Az asztal szabályai: paklik száma és a cut card helye (a teli cipő
+# arányában); új játékokra és a következő create_deck-től érvényes
+TABLE_RULES = TableRules(
+    num_decks=int(os.environ.get("TABLE_DECKS", DEFAULT_RULES.num_decks)),
+    penetration=float(os.environ.get("TABLE_PENETRATION", DEFAULT_RULES.penetration)),
+)
+
+# Előre számolt EV tábla az asztal paklijaihoz (python -m
+# my_app.backend.strategy --decks N), az első /api/strategy_hint kéréskor
+# töltjük be (strategy_table)
+STRATEGY_TABLE_PATH = os.environ.get("STRATEGY_TABLE_PATH")
 
 # =========================================================================
 # FLASK APPLICATION BASICS
@@ -37,6 +143,15 @@ app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(days=31)
 app.config["SESSION_COOKIE_SECURE"] = os.environ.get("VERCEL", "False") == "True"
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 
+if FAST_JSON:
+    app.json = MsgspecJSONProvider(app)
+
+state_tokens = (
+    StateTokenCodec(app.config["SECRET_KEY"], GAME_STATE_TOKEN_MAX_AGE)
+    if GAME_STATE_TOKENS
+    else None
+)
+
 # =========================================================================
 # DATABASE SETUP (NEON POSTGRES)
 # =========================================================================
@@ -46,13 +161,52 @@ DATABASE_URL = os.environ.get(
 
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# A JSONB oszlopok kódolása/dekódolása msgspec-kel (C szinten)
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "json_serializer": encode_json,
+    "json_deserializer": decode_json,
+}
 
 db = SQLAlchemy(app)
 
+# Postgresen JSONB; SQLite-on (benchmarkok, helyi próbák) sima JSON
+JSON_STATE = JSONB().with_variant(JSON(), "sqlite")
+
 # Logging finomhangolás
 log = logging.getLogger("werkzeug")
 log.setLevel(logging.ERROR)
 
+# =========================================================================
+# METRICS
+# =========================================================================
+request_metrics = RequestMetrics() if METRICS_ENABLED else None
+
+
+def stage(name):
+    """A kérés egy szakaszának mérése (``with stage("commit"): ...``)."""
+    timer = g.get("stage_timer")
+    return timer.stage(name) if timer is not None else NO_STAGE
+
+
+@app.before_request
+def start_stage_timer():
+    if request_metrics is not None:
+        g.stage_timer = StageTimer()
+
+
+@app.after_request
+def record_request_metrics(response):
+    timer = g.get("stage_timer")
+    if timer is not None:
+        request_metrics.record(
+            request.endpoint or "unmatched",
+            response.status_code,
+            timer,
+            request.content_length or 0,
+            response.content_length or 0,
+        )
+    return response
+
 
 # =========================================================================
 # MODEL
@@ -64,18 +218,421 @@ class User(db.Model):
         db.String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4())
     )
     tokens = db.Column(db.Integer, default=1000)
-    current_game_state = db.Column(JSONB, nullable=True)
+    # Régi mentések helye; az első mentéskor átkerül a game_states táblába
+    current_game_state = db.Column(JSON_STATE, nullable=True)
     idempotency_key = db.Column(db.String(36), nullable=True)
     last_activity = db.Column(
         db.TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # A verzió a userrel egy lekérdezésben jön, a dokumentum csak ha kell
+    game_state = db.relationship(
+        "GameStateRecord", uselist=False, lazy="joined", cascade="all, delete-orphan"
+    )
+
     def __repr__(self):
         return f"<User {self.id[:8]} (Client: {self.client_id[:8]})>"
 
 
+class GameStateRecord(db.Model):
+    """A játékállapot saját sora; minden mentett lépés növeli a ``version``-t,
+    az írás csak a betöltött verzióra sikerül (compare-and-swap)."""
+
+    __tablename__ = "game_states"
+    user_id = db.Column(
+        db.String(36),
+        db.ForeignKey("my_users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # A "state" pillanatkép verziója; efölött az események a game_events-ben
+    snapshot_version = db.Column(
+        db.Integer, nullable=False, default=1, server_default="0"
+    )
+    state = db.deferred(db.Column(JSON_STATE, nullable=False))
+
+
+class GameEvent(db.Model):
+    """Egy végpont lépése (audit napló, és újrajátszás a pillanatkép után)."""
+
+    __tablename__ = "game_events"
+    user_id = db.Column(
+        db.String(36),
+        db.ForeignKey("my_users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version = db.Column(db.Integer, primary_key=True)
+    action = db.Column(db.String(40), nullable=False)
+    data = db.Column(JSON_STATE, nullable=True)
+    tokens = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class StateConflict(Exception):
+    """Közben egy másik kérés már mentett: a kliens újrapróbálhatja.
+
+    ``retryable=False``: ugyanaz a kérés újra is elbukik (pl. elavult
+    állapot-token); a kliensnek előbb újra kell töltenie az állapotot.
+    """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
 with app.app_context():
     db.create_all()
+    # A részleges JSONB írás (||) csak Postgresen érhető el
+    JSONB_PATCH = db.engine.dialect.name == "postgresql"
+
+    db_profiler = (
+        DBProfiler(
+            db.engine,
+            budget_ms=DB_PROFILE_BUDGET_MS,
+            max_statements=DB_PROFILE_MAX_STATEMENTS,
+            sample_rate=DB_PROFILE_SAMPLE_RATE,
+            logger=logging.getLogger("db_profiler"),
+        )
+        if DB_PROFILER
+        else None
+    )
+
+
+@app.before_request
+def start_db_profile():
+    if db_profiler is not None:
+        db_profiler.start()
+
+
+@app.after_request
+def finish_db_profile(response):
+    if db_profiler is not None:
+        profile = db_profiler.finish(request.endpoint or "unmatched")
+        if profile is not None:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={profile.db_time * 1000:.3f};desc="{profile.statements} statements, '
+                f'{profile.commits} commits, state {"written" if profile.state_written else "kept"}"',
+            )
+    return response
+
+
+# =========================================================================
+# GAME STATE PERSISTENCE
+# =========================================================================
+game_cache = GameCache(GAME_CACHE_SIZE) if GAME_CACHE_SIZE > 0 else None
+view_cache = ViewCache(DELTA_CACHE_SIZE) if DELTA_RESPONSES else None
+
+# Cache nélkül a dokumentum is kell: a userrel együtt, egy lekérdezésben jön
+USER_LOAD_OPTIONS = (
+    []
+    if game_cache is not None
+    else [joinedload(User.game_state).undefer(GameStateRecord.state)]
+)
+
+
+def has_game_state(user):
+    if isinstance(user, TokenUser):
+        return True
+    return user.game_state is not None or bool(user.current_game_state)
+
+
+def state_version(user):
+    if isinstance(user, TokenUser):
+        return user.version
+    return user.game_state.version if user.game_state is not None else 0
+
+
+def request_state_token(user_id):
+    """A kérés állapot-tokenje; ``None``, ha nincs (ekkor a DB az érvényes)."""
+    raw = request.headers.get(STATE_TOKEN_HEADER)
+    if not raw:
+        return None
+    token = state_tokens.loads(raw)
+    if token is None or token.user_id != user_id:
+        raise ValueError("Invalid game state token.")
+    return token
+
+
+def state_token_for(user, game):
+    """Az új állapot-token; a commit előtt, amíg a verzió még be van töltve."""
+    if state_tokens is None:
+        return None
+    with stage("serialize"):
+        token = StateToken(
+            user_id=user.id,
+            version=state_version(user),
+            tokens=user.tokens,
+            idempotency_key=user.idempotency_key,
+            state=game.to_state(),
+        )
+        return state_tokens.dumps(token)
+
+
+def attach_header(name, value):
+    if value is None:
+        return
+
+    @after_this_request
+    def set_header(response):
+        response.headers[name] = value
+        return response
+
+
+def attach_state_token(raw):
+    attach_header(STATE_TOKEN_HEADER, raw)
+
+
+def load_game(user, strict=True):
+    """A user játéka: token, cache, vagy a game_states sor (+ események).
+
+    ``strict``: elavult állapot-token esetén ``StateConflict`` (különben a
+    DB-beli állapot az érvényes).
+    """
+    with stage("deserialize"):
+        return _load_game(user, strict)
+
+
+def _load_game(user, strict):
+    if isinstance(user, TokenUser):
+        return Game.from_state(user.state)
+    if state_tokens is not None:
+        token = request_state_token(user.id)
+        if token is not None:
+            if token.version == state_version(user):
+                return Game.from_state(token.state)
+            if strict:
+                raise StateConflict(
+                    "The game state token is out of date.", retryable=False
+                )
+    if game_cache is not None:
+        try:
+            game = game_cache.checkout(user.id, state_version(user))
+        except CacheBusy as e:
+            raise StateConflict("The game is in use by another request.") from e
+        if game is not None:
+            g.cache_checkout = user.id
+            if game_cache.is_dirty(user.id):
+                # Hibás kérésnél ez íródik ki a félig módosult játék helyett
+                g.cache_restore = game.serialize()
+            return game
+    record = user.game_state
+    if record is None:
+        return Game.deserialize(user.current_game_state)
+
+    game = Game.deserialize(record.state)
+    if record.snapshot_version < record.version:
+        tail = db.session.execute(
+            db.select(GameEvent.action, GameEvent.data)
+            .where(
+                GameEvent.user_id == user.id,
+                GameEvent.version > record.snapshot_version,
+            )
+            .order_by(GameEvent.version)
+        ).all()
+        # A hiányzó lépések egy másik worker cache-ében vannak, még kiíratlanul
+        # (0: a snapshot_version oszlop előtti sor, a dokumentum az érvényes)
+        if record.snapshot_version and len(tail) != record.version - record.snapshot_version:
+            raise StateConflict("The saved game state is not up to date yet.")
+        replay(game, tail)
+    return game
+
+
+def game_event(action, game, data, user):
+    """Egy sikeres lépés eseménye: ``(action, data, tokens)``."""
+    return action, event_data(action, game, data), user.tokens
+
+
+def save_game(user, game, flush=True, events=()):
+    """Új verzió compare-and-swap írással; ütközésnél ``StateConflict``.
+
+    A dokumentum cache nélkül mindig, cache-sel csak ``flush`` esetén
+    íródik (a többi lépés a cache-ben "piszkos" marad, csak a verzió nő).
+    Eseménynapló módban az ``events`` sorok kerülnek be, a dokumentum
+    csak a kör határán vagy ``GAME_SNAPSHOT_EVERY`` esemény után íródik.
+    """
+    if isinstance(user, TokenUser):
+        advance_token_version(user, game)
+        return
+    events = events if GAME_EVENT_LOG else ()
+    record = user.game_state
+    base = record.version if record is not None else 0
+    version = base + max(len(events), 1)
+
+    if events:
+        snapshot = (
+            not game.is_round_active
+            or version - record.snapshot_version >= GAME_SNAPSHOT_EVERY
+            if record is not None
+            else True
+        )
+        dirty = False
+    else:
+        snapshot = game_cache is None or flush
+        dirty = not snapshot
+
+    state = None
+    if record is None or snapshot:
+        with stage("serialize"):
+            state = game.serialize()
+
+    if record is None:
+        # Első mentés (új user vagy régi, my_users-beli állapot átköltöztetése)
+        record = GameStateRecord(version=version, snapshot_version=version, state=state)
+        user.game_state = record
+        user.current_game_state = None
+        add_game_events(user, base, events)
+        try:
+            with stage("commit"):
+                db.session.flush()
+        except IntegrityError as e:
+            raise StateConflict("The game state was created by another request.") from e
+    else:
+        values = {"version": version}
+        if snapshot:
+            values.update(state_values(record, state))
+            values["snapshot_version"] = version
+        with stage("commit"):
+            result = db.session.execute(
+                update(GameStateRecord)
+                .where(
+                    GameStateRecord.user_id == user.id,
+                    GameStateRecord.version == record.version,
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        if result.rowcount != 1:
+            raise StateConflict("The game state was changed by another request.")
+        set_committed_value(record, "version", version)
+        if snapshot:
+            set_committed_value(record, "snapshot_version", version)
+            db.session.expire(record, ["state"])
+        add_game_events(user, base, events)
+
+    if game_cache is not None:
+        g.pop("cache_checkout", None)
+        evicted = game_cache.checkin(user.id, version, game, dirty=dirty)
+        flush_game_states(evicted)
+
+
+def advance_token_version(user, game):
+    """Tokenes lépés: új verzió a token verziójáról (CAS), olvasás nélkül.
+
+    A dokumentum is ugyanebben az UPDATE-ben íródik, így a token nélkül
+    érkező kérés (elveszett fejléc) a DB-ből ugyanott folytatja.
+    """
+    with stage("serialize"):
+        state = game.serialize()
+    version = user.version + 1
+    with stage("commit"):
+        result = db.session.execute(
+            update(GameStateRecord)
+            .where(
+                GameStateRecord.user_id == user.id,
+                GameStateRecord.version == user.version,
+            )
+            .values(version=version, snapshot_version=version, state=state)
+            .execution_options(synchronize_session=False)
+        )
+    if result.rowcount != 1:
+        raise StateConflict("The game state token is out of date.", retryable=False)
+    user.version = version
+
+
+def add_game_events(user, base, events):
+    db.session.add_all(
+        GameEvent(
+            user_id=user.id, version=base + i, action=action, data=data, tokens=tokens
+        )
+        for i, (action, data, tokens) in enumerate(events, start=1)
+    )
+
+
+def state_values(record, state):
+    """Csak a megváltozott felső szintű kulcsok írása, ha megéri."""
+    patch = None
+    if JSONB_PATCH and "state" not in inspect(record).unloaded:
+        patch = state_patch(record.state, state)
+    if patch is None:
+        return {"state": state}
+    if patch:
+        return {"state": GameStateRecord.state.op("||")(literal(patch, JSONB))}
+    return {}
+
+
+def release_game(user, game):
+    """Változatlanul visszaadott játék (csak olvasó vagy hibás kérés)."""
+    if game_cache is not None:
+        g.pop("cache_checkout", None)
+        flush_game_states(game_cache.checkin(user.id, state_version(user), game))
+
+
+def discard_game(user_id):
+    """Eldobja a cache-elt játékot; a piszkos állapot előbb kiíródik."""
+    if game_cache is not None:
+        flush_game_states(game_cache.discard(user_id))
+
+
+def drop_checkout():
+    """Hibás kérés után a kérés által kivett (esetleg félig módosított) játék
+    eldobása; a másik kérések bejegyzéseit nem érinti.
+
+    A ki nem írt lépései a kérés előtti állapotból (``g.cache_restore``)
+    íródnak ki, így a következő kérés a DB-ből ugyanonnan folytatja.
+    """
+    user_id = g.pop("cache_checkout", None)
+    if user_id is not None:
+        restore = g.pop("cache_restore", None)
+        flush_game_states(
+            (key, version, restore if state is None else state)
+            for key, version, state in game_cache.discard(user_id)
+        )
+        db.session.commit()
+
+
+def flush_game_states(entries):
+    """Cache-ből kiírt állapotok; csak ha azóta nem lett újabb verzió.
+
+    ``state=None``: a játék nem menthető (hibás kérés közben módosult), a
+    ki nem írt lépései elvesznek, és a dokumentum lesz az érvényes.
+    """
+    for user_id, version, state in entries:
+        values = {"snapshot_version": version}
+        if state is None:
+            app.logger.warning(
+                "Unsaved game steps of user %s dropped at version %s.", user_id, version
+            )
+        else:
+            values["state"] = state
+        db.session.execute(
+            update(GameStateRecord)
+            .where(
+                GameStateRecord.user_id == user_id,
+                GameStateRecord.version == version,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _flush_from_timer(entries):
+    with app.app_context():
+        flush_game_states(entries)
+        db.session.commit()
+
+
+if game_cache is not None and GAME_CACHE_FLUSH_SECONDS > 0:
+    game_cache.start_flusher(GAME_CACHE_FLUSH_SECONDS, _flush_from_timer)
+
+shoe_pool = (
+    ShoePool(TABLE_RULES.num_decks, SHOE_POOL_DEPTH, SHOE_POOL_KEEP)
+    if SHOE_POOL_DEPTH > 0
+    else None
+)
+if shoe_pool is not None:
+    # A töltő szál az első create_deck-kor indul, workerenként
+    Shoe.cards_source = shoe_pool
 
 
 # =========================================================================
@@ -96,7 +653,16 @@ def login_required(f):
                 401,
             )
 
-        user = db.session.get(User, user_id)
+        if state_tokens is not None and request.endpoint in GAME_ACTIONS:
+            if request.endpoint not in BALANCE_ACTIONS:
+                # Tokenegyenleg nem változik: a user betöltése nélkül, a tokenből
+                with stage("auth"):
+                    token = request_state_token(user_id)
+                if token is not None:
+                    return f(user=TokenUser(token), *args, **kwargs)
+
+        with stage("auth"):
+            user = db.session.get(User, user_id, options=USER_LOAD_OPTIONS)
         if not user:
             session.pop("user_id", None)
             return (
@@ -116,20 +682,71 @@ def login_required(f):
     return decorated_function
 
 
+# A with_game_state végpontok törzsei név szerint: a /api/actions ezeket hívja,
+# az eseménynapló pedig a game_events.REPLAY-jel játssza újra
+GAME_ACTIONS = {}
+
+
+def action_endpoint():
+    """A szerializáló kontextusa (a /api/actions lépéseinél az akció neve)."""
+    return g.get("action_endpoint") or request.endpoint
+
+
+def action_data():
+    """Az akció paraméterei (a /api/actions lépéseinél a lépés objektuma)."""
+    if "action_data" in g:
+        return g.action_data
+    return request.get_json() or {}
+
+
+def game_view(game, **extra):
+    """A kliensnek küldött állapot az akció kontextusa szerint.
+
+    Az ``extra`` mezők a nézet részei (a delta ezekre is kiterjed).
+    Delta módban (``g.delta_user``, a with_game_state állítja) a kliens
+    verziójához képesti patch, ha a nála lévő nézet ismert.
+    """
+    with stage("serializer"):
+        view = GameSerializer.serialize_for_endpoint(game, action_endpoint())
+        view.update(extra)
+        user_id = g.get("delta_user")
+        if user_id is None:
+            return view
+
+        g.client_view = view
+        base = request.headers.get(CLIENT_VIEW_HEADER, type=int)
+        old = view_cache.get(user_id, base) if base is not None else None
+        return view if old is None else delta_view(old, view, base)
+
+
+def remember_view(user):
+    """Sikeres válasz után: az elküldött nézet új verzióval a fejlécbe."""
+    view = g.pop("client_view", None)
+    if view is not None:
+        attach_header(VIEW_VERSION_HEADER, str(view_cache.put(user.id, view)))
+
+
+def missing_game_state():
+    return (
+        jsonify(
+            {
+                "error": "Game state not initialized.",
+                "game_state_hint": "MISSING_GAME_STATE",
+            }
+        ),
+        400,
+    )
+
+
 def with_game_state(f):
+    assert f.__name__ in REPLAY, f"{f.__name__} has no event replay"
+    GAME_ACTIONS[f.__name__] = f
+
     @wraps(f)
     def decorated_function(user, *args, **kwargs):
         # 1. Alapvető ellenőrzés
-        if not user.current_game_state:
-            return (
-                jsonify(
-                    {
-                        "error": "Game state not initialized.",
-                        "game_state_hint": "MISSING_GAME_STATE",
-                    }
-                ),
-                400,
-            )
+        if not has_game_state(user):
+            return missing_game_state()
 
         # 2. IDEMPOTENCIA ELLENŐRZÉS
         # Megpróbáljuk kiszedni a kulcsot a JSON body-ból
@@ -137,30 +754,39 @@ def with_game_state(f):
         ikey = data.get("idempotency_key")
 
         # Deszerializálunk (szükség van rá az idempotens válaszhoz is)
-        game = Game.deserialize(user.current_game_state)
+        game = load_game(user)
+
+        if view_cache is not None:
+            g.delta_user = user.id
 
         if ikey and user.idempotency_key == ikey:
             # Ha a kulcs egyezik, nem futtatjuk le a függvényt (f),
             # csak visszaadjuk az aktuális állapotot.
-            return (
+            release_game(user, game)
+            attach_state_token(state_token_for(user, game))
+            response = (
                 jsonify(
                     {
                         "status": "success",
                         "idempotent": True,
                         "current_tokens": user.tokens,
-                        "game_state": GameSerializer.serialize_by_context(
-                            game, request.path
-                        ),
+                        "game_state": game_view(game),
                     }
                 ),
                 200,
             )
+            if view_cache is not None:
+                remember_view(user)
+            return response
 
         # 3. A végpont végrehajtása
         kwargs["user"] = user
         kwargs["game"] = game
+        tokens_before = user.tokens
 
-        response = f(*args, **kwargs)
+        # Hibánál a játék félig módosult lehet: az api_error_handler eldobja
+        with stage("engine"):
+            response = f(*args, **kwargs)
 
         # 4. Automatikus mentés és Idempotencia kulcs frissítése
         status_code = 200
@@ -170,11 +796,26 @@ def with_game_state(f):
             status_code = response.status_code
 
         if 200 <= status_code < 300:
-            user.current_game_state = game.serialize()
+            if isinstance(user, TokenUser) and user.tokens != tokens_before:
+                raise RuntimeError(f"{f.__name__} changed tokens without the database.")
+            # Tokenváltozás és kör vége: a dokumentum is azonnal íródik
+            save_game(
+                user,
+                game,
+                flush=user.tokens != tokens_before or not game.is_round_active,
+                events=[game_event(f.__name__, game, data, user)],
+            )
             # Itt mentjük el az új kulcsot, hogy a következő azonos kérést már megfogjuk
             if ikey:
                 user.idempotency_key = ikey
-            db.session.commit()
+            token = state_token_for(user, game)
+            with stage("commit"):
+                db.session.commit()
+            attach_state_token(token)
+            if view_cache is not None:
+                remember_view(user)
+        else:
+            release_game(user, game)
 
         return response
 
@@ -187,9 +828,28 @@ def api_error_handler(f):
         try:
             return f(*args, **kwargs)  # Meghívjuk az eredeti végpont függvényt
 
+        except StateConflict as e:
+            # Párhuzamos kérés (pl. másik fül) mentett közben: semmi sem íródott
+            db.session.rollback()
+            drop_checkout()
+            return (
+                jsonify(
+                    {
+                        "status": "error",
+                        "message": str(e),
+                        "retryable": e.retryable,
+                        "game_state_hint": "STATE_CONFLICT",
+                    }
+                ),
+                409,
+            )
+
         except ValueError as e:
             # Specifikus hiba (pl. pakli üres, érvénytelen adat)
             db.session.rollback()
+            drop_checkout()
+            # Hibánál mindig a teljes nézet megy (a kliens verziója érvénytelen)
+            g.pop("delta_user", None)
             game = kwargs.get("game")
             user = kwargs.get("user")
 
@@ -201,9 +861,7 @@ def api_error_handler(f):
 
             if game:
                 # Hiba esetén is a kontextusnak megfelelő állapotot küldjük
-                response_data["game_state"] = GameSerializer.serialize_by_context(
-                    game, request.path
-                )
+                response_data["game_state"] = game_view(game)
             if user:
                 response_data["current_tokens"] = user.tokens
 
@@ -211,6 +869,7 @@ def api_error_handler(f):
 
         except Exception as e:
             db.session.rollback()
+            drop_checkout()
             print(f"Váratlan szerver hiba az API végponton: {e}")
             return (
                 jsonify(
@@ -267,11 +926,11 @@ def initialize_session():
     if not user:
         try:
             # Létrehozunk egy alap játékállapotot az új usernek
-            initial_game = Game()
+            initial_game = Game(TABLE_RULES)
             user = User(
                 client_id=client_id_from_request,
                 tokens=1000,
-                current_game_state=initial_game.serialize(),
+                game_state=GameStateRecord(state=initial_game.serialize()),
             )
             db.session.add(user)
             db.session.commit()
@@ -289,11 +948,10 @@ def initialize_session():
     user.last_activity = datetime.now(timezone.utc)
 
     # 4. Játékállapot előkészítése
-    if not user.current_game_state:
-        game_instance = Game()
-        user.current_game_state = game_instance.serialize()
+    if not has_game_state(user):
+        game_instance = Game(TABLE_RULES)
     else:
-        game_instance = Game.deserialize(user.current_game_state)
+        game_instance = load_game(user, strict=False)
 
     # Árva tétek visszatérítése
     if not game_instance.is_round_active and game_instance.bet > 0:
@@ -303,8 +961,11 @@ def initialize_session():
 
     game_instance.is_session_init = True
 
-    user.current_game_state = game_instance.serialize()
-    db.session.commit()
+    save_game(user, game_instance)
+    token = state_token_for(user, game_instance)
+    with stage("commit"):
+        db.session.commit()
+    attach_state_token(token)
 
     if user.tokens <= 0 and not game_instance.is_round_active:
         calculated_phase = PhaseState.OUT_OF_TOKENS
@@ -328,7 +989,7 @@ def initialize_session():
                 "tokens": user.tokens,
                 "game_state": custom_game_state,
                 "game_state_hint": "USER_SESSION_INITIALIZED",
-                "total_initial_cards": Game.TOTAL_INITIAL_CARDS,
+                "total_initial_cards": game_instance.deck_len_init,
             }
         ),
         200,
@@ -341,7 +1002,7 @@ def initialize_session():
 @login_required
 @with_game_state
 def bet(user, game):
-    data = request.get_json() or {}
+    data = action_data()
     bet_amount = data.get("bet", 0)
 
     if not isinstance(bet_amount, (int, float)) or bet_amount < MINIMUM_BET:
@@ -359,7 +1020,7 @@ def bet(user, game):
             {
                 "status": "success",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "BET_SUCCESSFULLY_PLACED",
             }
         ),
@@ -385,7 +1046,7 @@ def retake_bet(user, game):
             {
                 "status": "success",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "BET_SUCCESSFULLY_RETAKEN",
             }
         ),
@@ -399,14 +1060,14 @@ def retake_bet(user, game):
 @login_required
 @with_game_state
 def create_deck(user, game):
-    game.create_deck()
+    game.create_deck(shoe_pool.take() if shoe_pool is not None else None, TABLE_RULES)
 
     return (
         jsonify(
             {
                 "status": "success",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "DECK_CREATED",
             }
         ),
@@ -428,7 +1089,7 @@ def start_game(user, game):
                 "status": "success",
                 "message": "New round initialized.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "NEW_ROUND_INITIALIZED",
             }
         ),
@@ -457,7 +1118,7 @@ def ins_request(user, game):
                 "status": "success",
                 "message": "Insurance placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "INSURANCE_PROCESSED",
             }
         ),
@@ -479,7 +1140,7 @@ def hit(user, game):
                 "status": "success",
                 "tokens": user.tokens,
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "HIT_RECIEVED",
             }
         ),
@@ -487,6 +1148,72 @@ def hit(user, game):
     )
 
 
+@cache
+def strategy_table():
+    """Az asztal EV táblája, vagy ``None``, ha a paklisszámhoz nincs.
+
+    Nem minden paklisszámhoz van tábla: ilyenkor csak a tipp nem érhető el.
+    """
+    try:
+        return load_table(STRATEGY_TABLE_PATH, TABLE_RULES.num_decks)
+    except ValueError as e:
+        app.logger.warning("Strategy hints are disabled: %s", e)
+        return None
+
+
+# 6/a
+@app.route("/api/strategy_hint", methods=["POST"])
+@api_error_handler
+@login_required
+def strategy_hint(user):
+    table = strategy_table()
+    if table is None:
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Strategy hints are not available for this table.",
+                    "game_state_hint": "STRATEGY_HINT_UNAVAILABLE",
+                }
+            ),
+            501,
+        )
+
+    if not has_game_state(user):
+        raise ValueError("Game state not initialized.")
+
+    game = load_game(user, strict=False)
+    release_game(user, game)
+    hand = game.player.hand
+    masked = game.dealer_masked.hand
+
+    if not game.is_round_active or len(masked) < 2 or hand.total > 21:
+        raise ValueError("No active hand.")
+
+    action, ev = table.hint(
+        hand,
+        CARD_VALUE[masked[1]],
+        can_double=user.tokens >= game.get_bet(),
+        can_split=game.player.can_split
+        and len(game.players) <= 3
+        and user.tokens >= game.get_bet(),
+        split=bool(game.players),
+    )
+
+    return (
+        jsonify(
+            {
+                "status": "success",
+                "action": action,
+                "ev": round(ev, 4),
+                "current_tokens": user.tokens,
+                "game_state_hint": "STRATEGY_HINT",
+            }
+        ),
+        200,
+    )
+
+
 # 7
 @app.route("/api/double_request", methods=["POST"])
 @api_error_handler
@@ -509,7 +1236,7 @@ def double_request(user, game):
                 "message": "Double placed successfully.",
                 "double_amount": amount_deducted,
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "DOUBLE_RECIEVED",
             }
         ),
@@ -527,12 +1254,8 @@ def stand_and_rewards(user, game):
     token_change = game.rewards()
     user.tokens += token_change
 
-    game_data = GameSerializer.serialize_by_context(game, request.path)
-
-    if user.tokens <= 0:
-        game_data["pre_phase"] = PhaseState.OUT_OF_TOKENS.value
-    else:
-        game_data["pre_phase"] = PhaseState.BETTING.value
+    pre_phase = PhaseState.OUT_OF_TOKENS if user.tokens <= 0 else PhaseState.BETTING
+    game_data = game_view(game, pre_phase=pre_phase.value)
 
     return (
         jsonify(
@@ -560,7 +1283,7 @@ def split_request(user, game):
     if user.tokens < bet_amount:
         raise ValueError("Insufficient tokens.")
 
-    if not game.can_split(game.player["hand"]) or len(game.players) > 3:
+    if not game.can_split(game.player.hand) or len(game.players) > 3:
         raise ValueError("Split not possible.")
 
     game.split_hand()
@@ -572,7 +1295,7 @@ def split_request(user, game):
                 "status": "success",
                 "message": "Split hand placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "SPLIT_SUCCESS",
             }
         ),
@@ -594,7 +1317,7 @@ def add_to_players_list_by_stand(user, game):
                 "status": "success",
                 "message": "Split hand placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "NEXT_SPLIT_HAND_ACTIVATED",
             }
         ),
@@ -619,7 +1342,7 @@ def add_split_player_to_game(user, game):
                 "status": "success",
                 "message": "Split hand placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "NEXT_SPLIT_HAND_ACTIVATED",
             }
         ),
@@ -644,7 +1367,7 @@ def add_player_from_players(user, game):
                 "status": "success",
                 "message": "Split hand placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "NEXT_SPLIT_HAND_ACTIVATED",
             }
         ),
@@ -666,7 +1389,7 @@ def split_hit(user, game):
                 "status": "success",
                 "tokens": user.tokens,
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "HIT_RECIEVED",
             }
         ),
@@ -695,7 +1418,7 @@ def split_double_request(user, game):
                 "status": "success",
                 "message": "Double placed successfully.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "DOUBLE_RECIEVED",
             }
         ),
@@ -713,12 +1436,11 @@ def split_stand_and_rewards(user, game):
     token_change = game.rewards()
     user.tokens += token_change
 
-    game_data = GameSerializer.serialize_by_context(game, request.path)
-
-    game_data["pre_phase"] = (
-            PhaseState.OUT_OF_TOKENS.value if user.tokens <= 0 and (not game_data["players"] or len(game_data["players"]) == 0) else
-            PhaseState.BETTING.value
-        )
+    pre_phase = (
+        PhaseState.OUT_OF_TOKENS if user.tokens <= 0 and not game.players else
+        PhaseState.BETTING
+    )
+    game_data = game_view(game, pre_phase=pre_phase.value)
 
     return (
         jsonify(
@@ -749,7 +1471,7 @@ def set_restart(user, game):
             {
                 "status": "success",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "HIT_RESTART",
             }
         ),
@@ -766,20 +1488,24 @@ def force_restart_by_client_id(user):
     session["user_id"] = user.id
     session.permanent = True
 
-    game = Game()
+    game = Game(TABLE_RULES)
     game.restart_game()
 
-    user.current_game_state = game.serialize()
+    discard_game(user.id)
+    save_game(user, game)
     user.idempotency_key = None
+    token = state_token_for(user, game)
 
-    db.session.commit()
+    with stage("commit"):
+        db.session.commit()
+    attach_state_token(token)
 
     return (
         jsonify(
             {
                 "status": "success",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "FORCE_RESTART_SUCCESSFUL",
             }
         ),
@@ -794,9 +1520,6 @@ def force_restart_by_client_id(user):
 @with_game_state
 def recover_game_state(user, game):
     game.is_session_init = False
-    user.current_game_state = game.serialize()
-
-    db.session.commit()
 
     return (
         jsonify(
@@ -804,7 +1527,7 @@ def recover_game_state(user, game):
                 "status": "success",
                 "message": "Game state recovered.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "RECOVERY_DATA_LOADED",
             }
         ),
@@ -829,7 +1552,7 @@ def clear_game_state(user, game):
                 "status": "success",
                 "message": "Game state cleared.",
                 "current_tokens": user.tokens,
-                "game_state": GameSerializer.serialize_by_context(game, request.path),
+                "game_state": game_view(game),
                 "game_state_hint": "GAME STATE CLEARED",
             }
         ),
@@ -838,6 +1561,141 @@ def clear_game_state(user, game):
 
 
 # 20
+@app.route("/api/actions", methods=["POST"])
+@api_error_handler
+@login_required
+def actions(user):
+    """Több akció egy kérésben: egy deszerializálás, egy mentés, egy commit.
+
+    Body: ``{"actions": [{"action": "bet", "bet": 10}, {"action": "create_deck"},
+    ...], "idempotency_key": "..."}``. Az első hibánál megáll; az addig
+    sikeres lépések eredménye mentésre kerül, a hibás lépésé nem: a kezdő
+    állapotra újrajátszva (``game_events.REPLAY``), így lépésenként nincs
+    szerializálás. Az idempotencia-kulcs csak teljes siker után rögzül.
+    """
+    data = request.get_json(silent=True) or {}
+    steps = data.get("actions")
+
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("No actions given.")
+    if len(steps) > MAX_BATCH_ACTIONS:
+        raise ValueError(f"At most {MAX_BATCH_ACTIONS} actions per request.")
+    for step in steps:
+        if not isinstance(step, dict) or step.get("action") not in GAME_ACTIONS:
+            raise ValueError(f"Unknown action: {step}")
+
+    if not has_game_state(user):
+        return missing_game_state()
+
+    ikey = data.get("idempotency_key")
+    game = load_game(user)
+
+    if ikey and user.idempotency_key == ikey:
+        release_game(user, game)
+        attach_state_token(state_token_for(user, game))
+        g.action_endpoint = steps[-1]["action"]
+        return (
+            jsonify(
+                {
+                    "status": "success",
+                    "idempotent": True,
+                    "current_tokens": user.tokens,
+                    "results": [],
+                    "game_state": game_view(game),
+                }
+            ),
+            200,
+        )
+
+    results = []
+    events = []
+    error = None
+    with stage("serialize"):
+        saved_state = game.serialize()
+    tokens_before = saved_tokens = user.tokens
+
+    for step in steps:
+        name = step["action"]
+        g.action_endpoint = name
+        g.action_data = step
+        try:
+            with stage("engine"):
+                response, _ = GAME_ACTIONS[name](user=user, game=game)
+        except ValueError as e:
+            error = {"action": name, "status": "error", "message": str(e)}
+            break
+        results.append({"action": name, **response.get_json()})
+        events.append(game_event(name, game, step, user))
+        saved_tokens = user.tokens
+
+    if error:
+        # A hibás lépés félbehagyhatta a játékot: kezdő állapot + a sikeres lépések
+        with stage("deserialize"):
+            game = replay(
+                Game.deserialize(saved_state), ((a, d) for a, d, _ in events)
+            )
+        user.tokens = saved_tokens
+    if results:
+        save_game(
+            user,
+            game,
+            flush=user.tokens != tokens_before or not game.is_round_active,
+            events=events,
+        )
+    else:
+        # Nincs mit menteni; mentésnél a save_game már visszatette a játékot
+        release_game(user, game)
+    if ikey and not error:
+        user.idempotency_key = ikey
+    token = state_token_for(user, game)
+    with stage("commit"):
+        db.session.commit()
+    attach_state_token(token)
+
+    if error:
+        results.append(error)
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": error["message"],
+                    "current_tokens": user.tokens,
+                    "results": results,
+                    "game_state_hint": "CLIENT_ERROR_SPECIFIC",
+                }
+            ),
+            400,
+        )
+
+    return (
+        jsonify(
+            {
+                "status": "success",
+                "current_tokens": user.tokens,
+                "results": results,
+                "game_state_hint": "ACTIONS_PROCESSED",
+            }
+        ),
+        200,
+    )
+
+
+# 21
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    if request_metrics is None:
+        return jsonify({"error": "Metrics are disabled."}), 404
+    authorization = request.headers.get("Authorization", "").encode()
+    if not hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}".encode()):
+        return jsonify({"error": "Unauthorized."}), 401
+
+    body = request_metrics.render()
+    if shoe_pool is not None:
+        body += render_shoe_pool(shoe_pool)
+    return app.response_class(body, mimetype="text/plain; version=0.0.4")
+
+
+# 22
 @app.route("/error_page", methods=["GET"])
 def error_page():
     return render_template("error.html")
@@ -0,0 +1,54 @@
+"""Kompakt kártya reprezentáció.
+
+Minden lap egy kis egész szám (0-51): ``suit_index * 13 + rank_index``.
+A motor kizárólag ezekkel dolgozik, a ``"♥10"`` alakú szöveg csak a
+kliens felé menő válaszokban jelenik meg (``card_labels``).
+"""
+
+SUITS = ("♥", "♦", "♣", "♠")
+RANKS = ("A", "K", "Q", "J", "2", "3", "4", "5", "6", "7", "8", "9", "10")
+RANK_VALUES = (1, 10, 10, 10, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+CARDS_IN_SUIT = len(RANKS)
+CARDS_IN_DECK = len(SUITS) * CARDS_IN_SUIT
+
+ACE = 0
+# A dealer lefordított lapja: külön kód, hogy a táblázatokkal is indexelhető legyen
+MASKED_CARD = CARDS_IN_DECK
+MASKED_LABEL = " ✪ "
+
+# Lookup táblák, a kártya kódjával indexelve
+CARD_RANK = tuple(card % CARDS_IN_SUIT for card in range(CARDS_IN_DECK)) + (-1,)
+CARD_VALUE = tuple(RANK_VALUES[rank] for rank in CARD_RANK[:CARDS_IN_DECK]) + (0,)
+CARD_LABELS = tuple(
+    f"{SUITS[card // CARDS_IN_SUIT]}{RANKS[card % CARDS_IN_SUIT]}"
+    for card in range(CARDS_IN_DECK)
+) + (MASKED_LABEL,)
+
+LABEL_TO_CARD = {label: card for card, label in enumerate(CARD_LABELS)}
+
+SINGLE_DECK = tuple(range(CARDS_IN_DECK))
+
+
+def card_labels(hand):
+    """A kliens által várt szöveges alak (pl. ``["♥A", "♠10"]``)."""
+    return [CARD_LABELS[card] for card in hand]
+
+
+def parse_card(card):
+    """Régi (szöveges) vagy új (egész) lapot egész kóddá alakít."""
+    if isinstance(card, int):
+        return card
+    if card.strip() == MASKED_LABEL.strip():
+        return MASKED_CARD
+    return LABEL_TO_CARD[card]
+
+
+def parse_hand(hand):
+    if hand and isinstance(hand[0], str):
+        return [parse_card(card) for card in hand]
+    return hand
+
+
+def is_ace(card):
+    return CARD_RANK[card] == ACE
@@ -0,0 +1,102 @@
+"""Delta válaszok: a kliensnek csak a megváltozott ``game_state`` mezők.
+
+A worker megjegyzi a userenként utoljára elküldött nézetet egy
+nézet-verzióval (``X-View-Version`` válaszfejléc). Ha a kliens a
+következő kérésben visszaküldi a nála lévő verziót
+(``X-Client-View-Version``), és az egyezik a megjegyzettel, a
+``game_state`` egy patch::
+
+    {"delta_base": 17, "patch": {...}, "unset": [["player", "x"], ...]}
+
+A kliens a ``patch``-et rekurzívan ráolvasztja a nála lévő nézetre (a
+dict értékek összefésülődnek, minden más érték felülír), majd törli az
+``unset`` útvonalakat. Eltérő vagy ismeretlen verzió (más worker,
+kilakoltatott bejegyzés) esetén a teljes nézet megy. Ha a válaszban
+nincs ``X-View-Version`` fejléc (pl. hiba), a kliens a következő
+kérésben ne küldjön verziót.
+
+A nézet-verzió a nézet tartalmának hash-e (48 bit, JavaScriptben is
+pontos egész), független a game_states verziójától. Egyező verzió
+egyező tartalmat jelent, így a patch alapja akkor is helyes, ha a
+kliens verzióját egy másik worker adta ki.
+"""
+
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+import msgspec
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder()
+
+
+def view_patch(old, new, path=()):
+    """``(patch, unset)``: a ``new`` nézethez vivő változások."""
+    patch = {}
+    unset = [[*path, key] for key in old if key not in new]
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        previous = old[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            sub_patch, sub_unset = view_patch(previous, value, (*path, key))
+            if sub_patch:
+                patch[key] = sub_patch
+            unset.extend(sub_unset)
+        elif previous != value:
+            patch[key] = value
+    return patch, unset
+
+
+def delta_view(old, new, base):
+    """A küldendő ``game_state``: patch, vagy a teljes nézet, ha nem éri meg."""
+    patch, unset = view_patch(old, new)
+    if len(patch) >= len(new):
+        # Minden felső szintű mező változott (pl. új kör)
+        return new
+    return {"delta_base": base, "patch": patch, "unset": unset}
+
+
+def view_version(packed):
+    """A msgpack alakú nézet tartalom szerinti verziója."""
+    return int.from_bytes(hashlib.blake2b(packed, digest_size=6).digest(), "big")
+
+
+class ViewCache:
+    """Userenként az utoljára elküldött nézet (LRU, ``size`` bejegyzés)."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        """A ``version`` verziójú nézet, vagy ``None``."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(user_id)
+            packed = entry[1]
+        return _decoder.decode(packed)
+
+    def put(self, user_id, view):
+        """Megjegyzi a nézetet (másolatként), és visszaadja a verzióját."""
+        packed = _encoder.encode(view)
+        version = view_version(packed)
+        with self._lock:
+            self._entries[user_id] = (version, packed)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return version
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._entries)
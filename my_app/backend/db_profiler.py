@@ -0,0 +1,159 @@
+"""Opcionális adatbázis-profiler SQLAlchemy engine eseményekre.
+
+Kérésenként gyűjti az utasítások számát, a teljes DB időt, a
+leglassabb utasítást, a commitok számát, és hogy a játékállapot
+dokumentuma (``game_states.state`` vagy a régi
+``my_users.current_game_state``) újraíródott-e. A keretet
+(``budget_ms`` vagy ``max_statements``) túllépő kéréseket megjelöli,
+ezekből ``sample_rate`` arányban naplóz, és a legrosszabb ``keep``
+darabot a memóriában tartja (``worst()``).
+
+A kérés határait a hívó jelzi (``start`` / ``finish``); a jelzések
+között az aktuális szál (context) utasításai számítanak.
+"""
+
+import heapq
+import logging
+import random
+import re
+import threading
+import time
+
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Az állapotot író utasítások: (tábla, oszlop)
+STATE_COLUMNS = (("game_states", "state"), ("my_users", "current_game_state"))
+
+_current = ContextVar("db_profile", default=None)
+
+
+def _state_write_pattern(columns):
+    parts = []
+    for table, column in columns:
+        parts.append(rf"UPDATE\s+{table}\s+SET\b.*\b{column}\s*=")
+        parts.append(rf"INSERT\s+INTO\s+{table}\s*\([^)]*\b{column}\b")
+    return re.compile("|".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+class RequestProfile:
+    __slots__ = (
+        "endpoint",
+        "statements",
+        "commits",
+        "db_time",
+        "slowest",
+        "slowest_time",
+        "state_written",
+        "over_budget",
+    )
+
+    def __init__(self):
+        self.endpoint = None
+        self.statements = 0
+        self.commits = 0
+        self.db_time = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+        self.state_written = False
+        self.over_budget = False
+
+    def as_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "statements": self.statements,
+            "commits": self.commits,
+            "db_ms": round(self.db_time * 1000, 3),
+            "slowest_ms": round(self.slowest_time * 1000, 3),
+            "slowest": self.slowest,
+            "state_written": self.state_written,
+            "over_budget": self.over_budget,
+        }
+
+
+class DBProfiler:
+    def __init__(
+        self,
+        engine,
+        budget_ms=50.0,
+        max_statements=5,
+        sample_rate=1.0,
+        keep=20,
+        state_columns=STATE_COLUMNS,
+        logger=None,
+    ):
+        self.budget = budget_ms / 1000
+        self.max_statements = max_statements
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.log = logger or logging.getLogger(__name__)
+        self._state_write = _state_write_pattern(state_columns)
+        self._worst = []  # min-heap: (db_time, sorszám, profil)
+        self._seq = 0
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "commit", self._commit)
+
+    # --- engine események ---------------------------------------------
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        if profile is None:
+            return
+        elapsed = time.perf_counter() - conn.info["profile_started"].pop()
+        profile.statements += 1
+        profile.db_time += elapsed
+        if elapsed >= profile.slowest_time:
+            profile.slowest_time = elapsed
+            profile.slowest = " ".join(statement.split())
+        if not profile.state_written and self._state_write.search(statement):
+            profile.state_written = True
+
+    def _commit(self, conn):
+        profile = _current.get()
+        if profile is not None:
+            profile.commits += 1
+
+    # --- kérés határai ------------------------------------------------
+    def start(self):
+        profile = RequestProfile()
+        _current.set(profile)
+        return profile
+
+    def finish(self, endpoint):
+        """A kérés profilja (``None``, ha nem volt ``start``)."""
+        profile = _current.get()
+        if profile is None:
+            return None
+        _current.set(None)
+        profile.endpoint = endpoint
+        profile.over_budget = (
+            profile.db_time > self.budget or profile.statements > self.max_statements
+        )
+        if profile.over_budget:
+            self._remember(profile)
+            if self._random.random() < self.sample_rate:
+                self.log.warning("DB budget exceeded: %s", profile.as_dict())
+        return profile
+
+    def _remember(self, profile):
+        with self._lock:
+            self._seq += 1
+            item = (profile.db_time, self._seq, profile)
+            if len(self._worst) < self.keep:
+                heapq.heappush(self._worst, item)
+            else:
+                heapq.heappushpop(self._worst, item)
+
+    def worst(self):
+        """A keretet túllépő, legtöbb DB időt igénylő kérések, csökkenő sorrendben."""
+        with self._lock:
+            items = sorted(self._worst, reverse=True)
+        return [profile.as_dict() for _, _, profile in items]
@@ -0,0 +1,89 @@
+"""A dealer végső összegének eloszlása felfordított lap és cipőösszetétel szerint.
+
+Az összetétel (``composition``) egy 10 elemű tuple: az 1 (ász) ... 10
+értékű, még nem látott lapok darabszáma. A dealer minden 17-nél megáll
+(``Game.stand``), és nincs "peek", ezért a két lapos 21 (blackjack)
+külön kimenetként szerepel.
+
+Az eredményt egy korlátos LRU cache tárolja ``(upcard, composition)``
+kulccsal, mert a biztosítás- és stratégiaszámítások ugyanazokat az
+összetételeket sokszor kérdezik le.
+"""
+
+from functools import lru_cache
+
+from my_app.backend.cards import CARD_VALUE, SINGLE_DECK
+
+DEALER_STANDS_ON = 17
+BLACKJACK_LIMIT = 21
+DEALER_CACHE_SIZE = 4096
+
+OUTCOME_LABELS = ("17", "18", "19", "20", "21", "bust", "blackjack")
+BUST = 5
+BLACKJACK = 6
+
+
+def shoe_composition(num_decks):
+    """Egy teli, ``num_decks`` paklis cipő összetétele."""
+    counts = [0] * 10
+    for card in SINGLE_DECK:
+        counts[CARD_VALUE[card] - 1] += num_decks
+    return tuple(counts)
+
+
+# Kártyakód -> érték bájtként (bytes.translate tábla)
+_VALUE_TABLE = bytes(CARD_VALUE) + bytes(256 - len(CARD_VALUE))
+
+
+def cards_composition(cards):
+    """Kártyakódok (pl. a cipő hátralévő része) összetétele.
+
+    A számolás C szinten fut (``translate`` + ``count``), így a cipő
+    méretétől alig függ.
+    """
+    values = bytes(cards).translate(_VALUE_TABLE)
+    return tuple(values.count(value) for value in range(1, 11))
+
+
+@lru_cache(maxsize=DEALER_CACHE_SIZE)
+def dealer_outcomes(upcard, composition):
+    """``(P17, P18, P19, P20, P21, P_bust, P_blackjack)`` az ``upcard`` értékhez
+    (ász = 1); a ``composition`` a dealer rejtett lapját is tartalmazza."""
+    memo = {}
+    return tuple(_play(upcard, upcard == 1, 1, tuple(composition), memo))
+
+
+def _play(hard, has_ace, ncards, composition, memo):
+    total = hard + 10 if has_ace and hard + 10 <= BLACKJACK_LIMIT else hard
+    result = [0.0] * len(OUTCOME_LABELS)
+    if total >= DEALER_STANDS_ON:
+        if total > BLACKJACK_LIMIT:
+            result[BUST] = 1.0
+        elif total == BLACKJACK_LIMIT and ncards == 2:
+            result[BLACKJACK] = 1.0
+        else:
+            result[total - DEALER_STANDS_ON] = 1.0
+        return result
+
+    key = (hard, has_ace, min(ncards, 3), composition)
+    if key in memo:
+        return memo[key]
+
+    remaining = sum(composition)
+    if remaining:
+        for index, count in enumerate(composition):
+            if not count:
+                continue
+            value = index + 1
+            rest = composition[:index] + (count - 1,) + composition[index + 1 :]
+            sub = _play(hard + value, has_ace or value == 1, ncards + 1, rest, memo)
+            weight = count / remaining
+            for outcome, p in enumerate(sub):
+                result[outcome] += weight * p
+
+    memo[key] = result
+    return result
+
+
+def dealer_outcome_map(upcard, composition):
+    return dict(zip(OUTCOME_LABELS, dealer_outcomes(upcard, tuple(composition))))
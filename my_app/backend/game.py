@@ -1,69 +1,47 @@
 import copy
 import math
-import random
 
-from collections import Counter
-from typing import Any, Dict
+from typing import Dict
 
+import msgspec
+
+from my_app.backend.cards import CARD_VALUE, MASKED_CARD, is_ace, parse_hand
+from my_app.backend.dealer_odds import dealer_outcome_map
+from my_app.backend.game_state import STATE_VERSION, GameState
+from my_app.backend.hand import DealerMasked, DealerUnmasked, Hand, PlayerHand
 from my_app.backend.hand_state import HandState
 from my_app.backend.phase_state import PhaseState
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import DEFAULT_RULES
 from my_app.backend.winner_state import WinnerState
 
 
 
 class Game:
     NONE = 0
-    NUM_DECKS = 2
     CARDS_IN_DECK = 52
-    TOTAL_INITIAL_CARDS = NUM_DECKS * CARDS_IN_DECK
+    # Az alapértelmezett asztal cipője; a játék a saját ``rules``-át használja
+    TOTAL_INITIAL_CARDS = DEFAULT_RULES.shoe_size
     BJ_IMMEDIATE_STOP = {WinnerState.BLACKJACK_PLAYER_WON, WinnerState.BLACKJACK_PUSH}
 
-    def __init__(self):
-        self.player: Dict[str, Any] = {
-            "id": Game.NONE,
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "can_split": False,
-            "stated": False,
-            "bet": 0,
-            "has_hit": 0,
-        }
-        self.dealer_masked: Dict[str, Any] = {
-            "hand": [],
-            "sum": 0,
-            "can_insure": False,
-        }
-        self.dealer_unmasked: Dict[str, Any] = {
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "natural_21": WinnerState.NONE,
-        }
-        self.split_player: Dict[str, Any] = {
-            "id": Game.NONE,
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "can_split": False,
-            "stated": False,
-            "bet": 0,
-            "has_hit": 0,
-        }
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = rules
+        self.player = PlayerHand()
+        self.dealer_masked = DealerMasked()
+        self.dealer_unmasked = DealerUnmasked()
+        self.split_player = PlayerHand()
         self.natural_21 = WinnerState.NONE
         self.aces = False
         self.winner = WinnerState.NONE
         self.hand_counter: int = 0  # helper for the players dict
-        self.players: Dict[str, Dict[str, Any]] = {}
+        self.players: Dict[str, PlayerHand] = {}
         self.players_index = {}  # helper for the players dict
         self.stated = False
         self.split_req: int = 0
         self.unmasked_sum_sent = False
-        self.suits = ["♥", "♦", "♣", "♠"]
-        self.ranks = ["A", "K", "Q", "J", "2", "3", "4", "5", "6", "7", "8", "9", "10"]
-        # self.ranks = ["A", "K", "K", "K", "9", "10"]
-        self.deck = []
-        self.deck_len_init = Game.TOTAL_INITIAL_CARDS
+        # Az utolsó lépés válaszában az osztó összege még rejtett (nem mentődik)
+        self.dealer_sum_hidden = False
+        self.shoe = Shoe()
         self.bet: int = 0
         self.bet_list = []
         self.is_round_active = False
@@ -74,23 +52,23 @@ class Game:
     def initialize_new_round(self):
         self.clear_up()
 
-        card1 = self.deck.pop(0)
-        card2 = self.deck.pop(0)
-        card3 = self.deck.pop(0)
-        card4 = self.deck.pop(0)
+        card1 = self.shoe.draw()
+        card2 = self.shoe.draw()
+        card3 = self.shoe.draw()
+        card4 = self.shoe.draw()
         
-        player_hand = [card1, card3]
-        dealer_hand = [card2, card4]
-        dealer_masked = [" ✪ ", card4]
+        player_hand = Hand([card1, card3])
+        dealer_hand = Hand([card2, card4])
+        dealer_masked = Hand([MASKED_CARD, card4])
 
-        player_sum = self.sum(player_hand, True)
-        dealer_masked_sum = self.sum([card4], False)
-        dealer_unmasked_sum = self.sum(dealer_hand, False)
+        player_sum = player_hand.total
+        dealer_masked_sum = dealer_masked.total
+        dealer_unmasked_sum = dealer_hand.total
 
         self.natural_21 = self.init_natural_21_state(player_hand, dealer_hand)
 
-        can_split = self.can_split(player_hand)
-        can_insure = card4[-1] == "A"
+        can_split = player_hand.is_pair()
+        can_insure = is_ace(card4)
 
         player_state = (
             self.hand_state(player_sum, True) if player_sum == 21 else HandState.NONE
@@ -109,47 +87,31 @@ class Game:
             else PhaseState.MAIN_TURN
         )
 
-        self.aces = True if card1[-1] == "A" and card3[-1] == "A" else False
-
-        self.player = {
-            "id": self._generate_sequential_id(),
-            "hand": player_hand,
-            "sum": player_sum,
-            "hand_state": player_state,
-            "can_split": can_split,
-            "stated": self.stated,
-            "bet": bet,
-            "has_hit": 0,
-        }
-        self.dealer_masked: Dict[str, Any] = {
-            "hand": dealer_masked,
-            "sum": dealer_masked_sum,
-            "can_insure": can_insure,
-        }
-        self.dealer_unmasked: Dict[str, Any] = {
-            "hand": dealer_hand,
-            "sum": dealer_unmasked_sum,
-            "hand_state": dealer_unmasked_state,
-            "natural_21": self.natural_21,
-        }
+        self.aces = is_ace(card1) and is_ace(card3)
+
+        self.player = PlayerHand(
+            id=self._generate_sequential_id(),
+            hand=player_hand,
+            sum=player_sum,
+            hand_state=player_state,
+            can_split=can_split,
+            stated=self.stated,
+            bet=bet,
+        )
+        self.dealer_masked = DealerMasked(
+            hand=dealer_masked,
+            sum=dealer_masked_sum,
+            can_insure=can_insure,
+        )
+        self.dealer_unmasked = DealerUnmasked(
+            hand=dealer_hand,
+            sum=dealer_unmasked_sum,
+            hand_state=dealer_unmasked_state,
+            natural_21=self.natural_21,
+        )
 
     def sum(self, hand, is_player):
-        ranks = self.hand_to_ranks(hand)
-        counts = Counter(ranks)
-        nums_of_ace = counts["A"]
-        res = 0
-        BLACKJACK_LIMIT = 21
-        for rank in ranks:
-            if rank in ["K", "Q", "J", "0"]:
-                res += 10
-            elif rank.isdigit():
-                res += int(rank)
-        if nums_of_ace > 0:
-            for _ in range(nums_of_ace):
-                if res + 11 <= BLACKJACK_LIMIT:
-                    res += 11
-                else:
-                    res += 1
+        res = hand.total
         if is_player:
             self.set_player_sum(res)
         else:
@@ -158,8 +120,8 @@ class Game:
         return res
 
     def init_natural_21_state(self, player_hand, dealer_hand):
-        player_natural = self.sum(player_hand, True) == 21 and len(player_hand) == 2
-        dealer_natural = self.sum(dealer_hand, False) == 21 and len(dealer_hand) == 2
+        player_natural = player_hand.is_natural()
+        dealer_natural = dealer_hand.is_natural()
 
         if player_natural and dealer_natural:
             self.natural_21 = WinnerState.BLACKJACK_PUSH
@@ -195,8 +157,8 @@ class Game:
         return state
 
     def winner_state(self):
-        player = self.player["sum"]
-        dealer = self.dealer_unmasked["sum"]
+        player = self.player.sum
+        dealer = self.dealer_unmasked.sum
 
         if player > 21:
             self.winner = WinnerState.PLAYER_LOST
@@ -218,12 +180,12 @@ class Game:
     def hit(self, is_double, has_split):
         if not self.is_round_active:
             return
-        new_card = self.deck.pop(0)
+        new_card = self.shoe.draw()
         self.set_player_hand(new_card)
-        self.player["has_hit"] = self.player.get("has_hit", 0) + 1
+        self.player.has_hit += 1
 
-        curr_sum = self.sum(self.player["hand"], True)
-        self.player["sum"] = curr_sum
+        curr_sum = self.player.hand.total
+        self.player.sum = curr_sum
 
         if not has_split:
             self.target_phase = (
@@ -237,24 +199,23 @@ class Game:
             elif curr_sum >= 21:
                 self.target_phase = (
                     PhaseState.SPLIT_STAND_DOUBLE
-                    if self.player.get("has_hit") == 1
+                    if self.player.has_hit == 1
                     else PhaseState.SPLIT_STAND
                 )
             else:
                 self.target_phase = PhaseState.SPLIT_TURN
 
     def stand(self, has_split):
-        count = self.sum(self.dealer_unmasked["hand"], False)
-        if self.sum(self.player["hand"], True) <= 21:
+        dealer_hand = self.dealer_unmasked.hand
+        count = dealer_hand.total
+        if self.player.hand.total <= 21:
             while count < 17:
-                card = self.deck.pop(0)
-                self.dealer_unmasked["hand"].append(card)
-                count = self.sum(self.dealer_unmasked["hand"], False)
-                self.dealer_unmasked["sum"] = count
-
-        self.dealer_unmasked["sum"] = count
-        self.dealer_unmasked["hand_state"] = self.hand_state(count, False)
-        self.player["hand_state"] = self.hand_state(self.player["sum"], True)
+                dealer_hand.add(self.shoe.draw())
+                count = dealer_hand.total
+
+        self.dealer_unmasked.sum = count
+        self.dealer_unmasked.hand_state = self.hand_state(count, False)
+        self.player.hand_state = self.hand_state(self.player.sum, True)
         self.winner = Game.NONE
         self.winner = self.winner_state()
 
@@ -263,8 +224,8 @@ class Game:
         )
 
     def rewards(self) -> int:
-        bet = self.player["bet"]
-        natural_21_scenario = self.dealer_unmasked["natural_21"]
+        bet = self.player.bet
+        natural_21_scenario = self.dealer_unmasked.natural_21
         reward_amount = 0  # Alapértelmezett érték: 0 (veszteség)
 
         if self.natural_21 == 1:
@@ -293,12 +254,12 @@ class Game:
     def insurance_request(self):
         ins_cost = math.ceil(self.bet / 2)
 
-        if self.dealer_unmasked["natural_21"] == 3:
+        if self.dealer_unmasked.natural_21 == 3:
             bet = self.bet
             self.set_bet_to_null()
             self.set_bet_list_to_null()
             self.is_round_active = False
-            self.player["hand_state"] = self.hand_state(self.player["sum"], True)
+            self.player.hand_state = self.hand_state(self.player.sum, True)
             self.target_phase = PhaseState.MAIN_STAND
             self.pre_phase = PhaseState.BETTING
 
@@ -310,31 +271,31 @@ class Game:
             return -ins_cost
 
     def double_request(self):
-        self.player["bet"] += self.bet
+        self.player.bet += self.bet
 
         return self.bet
 
     def split_hand(self):
-        if not self.can_split(self.player["hand"]) or len(self.players) > 3:
+        if not self.can_split(self.player.hand) or len(self.players) > 3:
             return
 
-        old_id = self.player["id"]
-        card_to_split = self.player["hand"].pop(0)
-        new_hand1 = [card_to_split]
-        new_hand2 = [self.player["hand"].pop()]
+        old_id = self.player.id
+        card_to_split = self.player.hand.pop(0)
+        new_hand1 = Hand([card_to_split])
+        new_hand2 = Hand([self.player.hand.pop()])
 
         new_id_B = self._generate_sequential_id()
         new_hand = self.deal_card(new_hand1, True, hand_id=old_id)
         hand_to_list = self.deal_card(new_hand2, False, hand_id=new_id_B)
 
         self.player = new_hand
-        self.players[hand_to_list["id"]] = hand_to_list
-        old_id = self.player["id"]
+        self.players[hand_to_list.id] = hand_to_list
+        old_id = self.player.id
 
         self.players_index[old_id] = self.stated
         self.players_index[new_id_B] = self.stated
 
-        is_nat21 = self.player["hand_state"] == HandState.TWENTY_ONE
+        is_nat21 = self.player.hand_state == HandState.TWENTY_ONE
 
         self.set_split_req(1)
 
@@ -349,42 +310,45 @@ class Game:
         )
 
     def deal_card(self, hand, is_first, hand_id):
-        if self.deck and is_first:
-            hand.append(self.deck.pop(0))
+        if self.shoe and is_first:
+            hand.add(self.shoe.draw())
 
-        player_sum = self.sum(hand, True)
-        can_split = False if self.aces else self.can_split(hand)
+        player_sum = hand.total
+        can_split = False if self.aces else hand.is_pair()
         player_state = (
             self.hand_state(player_sum, True) if is_first else HandState.UNDER_21
         )
-        player = {
-            "id": hand_id,
-            "hand": hand,
-            "sum": player_sum,
-            "hand_state": player_state,
-            "can_split": can_split,
-            "stated": self.stated,
-            "bet": self.bet,
-            "has_hit": 0,
-        }
+        player = PlayerHand(
+            id=hand_id,
+            hand=hand,
+            sum=player_sum,
+            hand_state=player_state,
+            can_split=can_split,
+            stated=self.stated,
+            bet=self.bet,
+        )
 
         return player
 
     def add_to_players_list_by_stand(self):
         is_active = any(
-            hand_data.get("stated") is False for hand_data in self.players.values()
+            hand_data.stated is False for hand_data in self.players.values()
         )
 
         if is_active:
-            self.player["stated"] = True
-            self.players[self.player["id"]] = self.player
-            ID = self.player["id"]
+            self.player.stated = True
+            self.players[self.player.id] = self.player
+            ID = self.player.id
             self.players_index[ID] = True
 
         self.target_phase = (
             PhaseState.SPLIT_FINISH if self.split_req == 0 else
             PhaseState.SPLIT_ACE_TRANSIT # if self.aces
         )
+        # Az utolsó kéz után az osztó összege csak az első válaszban rejtett
+        self.dealer_sum_hidden = self.split_req == 0 and not self.unmasked_sum_sent
+        if self.dealer_sum_hidden:
+            self.unmasked_sum_sent = True
 
     def find_smallest_false_stated_id(self):
         if not self.players_index:
@@ -408,11 +372,11 @@ class Game:
             return None
 
         # ESET 1: VISSZATÖLTÉS (Cache Védelme a Strict Mode miatt)
-        if self.split_player and self.split_player.get("id") == hand_id:
+        if self.split_player and self.split_player.id == hand_id:
             self.player = copy.deepcopy(self.split_player)
 
         # ESET 2: Gyors kiút (A lap már be van töltve)
-        elif self.player and self.player.get("id") == hand_id:
+        elif self.player and self.player.id == hand_id:
             pass
 
         # ESET 3: ELSŐ FUTÁS (Lap kiemelése, mentés, és set_split_req)
@@ -423,18 +387,18 @@ class Game:
         else:
             return None
 
-        if len(self.player.get("hand", [])) < 2:
-            if self.deck:
-                card = self.deck.pop(0)
-                self.player["hand"].append(card)
+        if len(self.player.hand) < 2:
+            if self.shoe:
+                card = self.shoe.draw()
+                self.player.hand.add(card)
 
-        hand = self.player["hand"]
-        player_sum = self.sum(hand, True)
-        can_split = self.can_split(hand)
-        self.player["sum"] = player_sum
+        hand = self.player.hand
+        player_sum = hand.total
+        can_split = hand.is_pair()
+        self.player.sum = player_sum
         state = self.hand_state(player_sum, True)
-        self.player["hand_state"] = state
-        self.player["can_split"] = can_split
+        self.player.hand_state = state
+        self.player.can_split = can_split
 
         self.target_phase = (
             PhaseState.SPLIT_NAT21_TRANSIT  if not self.aces and state == HandState.TWENTY_ONE else
@@ -458,12 +422,14 @@ class Game:
 
         return self.player
 
-    def create_deck(self):
-        single_deck = [f"{suit}{rank}" for suit in self.suits for rank in self.ranks]
-        self.deck = single_deck * 2
-        random.shuffle(self.deck)
+    def create_deck(self, shoe=None, rules=None):
+        """Új cipő; ``shoe``: előre kevert (pl. a ShoePool-ból), ``rules``:
+        az asztal aktuális szabályai (a cipő mérete ezekből jön)."""
+        if rules is not None:
+            self.rules = rules
+        self.shoe = shoe if shoe is not None else Shoe.shuffled(self.rules.num_decks)
         self.target_phase = PhaseState.INIT_GAME
-        return self.deck
+        return self.shoe
 
     # helpers
     def _generate_sequential_id(self) -> str:
@@ -474,43 +440,16 @@ class Game:
 
     def sort_key_combined(self, hand):
         # False (asc) < True (asc)
-        stated_status = hand.get("stated", True)
-        hand_id = hand.get("id", "")
+        stated_status = hand.stated
+        hand_id = hand.id
 
         return (stated_status, hand_id)
 
     def clear_up(self):
-        self.player: Dict[str, Any] = {
-            "id": Game.NONE,
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "can_split": False,
-            "stated": False,
-            "bet": 0,
-            "has_hit": 0,
-        }
-        self.dealer_masked: Dict[str, Any] = {
-            "hand": [],
-            "sum": 0,
-            "can_insure": False,
-        }
-        self.dealer_unmasked: Dict[str, Any] = {
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "natural_21": WinnerState.NONE,
-        }
-        self.split_player: Dict[str, Any] = {
-            "id": Game.NONE,
-            "hand": [],
-            "sum": 0,
-            "hand_state": HandState.NONE,
-            "can_split": False,
-            "stated": False,
-            "bet": 0,
-            "has_hit": 0,
-        }
+        self.player = PlayerHand()
+        self.dealer_masked = DealerMasked()
+        self.dealer_unmasked = DealerUnmasked()
+        self.split_player = PlayerHand()
         self.aces = False
         self.natural_21 = WinnerState.NONE
         self.winner = WinnerState.NONE
@@ -519,63 +458,57 @@ class Game:
         self.players_index = {}
         self.split_req = 0
         self.unmasked_sum_sent = False
+        self.dealer_sum_hidden = False
         self.is_round_active = False
         self.target_phase = PhaseState.BETTING
         self.pre_phase = PhaseState.NONE
 
     def restart_game(self):
-        self.__init__()
-
-    def hand_to_ranks(self, hand):
-        return "".join(c[-1] for c in hand)
+        self.__init__(self.rules)
 
     def can_split(self, hand):
-        ranks = self.hand_to_ranks(hand)
-        tens = ["K", "Q", "J", "0"]
-
-        return len(ranks) == 2 and (
-            (ranks[0] == ranks[1]) or (ranks[0] in tens and ranks[1] in tens)
-        )
+        # Azonos érték elég: K-10, Q-J stb. is splittelhető
+        return hand.is_pair()
 
     def load_state_from_data(self, data):
         self.is_round_active = data.get("is_round_active", False)
 
     def clear_game_state(self):
-        self.__init__()
+        self.__init__(self.rules)
         self.target_phase = PhaseState.BETTING
 
     # getters, setters
     def set_player_hand(self, card):
-        self.player["hand"].append(card)
+        self.player.hand.add(card)
 
     def set_player_sum(self, sum):
-        self.player["sum"] = sum
+        self.player.sum = sum
 
     def set_dealer_sum(self, sum):
-        self.dealer_masked["sum"] = sum
+        self.dealer_masked.sum = sum
 
     def get_player_state(self):
-        return self.player["hand_state"]
+        return self.player.hand_state
 
     def set_player_state(self, state):
-        self.player["hand_state"] = state
+        self.player.hand_state = state
 
     def get_dealer_state(self):
-        return self.dealer_unmasked["hand_state"]
+        return self.dealer_unmasked.hand_state
 
     def set_dealer_state(self, state):
-        self.dealer_unmasked["hand_state"] = state
+        self.dealer_unmasked.hand_state = state
 
     def get_players(self):
         return self.players
 
     def set_bet(self, amount):
         self.bet += amount
-        self.player["bet"] = self.player["bet"] + amount
+        self.player.bet = self.player.bet + amount
 
     def set_bet_to_null(self):
         self.bet = 0
-        self.player["bet"] = 0
+        self.player.bet = 0
 
     def get_bet(self):
         return self.bet
@@ -595,12 +528,35 @@ class Game:
     def set_split_req(self, count):
         self.split_req += count
 
+    @property
+    def deck_len_init(self):
+        return self.rules.shoe_size
+
     def get_deck_len(self):
-        if len(self.deck) > 0:
-            return len(self.deck)
+        remaining = self.shoe.remaining()
+        if remaining > 0:
+            return remaining
         else:
             return self.deck_len_init
 
+    def needs_reshuffle(self):
+        """Új cipő kell-e a következő kör előtt: nincs (teli) cipő, új
+        session, vagy a cut card már kijött."""
+        if not self.is_round_active and self.is_session_init:
+            return True
+        remaining = self.get_deck_len()
+        return remaining == self.deck_len_init or self.rules.needs_reshuffle(remaining)
+
+    def dealer_odds(self):
+        """A dealer végső összegének eloszlása a játékos szemszögéből:
+        a rejtett lap visszakerül a még nem látott lapok közé."""
+        cards = self.dealer_unmasked.hand.cards
+        if len(cards) < 2:
+            return None
+        counts = list(self.shoe.composition())
+        counts[CARD_VALUE[cards[0]] - 1] += 1
+        return dealer_outcome_map(CARD_VALUE[cards[1]], counts)
+
     def get_is_round_active(self):
         return self.is_round_active
 
@@ -616,55 +572,101 @@ class Game:
 
     @staticmethod
     def _get_sort_key_combined(hand):
-        return (hand.get("hand_stated", True), hand.get("id", ""))
+        return hand.id
 
     def _get_sorted_hands(self):
         all_hands = list(self.players.values())
         return sorted(all_hands, key=self._get_sort_key_combined)
 
+    def to_state(self) -> GameState:
+        return GameState(
+            shoe=self.shoe.to_state(),
+            rules=self.rules,
+            player=self.player,
+            dealer_masked=self.dealer_masked,
+            dealer_unmasked=self.dealer_unmasked,
+            split_player=self.split_player,
+            aces=self.aces,
+            natural_21=self.natural_21,
+            winner=self.winner,
+            hand_counter=self.hand_counter,
+            players=self._get_sorted_hands(),
+            players_index=self.players_index,
+            split_req=self.split_req,
+            unmasked_sum_sent=self.unmasked_sum_sent,
+            bet=self.bet,
+            bet_list=self.bet_list,
+            is_round_active=self.is_round_active,
+            target_phase=self.get_target_phase(),
+            pre_phase=self.get_pre_phase(),
+            is_session_init=self.is_session_init,
+        )
+
+    @classmethod
+    def from_state(cls, state: GameState):
+        game = cls(state.rules)
+        game.shoe = Shoe.from_state(state.shoe)
+        game.player = state.player
+        game.dealer_masked = state.dealer_masked
+        game.dealer_unmasked = state.dealer_unmasked
+        game.split_player = state.split_player
+        game.aces = state.aces
+        game.natural_21 = state.natural_21
+        game.winner = state.winner
+        game.hand_counter = state.hand_counter
+        game.players = {hand.id: hand for hand in state.players}
+        game.players_index = state.players_index
+        game.split_req = state.split_req
+        game.unmasked_sum_sent = state.unmasked_sum_sent
+        game.bet = state.bet
+        game.bet_list = state.bet_list
+        game.is_round_active = state.is_round_active
+        game.target_phase = state.target_phase
+        game.pre_phase = state.pre_phase
+        game.is_session_init = state.is_session_init
+
+        return game
+
     def serialize(self):
-        sorted_players_list = self._get_sorted_hands()
-
-        return {
-            "deck": self.deck,
-            "player": self.player,
-            "dealer_masked": self.dealer_masked,
-            "dealer_unmasked": self.dealer_unmasked,
-            "split_player": self.split_player,
-            "aces": self.aces,
-            "natural_21": self.natural_21,
-            "winner": self.winner,
-            "hand_counter": self.hand_counter,
-            "players": sorted_players_list,
-            "players_index": self.players_index,
-            "split_req": self.split_req,
-            "unmasked_sum_sent": self.unmasked_sum_sent,
-            "deck_len": self.get_deck_len(),
-            "bet": self.bet,
-            "bet_list": self.bet_list,
-            "is_round_active": self.is_round_active,
-            "target_phase": self.get_target_phase().value,
-            "pre_phase": self.get_pre_phase().value,
-            "is_session_init": self.is_session_init,
-        }
+        return msgspec.to_builtins(self.to_state())
+
+    @staticmethod
+    def _load_hand(hand, hand_type):
+        if hand is None:
+            return None
+        # Régi mentésekben a kéz csak a lapok listája, akár szövegként
+        if isinstance(hand.get("hand"), list):
+            hand = {**hand, "hand": {"cards": parse_hand(hand["hand"])}}
+        return msgspec.convert(hand, hand_type)
 
     @classmethod
     def deserialize(cls, data):
+        if data.get("v") == STATE_VERSION:
+            return cls.from_state(msgspec.convert(data, GameState))
+        return cls._deserialize_legacy(data)
+
+    @classmethod
+    def _deserialize_legacy(cls, data):
         game = cls()
-        game.deck = data["deck"]
-        game.player = data["player"]
-        game.dealer_masked = data["dealer_masked"]
-        game.dealer_unmasked = data["dealer_unmasked"]
-        game.split_player = data["split_player"]
+        if "shoe" in data:
+            game.shoe = Shoe.from_state(data["shoe"])
+        else:
+            # Régi mentés: a teljes pakli listaként szerepel
+            game.shoe = Shoe(parse_hand(data["deck"]), data.get("deck_cursor", 0))
+        game.player = cls._load_hand(data["player"], PlayerHand)
+        game.dealer_masked = cls._load_hand(data["dealer_masked"], DealerMasked)
+        game.dealer_unmasked = cls._load_hand(data["dealer_unmasked"], DealerUnmasked)
+        game.split_player = cls._load_hand(data["split_player"], PlayerHand)
         game.aces = data["aces"]
         game.natural_21 = data["natural_21"]
         game.winner = data["winner"]
         game.hand_counter = data["hand_counter"]
-        game.players = {hand["id"]: hand for hand in data["players"]}
+        game.players = {
+            hand["id"]: cls._load_hand(hand, PlayerHand) for hand in data["players"]
+        }
         game.players_index = data.get("players_index", {})
         game.split_req = data["split_req"]
         game.unmasked_sum_sent = data["unmasked_sum_sent"]
-        game.deck_len = data["deck_len"]
         game.bet = data["bet"]
         game.bet_list = data["bet_list"]
         game.is_round_active = data.get("is_round_active", False)
@@ -0,0 +1,153 @@
+"""Worker-szintű LRU cache az élő ``Game`` objektumoknak.
+
+A kulcs a user id, az érvényességet a ``User.state_version`` adja: a
+cache-elt játék csak akkor használható, ha a verziója megegyezik a DB
+sorban lévővel (különben egy másik worker lépett közben).
+
+Egy kérés "kiveszi" a játékot (``checkout``), és a végén visszateszi
+(``checkin``), így ugyanazt az objektumot két szál nem módosítja
+egyszerre; egy kivett bejegyzésre érkező második kérés ``CacheBusy``-t
+kap. A "piszkos" (még nem mentett) bejegyzéseket a hívó menti
+kilakoltatáskor és eldobáskor (``checkin`` / ``discard`` visszatérési
+értéke), valamint időzítve (``start_flusher``).
+
+Az időzítő szál folyamatonként az első ``checkin``-kor indul; fork után
+(pre-fork szerver workerei) a gyermek üres cache-sel és saját szállal
+kezd.
+"""
+
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class CacheBusy(Exception):
+    """A játékot éppen egy másik kérés használja."""
+
+
+class _Entry:
+    __slots__ = ("version", "game", "dirty_since")
+
+    def __init__(self, version, game, dirty_since):
+        self.version = version
+        self.game = game
+        self.dirty_since = dirty_since  # None: a DB-ben lévő állapottal egyezik
+
+
+class GameCache:
+    def __init__(self, size):
+        self.size = size
+        self._flush_every = None  # (interval, flush), lásd start_flusher
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Új folyamat állapota: üres cache, az időzítő szál még nem fut."""
+        self._entries = OrderedDict()
+        self._out = {}  # éppen egy kérés által használt bejegyzések
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def checkout(self, user_id, version):
+        """A cache-elt játék, ha a verziója aktuális; egyébként ``None``."""
+        with self._lock:
+            if user_id in self._out:
+                raise CacheBusy(user_id)
+            entry = self._entries.pop(user_id, None)
+            if entry is None:
+                return None
+            if entry.version != version:
+                # Máshol módosult: a piszkos állapot is elavult, eldobjuk
+                return None
+            self._out[user_id] = entry
+            return entry.game
+
+    def is_dirty(self, user_id):
+        """Van-e a kivett játéknak még ki nem írt lépése."""
+        with self._lock:
+            entry = self._out.get(user_id)
+            return entry is not None and entry.dirty_since is not None
+
+    def checkin(self, user_id, version, game, dirty=None):
+        """Visszateszi a játékot; ``dirty=None`` esetén a korábbi jelzés marad.
+
+        A méretkorlát miatt kilakoltatott piszkos bejegyzéseket
+        ``(user_id, version, state)`` listaként adja vissza mentésre.
+        """
+        with self._lock:
+            if self._flush_every is not None and self._flusher is None:
+                self._flusher = self._run_flusher(*self._flush_every)
+            previous = self._out.pop(user_id, None)
+            if dirty is None:
+                dirty_since = previous.dirty_since if previous else None
+            elif dirty:
+                dirty_since = previous.dirty_since if previous else None
+                dirty_since = dirty_since or time.monotonic()
+            else:
+                dirty_since = None
+
+            self._entries[user_id] = _Entry(version, game, dirty_since)
+            self._entries.move_to_end(user_id)
+
+            evicted = []
+            while len(self._entries) > self.size:
+                key, entry = self._entries.popitem(last=False)
+                if entry.dirty_since is not None:
+                    evicted.append((key, entry.version, entry.game.serialize()))
+            return evicted
+
+    def discard(self, user_id):
+        """Eldobja a bejegyzést; a piszkos állapotot visszaadja mentésre.
+
+        Tétlen bejegyzésnél ``(user_id, version, state)``, mint a
+        ``checkin`` kilakoltatásnál. A kivett játék félig módosult lehet,
+        nem menthető: ilyenkor ``state=None`` jelzi, hogy a ki nem írt
+        lépései elvesznek.
+        """
+        with self._lock:
+            out = self._out.pop(user_id, None)
+            entry = out or self._entries.pop(user_id, None)
+            if entry is None or entry.dirty_since is None:
+                return []
+            state = None if out else entry.game.serialize()
+            return [(user_id, entry.version, state)]
+
+    def take_dirty(self, older_than):
+        """A legalább ``older_than`` másodperce piszkos bejegyzések mentett
+        alakja ``(user_id, version, state)``; a bejegyzések tisztának jelölve.
+
+        A szerializálás a zár alatt történik, így egy közben kivett és
+        módosított játék nem kerülhet félkész állapotban mentésre.
+        """
+        limit = time.monotonic() - older_than
+        with self._lock:
+            due = []
+            for key, entry in self._entries.items():
+                if entry.dirty_since is not None and entry.dirty_since <= limit:
+                    entry.dirty_since = None
+                    due.append((key, entry.version, entry.game.serialize()))
+            return due
+
+    def start_flusher(self, interval, flush):
+        """Időzített kiírás: ``interval`` másodpercenként ``flush(entries)``.
+
+        A háttérszál az első ``checkin``-kor indul, folyamatonként egyszer.
+        """
+        self._flush_every = (interval, flush)
+
+    def _run_flusher(self, interval, flush):
+        def run():
+            while True:
+                time.sleep(interval)
+                due = self.take_dirty(interval)
+                if due:
+                    flush(due)
+
+        thread = threading.Thread(target=run, name="game-cache-flusher", daemon=True)
+        thread.start()
+        return thread
+
+    def __len__(self):
+        return len(self._entries)
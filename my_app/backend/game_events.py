@@ -0,0 +1,81 @@
+"""Eseménynapló: a végpontok játéklépései újrajátszható alakban.
+
+Minden ``with_game_state`` végpont lépése egy ``(action, data)`` esemény.
+Betöltéskor a legutóbbi pillanatkép után rögzített eseményeket a
+``replay`` ugyanazokkal a ``Game`` metódusokkal játssza le, amelyeket a
+végpont hívott; a tokenek kezelése nem része az újrajátszásnak (az a
+``User`` sorban szinkron íródik).
+
+A véletlen egyetlen forrása a cipő keverése: a ``create_deck`` esemény
+ezért a cipő seedjét is tartalmazza, és az asztal akkori szabályait.
+"""
+
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import load_rules
+
+
+def _bet(game, data):
+    game.set_bet(data["bet"])
+    game.set_bet_list(data["bet"])
+
+
+def _create_deck(game, data):
+    game.create_deck(Shoe.from_state(data["shoe"]), load_rules(data.get("rules")))
+
+
+def _double(has_split):
+    def replay(game, data):
+        game.double_request()
+        game.hit(True, has_split)
+
+    return replay
+
+
+def _stand_and_rewards(has_split):
+    def replay(game, data):
+        game.stand(has_split)
+        game.rewards()
+
+    return replay
+
+
+def _recover(game, data):
+    game.is_session_init = False
+
+
+# Végpont neve -> a végpont által hívott Game metódusok
+REPLAY = {
+    "bet": _bet,
+    "retake_bet": lambda game, data: game.retake_bet_from_bet_list(),
+    "create_deck": _create_deck,
+    "start_game": lambda game, data: game.initialize_new_round(),
+    "ins_request": lambda game, data: game.insurance_request(),
+    "hit": lambda game, data: game.hit(False, False),
+    "double_request": _double(False),
+    "stand_and_rewards": _stand_and_rewards(False),
+    "split_request": lambda game, data: game.split_hand(),
+    "add_to_players_list_by_stand": lambda game, data: game.add_to_players_list_by_stand(),
+    "add_split_player_to_game": lambda game, data: game.add_split_player_to_game(),
+    "add_player_from_players": lambda game, data: game.add_player_from_players(),
+    "split_hit": lambda game, data: game.hit(False, True),
+    "split_double_request": _double(True),
+    "split_stand_and_rewards": _stand_and_rewards(True),
+    "set_restart": lambda game, data: game.restart_game(),
+    "recover_game_state": _recover,
+    "clear_game_state": lambda game, data: game.clear_game_state(),
+}
+
+
+def event_data(action, game, data):
+    """Az újrajátszáshoz szükséges adat a lépés után (``None``, ha nincs)."""
+    if action == "bet":
+        return {"bet": data.get("bet", 0)}
+    if action == "create_deck":
+        return {"shoe": game.shoe.to_state(), "rules": game.rules}
+    return None
+
+
+def replay(game, events):
+    for action, data in events:
+        REPLAY[action](game, data or {})
+    return game
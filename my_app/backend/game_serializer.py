@@ -1,53 +1,31 @@
 from typing import Any, Dict
 from my_app.backend.phase_state import PhaseState
-from my_app.backend.game import Game
 
 
 class GameSerializer:
     @staticmethod
-    def serialize_by_context(game, path: str) -> Dict[str, Any]:
-        p = path or ""
-
-        if "recover_game_state" in p:
-            if game.players or game.split_req > 0:
-                return GameSerializer.serialize_split_hand(game)
-            return GameSerializer.serialize_initial_and_hit_state(
-                game, is_recovery=True
-            )
-
-        if "split_stand_and_rewards" in p:
-            return GameSerializer.serialize_split_stand_and_rewards(game)
-        if "add_to_players_list_by_stand" in p:
-            return GameSerializer.serialize_add_to_players_list_by_stand(game)
-        if "add_player_from_players" in p:
-            return GameSerializer.serialize_add_player_from_players(game)
-        if "split" in p:
-            return GameSerializer.serialize_split_hand(game)
-        if "ins_request" in p:
-            return GameSerializer.serialize_for_insurance(game)
-        if "double_request" in p:
-            return GameSerializer.serialize_double_state(game)
-        if "rewards" in p:
-            return GameSerializer.serialize_reward_state(game)
-        if "create_deck" in p:
-            return GameSerializer.serialize_create_deck(game)
-        if "start_game" in p:
-            return GameSerializer.serialize_start_game(game)
-        if "clear_game_state" in p:
-            return GameSerializer.serialize_clear_game_state(game)
-
-        if any(x in p for x in ["hit"]):
-            return GameSerializer.serialize_initial_and_hit_state(game)
+    def serialize_for_endpoint(game, endpoint: str) -> Dict[str, Any]:
+        """A Flask endpoint névhez regisztrált nézet (egy dict lookup)."""
+        serializer = ENDPOINT_SERIALIZERS.get(
+            endpoint, GameSerializer.serialize_for_client_init
+        )
+        return serializer(game)
 
-        if any(x in p for x in ["bet", "retake_bet", "restart"]):
-            return GameSerializer.serialize_for_client_bets(game)
+    # A motor egész kódokkal dolgozik, a kliens a "♥10" alakot kapja
+    @staticmethod
+    def _hand_view(hand) -> Dict[str, Any]:
+        if hand is None:
+            return None
+        return hand.to_dict()
 
-        return GameSerializer.serialize_for_client_init(game)
+    @staticmethod
+    def _hands_view(hands):
+        return [GameSerializer._hand_view(hand) for hand in hands]
 
     @staticmethod
     def serialize_for_client_init(game) -> Dict[str, Any]:
         return {
-            "deck_len": game.deck_len_init if len(game.deck) == 0 else len(game.deck),
+            "deck_len": game.get_deck_len(),
             "target_phase": game.get_target_phase().value,
             "pre_phase": PhaseState.NONE.value,
         }
@@ -65,7 +43,7 @@ class GameSerializer:
     @staticmethod
     def serialize_for_client_bets(game) -> Dict[str, Any]:
         d_len = (
-            Game.TOTAL_INITIAL_CARDS
+            game.deck_len_init
             if (not game.is_round_active and game.is_session_init)
             else game.get_deck_len()
         )
@@ -73,7 +51,7 @@ class GameSerializer:
         calc_phase = (
             PhaseState.NONE if not game.bet_list else
             PhaseState.SHUFFLING
-            if (d_len == Game.TOTAL_INITIAL_CARDS or d_len < 60)
+            if game.needs_reshuffle()
             else PhaseState.INIT_GAME
         )
 
@@ -85,6 +63,12 @@ class GameSerializer:
             "pre_phase": calc_phase.value,
         }
 
+    @staticmethod
+    def serialize_recovery(game) -> Dict[str, Any]:
+        if game.players or game.split_req > 0:
+            return GameSerializer.serialize_split_hand(game)
+        return GameSerializer.serialize_initial_and_hit_state(game, is_recovery=True)
+
     @staticmethod
     def serialize_create_deck(game) -> Dict[str, Any]:
         return {
@@ -98,8 +82,8 @@ class GameSerializer:
         game, is_recovery: bool = False
     ) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_masked": game.dealer_masked,
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_masked": GameSerializer._hand_view(game.dealer_masked),
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
             "target_phase": (
@@ -112,8 +96,8 @@ class GameSerializer:
     @staticmethod
     def serialize_start_game(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_masked": game.dealer_masked,
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_masked": GameSerializer._hand_view(game.dealer_masked),
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
             "target_phase": game.get_target_phase().value,
@@ -123,7 +107,7 @@ class GameSerializer:
     @staticmethod
     def serialize_for_insurance(game) -> Dict[str, Any]:
         state = {
-            "player": game.player,
+            "player": GameSerializer._hand_view(game.player),
             "natural_21": game.natural_21,
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
@@ -131,15 +115,15 @@ class GameSerializer:
             "pre_phase": game.get_pre_phase().value if game.get_pre_phase() else None,
         }
         if game.natural_21 == 3:
-            state["dealer_unmasked"] = game.dealer_unmasked
+            state["dealer_unmasked"] = GameSerializer._hand_view(game.dealer_unmasked)
         else:
-            state["dealer_masked"] = game.dealer_masked
+            state["dealer_masked"] = GameSerializer._hand_view(game.dealer_masked)
         return state
 
     @staticmethod
     def serialize_double_state(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
+            "player": GameSerializer._hand_view(game.player),
             "deck_len": game.get_deck_len(),
             "target_phase": game.get_target_phase().value,
         }
@@ -147,8 +131,8 @@ class GameSerializer:
     @staticmethod
     def serialize_reward_state(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_unmasked": game.dealer_unmasked,
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_unmasked": GameSerializer._hand_view(game.dealer_unmasked),
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
             "winner": game.winner,
@@ -158,10 +142,10 @@ class GameSerializer:
     @staticmethod
     def serialize_split_hand(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_masked": game.dealer_masked,
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_masked": GameSerializer._hand_view(game.dealer_masked),
             "aces": game.aces,
-            "players": game._get_sorted_hands(),
+            "players": GameSerializer._hands_view(game._get_sorted_hands()),
             "split_req": game.split_req,
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
@@ -172,9 +156,9 @@ class GameSerializer:
     @staticmethod
     def serialize_add_to_players_list_by_stand(game) -> Dict[str, Any]:
         state = {
-            "player": game.player,
+            "player": GameSerializer._hand_view(game.player),
             "aces": game.aces,
-            "players": game._get_sorted_hands(),
+            "players": GameSerializer._hands_view(game._get_sorted_hands()),
             "split_req": game.split_req,
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
@@ -182,22 +166,21 @@ class GameSerializer:
             "pre_phase": game.get_pre_phase().value if game.get_pre_phase() else None,
         }
         if game.split_req > 0:
-            state["dealer_masked"] = game.dealer_masked
+            state["dealer_masked"] = GameSerializer._hand_view(game.dealer_masked)
         else:
-            dealer_data = game.dealer_unmasked.copy()
-            if not game.unmasked_sum_sent:
+            dealer_data = GameSerializer._hand_view(game.dealer_unmasked)
+            if game.dealer_sum_hidden:
                 dealer_data["sum"] = 0
-                game.unmasked_sum_sent = True
             state["dealer_unmasked"] = dealer_data
         return state
 
     @staticmethod
     def serialize_add_player_from_players(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_unmasked": game.dealer_unmasked,
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_unmasked": GameSerializer._hand_view(game.dealer_unmasked),
             "aces": game.aces,
-            "players": game._get_sorted_hands(),
+            "players": GameSerializer._hands_view(game._get_sorted_hands()),
             "split_req": game.split_req,
             "deck_len": game.get_deck_len(),
             "bet": game.bet,
@@ -208,9 +191,9 @@ class GameSerializer:
     @staticmethod
     def serialize_split_stand_and_rewards(game) -> Dict[str, Any]:
         return {
-            "player": game.player,
-            "dealer_unmasked": game.dealer_unmasked,
-            "players": game._get_sorted_hands(),
+            "player": GameSerializer._hand_view(game.player),
+            "dealer_unmasked": GameSerializer._hand_view(game.dealer_unmasked),
+            "players": GameSerializer._hands_view(game._get_sorted_hands()),
             "winner": game.winner,
             "split_req": game.split_req,
             "deck_len": game.get_deck_len(),
@@ -218,3 +201,28 @@ class GameSerializer:
             "target_phase": game.get_target_phase().value,
             "pre_phase": game.get_pre_phase().value if game.get_pre_phase() else None,
         }
+
+
+# Flask endpoint név -> nézet; a nem regisztrált végpontok (pl.
+# initialize_session) a serialize_for_client_init nézetet kapják
+ENDPOINT_SERIALIZERS = {
+    "bet": GameSerializer.serialize_for_client_bets,
+    "retake_bet": GameSerializer.serialize_for_client_bets,
+    "set_restart": GameSerializer.serialize_for_client_bets,
+    "force_restart_by_client_id": GameSerializer.serialize_for_client_bets,
+    "create_deck": GameSerializer.serialize_create_deck,
+    "start_game": GameSerializer.serialize_start_game,
+    "ins_request": GameSerializer.serialize_for_insurance,
+    "hit": GameSerializer.serialize_initial_and_hit_state,
+    "double_request": GameSerializer.serialize_double_state,
+    "stand_and_rewards": GameSerializer.serialize_reward_state,
+    "split_request": GameSerializer.serialize_split_hand,
+    "split_hit": GameSerializer.serialize_split_hand,
+    "split_double_request": GameSerializer.serialize_split_hand,
+    "add_split_player_to_game": GameSerializer.serialize_split_hand,
+    "add_to_players_list_by_stand": GameSerializer.serialize_add_to_players_list_by_stand,
+    "add_player_from_players": GameSerializer.serialize_add_player_from_players,
+    "split_stand_and_rewards": GameSerializer.serialize_split_stand_and_rewards,
+    "recover_game_state": GameSerializer.serialize_recovery,
+    "clear_game_state": GameSerializer.serialize_clear_game_state,
+}
@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional, Union
+
+import msgspec
+
+from my_app.backend.hand import DealerMasked, DealerUnmasked, PlayerHand
+from my_app.backend.phase_state import PhaseState
+from my_app.backend.shoe import ShoeState
+from my_app.backend.table_rules import TableRules
+from my_app.backend.winner_state import WinnerState
+
+# A mentett állapot sémájának verziója. A "v" mező nélküli (régebbi)
+# dokumentumokat a Game.deserialize a régi, dict alapú úton tölti be.
+STATE_VERSION = 2
+
+
+class GameState(msgspec.Struct, tag=STATE_VERSION, tag_field="v"):
+    """A User.current_game_state-be mentett teljes játékállapot."""
+
+    shoe: ShoeState = msgspec.field(default_factory=ShoeState)
+    rules: TableRules = msgspec.field(default_factory=TableRules)
+    player: PlayerHand = msgspec.field(default_factory=PlayerHand)
+    dealer_masked: DealerMasked = msgspec.field(default_factory=DealerMasked)
+    dealer_unmasked: DealerUnmasked = msgspec.field(default_factory=DealerUnmasked)
+    split_player: Optional[PlayerHand] = None
+    aces: bool = False
+    natural_21: WinnerState = WinnerState.NONE
+    winner: WinnerState = WinnerState.NONE
+    hand_counter: int = 0
+    players: List[PlayerHand] = []
+    players_index: Dict[str, bool] = {}
+    split_req: int = 0
+    unmasked_sum_sent: bool = False
+    bet: Union[int, float] = 0
+    bet_list: List[Union[int, float]] = []
+    is_round_active: bool = False
+    target_phase: PhaseState = PhaseState.LOADING
+    pre_phase: PhaseState = PhaseState.NONE
+    is_session_init: bool = False
+
+
+json_encoder = msgspec.json.Encoder()
+json_decoder = msgspec.json.Decoder()
+
+
+def encode_json(obj) -> str:
+    """JSONB íráshoz: dict-et és Struct-ot is C szinten kódol."""
+    return json_encoder.encode(obj).decode()
+
+
+def decode_json(raw):
+    return json_decoder.decode(raw)
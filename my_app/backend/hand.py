@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Union
+
+import msgspec
+
+from my_app.backend.cards import CARD_VALUE, card_labels
+from my_app.backend.hand_state import HandState
+from my_app.backend.winner_state import WinnerState
+
+BLACKJACK_LIMIT = 21
+
+
+class Hand(msgspec.Struct):
+    """Egy kéz lapjai inkrementálisan karbantartott összeggel.
+
+    ``hard``: az ászokat 1-nek számoló összeg, ``aces``: az ászok száma.
+    Új lap hozzáadása O(1), a ``total`` és a split/natural vizsgálat
+    csak ezeket a mezőket olvassa, nem számolja újra a kezet.
+    """
+
+    cards: List[int] = []
+    hard: int = 0
+    aces: int = 0
+
+    def __post_init__(self):
+        # Csak lapokkal létrehozott (vagy régi mentésből jövő) kéz: újraszámolás
+        if not self.hard and self.cards:
+            for card in self.cards:
+                value = CARD_VALUE[card]
+                self.hard += value
+                if value == 1:
+                    self.aces += 1
+
+    def add(self, card):
+        self.cards.append(card)
+        value = CARD_VALUE[card]
+        self.hard += value
+        if value == 1:
+            self.aces += 1
+
+    def pop(self, index=-1):
+        card = self.cards.pop(index)
+        value = CARD_VALUE[card]
+        self.hard -= value
+        if value == 1:
+            self.aces -= 1
+        return card
+
+    @property
+    def total(self):
+        # Legfeljebb egy ász számíthat 11-nek
+        if self.aces and self.hard + 10 <= BLACKJACK_LIMIT:
+            return self.hard + 10
+        return self.hard
+
+    @property
+    def is_soft(self):
+        return self.aces > 0 and self.hard + 10 <= BLACKJACK_LIMIT
+
+    @property
+    def count(self):
+        return len(self.cards)
+
+    def is_pair(self):
+        cards = self.cards
+        return len(cards) == 2 and CARD_VALUE[cards[0]] == CARD_VALUE[cards[1]]
+
+    def is_natural(self):
+        return len(self.cards) == 2 and self.total == BLACKJACK_LIMIT
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+
+# A kezek és a dealer nézetek fix mezőkészletű, slotos osztályok.
+# A kliensnek szóló dict alakot csak a to_dict() állítja elő.
+class PlayerHand(msgspec.Struct):
+    id: Union[int, str] = 0
+    hand: Hand = msgspec.field(default_factory=Hand)
+    sum: int = 0
+    hand_state: HandState = HandState.NONE
+    can_split: bool = False
+    stated: bool = False
+    bet: Union[int, float] = 0
+    has_hit: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "hand": card_labels(self.hand.cards),
+            "sum": self.sum,
+            "hand_state": self.hand_state,
+            "can_split": self.can_split,
+            "stated": self.stated,
+            "bet": self.bet,
+            "has_hit": self.has_hit,
+        }
+
+
+class DealerMasked(msgspec.Struct):
+    hand: Hand = msgspec.field(default_factory=Hand)
+    sum: int = 0
+    can_insure: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hand": card_labels(self.hand.cards),
+            "sum": self.sum,
+            "can_insure": self.can_insure,
+        }
+
+
+class DealerUnmasked(msgspec.Struct):
+    hand: Hand = msgspec.field(default_factory=Hand)
+    sum: int = 0
+    hand_state: HandState = HandState.NONE
+    natural_21: WinnerState = WinnerState.NONE
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hand": card_labels(self.hand.cards),
+            "sum": self.sum,
+            "hand_state": self.hand_state,
+            "natural_21": self.natural_21,
+        }
@@ -0,0 +1,143 @@
+"""msgspec alapú Flask JSON provider, a ``DefaultJSONProvider`` bájtjaival.
+
+A ``jsonify`` kimenete bájtra megegyezik a Flask alapértelmezésével
+(``sort_keys``, ``ensure_ascii``, tömör elválasztók, záró sortörés):
+
+* a kulcsok rendezését a msgspec végzi (``order="sorted"``);
+* a nem ASCII karakterek ``\\uXXXX`` (BMP-n kívül surrogate pár) alakot
+  kapnak, a DEL (0x7f) is, ahogy a ``json.dumps`` teszi;
+* az Enum-ok (``IntEnum``, ``str``-Enum) értékként kódolódnak;
+* a msgspec a lebegőpontos számokat másként írja exponenssel (``1e16``
+  vs. ``1e+16``, ``0.00001`` vs. ``1e-05``): ha ilyen minta van a
+  kimenetben, a válasz a ``json.dumps`` úton készül.
+
+Eltérés csak a JSON-ban amúgy sem érvényes NaN / Infinity (``null``) és a
+datetime (ISO 8601 az RFC 822 helyett) esetén van; az /api válaszok
+ilyet nem tartalmaznak. Debug módban (szép formázás) és a nem tömör
+``dumps`` hívásoknál a ``json.dumps`` fut, a Flask alapértelmezéseivel.
+A provider csak a Flask nyilvános ``JSONProvider`` felületére épül.
+"""
+
+import codecs
+import dataclasses
+import decimal
+import json
+import re
+import uuid
+
+from datetime import date
+
+import msgspec
+
+from flask import current_app
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+COMPACT = {"separators": (",", ":")}
+
+# Exponens-jelölt: az "e" literál előtag gyors keresést ad, a megelőző
+# számjegyet a _float_mismatch nézi (a "[0-9]e" minta bájtonként próbálna)
+_EXPONENT = re.compile(rb"e[-+0-9]")
+
+
+def _json_ascii_escape(exc):
+    out = []
+    for ch in exc.object[exc.start : exc.end]:
+        code = ord(ch)
+        if code > 0xFFFF:
+            code -= 0x10000
+            out.append("\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF)))
+        else:
+            out.append("\\u%04x" % code)
+    return "".join(out), exc.end
+
+
+codecs.register_error("json_ascii_escape", _json_ascii_escape)
+
+
+def _float_mismatch(data):
+    """Van-e a kimenetben a json.dumps-tól eltérő msgspec számalak."""
+    if b"0.0000" in data:
+        return True
+    for match in _EXPONENT.finditer(data):
+        if data[match.start() - 1 : match.start()].isdigit():
+            return True
+    return False
+
+
+def _ascii_escape(text):
+    # A C-beli backslashreplace a 0x100 feletti BMP karaktereket (pl. a
+    # kártyaszínek) már json alakban írja; \xNN és \UNNNNNNNN esetén a
+    # lassabb, json-helyes hibakezelő fut
+    data = text.encode("ascii", "backslashreplace")
+    if b"\\x" in data or b"\\U" in data:
+        data = text.encode("ascii", "json_ascii_escape")
+    return data
+
+
+def _default(obj):
+    """A ``json`` / msgspec által nem ismert típusok, a Flask szabályai szerint."""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MsgspecJSONProvider(JSONProvider):
+    """A ``DefaultJSONProvider`` beállításai és kimenete, msgspec-kel."""
+
+    default = staticmethod(_default)
+    ensure_ascii = True
+    sort_keys = True
+    compact = None
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted")
+
+    def encode(self, obj):
+        """A ``json.dumps(obj, sort_keys=True, ensure_ascii=True,
+        separators=(",", ":"))`` kimenete bájtként."""
+        data = self._encoder.encode(obj)
+        if _float_mismatch(data):
+            return self._dumps(obj, **COMPACT).encode()
+        if not data.isascii():
+            data = _ascii_escape(data.decode())
+        if b"\x7f" in data:
+            data = data.replace(b"\x7f", b"\\u007f")
+        return data
+
+    def _dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        # Csak a tömör alak gyors (a json.dumps alapértelmezése szóközös)
+        if kwargs != COMPACT or not (self.sort_keys and self.ensure_ascii):
+            return self._dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+
+        app = current_app
+        if (self.compact is None and app.debug) or self.compact is False:
+            body = f"{self._dumps(obj, indent=2)}\n".encode()
+        elif self.sort_keys and self.ensure_ascii:
+            body = self.encode(obj) + b"\n"
+        else:
+            body = f"{self._dumps(obj, **COMPACT)}\n".encode()
+        return app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,218 @@
+"""Kérésenkénti időmérés szakaszokra bontva és Prometheus szöveges export.
+
+Szakaszok: ``auth`` (user betöltése), ``deserialize`` (játékállapot
+betöltése), ``engine`` (a végpont törzse), ``serializer`` (a kliensnek
+küldött nézet), ``serialize`` (a mentett dokumentum és az állapot-token),
+``commit`` (a game_states írása és a ``db.session.commit``). A
+szakaszok egymásba ágyazhatók; minden szakasz a saját, "exkluzív" idejét
+kapja (a beágyazott szakaszok ideje nélkül), így az ``engine`` nem
+tartalmazza például a szerializálót.
+
+A számlálók worker-szintűek (több worker esetén a Prometheus workerenként
+gyűjt). Kérésenként néhány ``perf_counter`` hívás és egy zárolt frissítés
+a költség.
+"""
+
+import threading
+import time
+
+from bisect import bisect_left
+
+STAGES = ("auth", "deserialize", "engine", "serializer", "serialize", "commit")
+
+# Másodperc
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+# Byte
+SIZE_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+PREFIX = "blackjack"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # utolsó: +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+        total += self.counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {total}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {total}"
+
+
+class StageTimer:
+    """Egy kérés szakaszidői; ``with timer.stage("engine"): ...``."""
+
+    __slots__ = ("started", "times", "_stack")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.times = {}
+        self._stack = []  # [név, kezdet, beágyazott idő]
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.times[name] = self.times.get(name, 0.0) + elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+class _Stage:
+    __slots__ = ("timer", "name")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer._enter(self.name)
+
+    def __exit__(self, *exc):
+        self.timer._exit()
+        return False
+
+
+class _NoStage:
+    """Mérés nélküli kérés (pl. kikapcsolt metrikák, app kontextuson kívül)."""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_STAGE = _NoStage()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _series(self, endpoint):
+        series = self._endpoints.get(endpoint)
+        if series is None:
+            series = {
+                "duration": _Histogram(LATENCY_BUCKETS),
+                "stages": {},
+                "request_bytes": _Histogram(SIZE_BUCKETS),
+                "response_bytes": _Histogram(SIZE_BUCKETS),
+                "status": {},
+            }
+            self._endpoints[endpoint] = series
+        return series
+
+    def record(self, endpoint, status, timer, request_bytes, response_bytes):
+        duration = timer.elapsed()
+        with self._lock:
+            series = self._series(endpoint)
+            series["duration"].observe(duration)
+            stages = series["stages"]
+            for name, seconds in timer.times.items():
+                histogram = stages.get(name)
+                if histogram is None:
+                    histogram = stages[name] = _Histogram(LATENCY_BUCKETS)
+                histogram.observe(seconds)
+            series["request_bytes"].observe(request_bytes)
+            series["response_bytes"].observe(response_bytes)
+            series["status"][status] = series["status"].get(status, 0) + 1
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            out = []
+
+            name = f"{PREFIX}_request_duration_seconds"
+            out.append(f"# HELP {name} Request latency per endpoint.")
+            out.append(f"# TYPE {name} histogram")
+            for endpoint, series in endpoints:
+                out.extend(series["duration"].lines(name, f'endpoint="{endpoint}"'))
+
+            name = f"{PREFIX}_request_stage_seconds"
+            out.append(f"# HELP {name} Exclusive time spent in each request stage.")
+            out.append(f"# TYPE {name} histogram")
+            for endpoint, series in endpoints:
+                for stage in STAGES:
+                    if stage in series["stages"]:
+                        labels = f'endpoint="{endpoint}",stage="{stage}"'
+                        out.extend(series["stages"][stage].lines(name, labels))
+
+            for key, help_text in (
+                ("request_bytes", "Request body size per endpoint."),
+                ("response_bytes", "Response body size per endpoint."),
+            ):
+                name = f"{PREFIX}_{key}"
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} histogram")
+                for endpoint, series in endpoints:
+                    out.extend(series[key].lines(name, f'endpoint="{endpoint}"'))
+
+            for name, help_text, errors in (
+                (f"{PREFIX}_requests_total", "Responses per endpoint and status.", False),
+                (f"{PREFIX}_request_errors_total", "Error responses (4xx/5xx).", True),
+            ):
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} counter")
+                for endpoint, series in endpoints:
+                    for status, count in sorted(series["status"].items()):
+                        if errors and status < 400:
+                            continue
+                        out.append(
+                            f'{name}{{endpoint="{endpoint}",status="{status}"}} {count}'
+                        )
+
+        return "\n".join(out) + "\n"
+
+
+def render_shoe_pool(pool):
+    """A ShoePool számlálói (a ``RequestMetrics.render`` kimenete mögé)."""
+    name = f"{PREFIX}_shoe_pool_takes_total"
+    out = [
+        f"# HELP {name} Shoes taken by create_deck, from the pool or shuffled inline.",
+        f"# TYPE {name} counter",
+        f'{name}{{source="pool"}} {pool.hits}',
+        f'{name}{{source="inline"}} {pool.misses}',
+    ]
+    name = f"{PREFIX}_shoe_pool_ready"
+    out.append(f"# HELP {name} Pre-shuffled shoes waiting in the pool.")
+    out.append(f"# TYPE {name} gauge")
+    out.append(f"{name} {len(pool)}")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,130 @@
+import random
+import secrets
+
+from typing import List, Optional
+
+import msgspec
+
+from my_app.backend.cards import CARDS_IN_DECK, SINGLE_DECK
+from my_app.backend.dealer_odds import cards_composition
+
+# A keverő algoritmus verziója: ha változik, a régi mentések a régi
+# verzióval épülnek újra, így ugyanazt a lapsorrendet kapják.
+SHUFFLE_VERSION = 1
+
+
+def _shuffle_v1(seed, num_decks):
+    cards = list(SINGLE_DECK) * num_decks
+    random.Random(seed).shuffle(cards)
+    return bytes(cards)
+
+
+SHUFFLERS = {1: _shuffle_v1}
+
+
+class ShoeState(msgspec.Struct, omit_defaults=True):
+    """A cipő mentett alakja: seed + verzió + kurzor, vagy a teljes lista."""
+
+    cursor: int = 0
+    seed: Optional[int] = None
+    version: int = 1  # hiányzó mező = az első keverő verzió
+    num_decks: int = 0
+    cards: Optional[List[int]] = None
+
+
+class Shoe:
+    """Kevert lapok fix tömbje egy olvasó kurzorral.
+
+    Húzáskor csak a kurzor lép előre, a tömb nem változik, így a
+    ``draw`` O(1), és a pakli méretétől függetlenül nem foglal memóriát.
+
+    Determinisztikus módban (``seed`` megadva) a lapok sorrendjét a seed
+    és a keverő verziója határozza meg: mentéskor csak ezek és a kurzor
+    kerülnek az állapotba, a tömb pedig csak az első húzáskor épül újra.
+    """
+
+    __slots__ = ("_cards", "cursor", "seed", "version", "num_decks", "size")
+
+    # Már kevert lapsorrendek forrása (``lookup(seed, version, num_decks)``),
+    # pl. a ShoePool által kiadott cipőké
+    cards_source = None
+
+    def __init__(
+        self, cards=(), cursor=0, seed=None, num_decks=0, version=SHUFFLE_VERSION
+    ):
+        self.seed = seed
+        self.version = version
+        self.num_decks = num_decks
+        self.cursor = cursor
+        if seed is None:
+            self._cards = bytes(cards)  # laponként egy bájt
+            self.size = len(self._cards)
+        else:
+            self._cards = None
+            self.size = num_decks * CARDS_IN_DECK
+
+    @classmethod
+    def shuffled(cls, num_decks):
+        return cls(seed=secrets.randbits(64), num_decks=num_decks)
+
+    @property
+    def cards(self):
+        if self._cards is None:
+            source = Shoe.cards_source
+            if source is not None:
+                self._cards = source.lookup(self.seed, self.version, self.num_decks)
+            if self._cards is None:
+                self._cards = SHUFFLERS[self.version](self.seed, self.num_decks)
+        return self._cards
+
+    def draw(self):
+        if self.cursor >= self.size:
+            raise ValueError("The shoe is empty.")
+        card = self.cards[self.cursor]
+        self.cursor += 1
+        return card
+
+    def remaining(self):
+        return self.size - self.cursor
+
+    def peek(self, n=1):
+        return list(self.cards[self.cursor : self.cursor + n])
+
+    def composition(self):
+        """A hátralévő lapok darabszáma értékenként (ász = 1 ... 10)."""
+        return cards_composition(self.cards[self.cursor :])
+
+    def penetration(self):
+        """A már kiosztott lapok aránya (0.0 - 1.0)."""
+        if not self.size:
+            return 0.0
+        return self.cursor / self.size
+
+    def to_state(self):
+        if self.seed is None:
+            return ShoeState(cursor=self.cursor, cards=list(self._cards))
+        return ShoeState(
+            cursor=self.cursor,
+            seed=self.seed,
+            version=self.version,
+            num_decks=self.num_decks,
+        )
+
+    @classmethod
+    def from_state(cls, state):
+        if isinstance(state, dict):
+            state = msgspec.convert(state, ShoeState)
+        if state.seed is None:
+            return cls(state.cards or (), state.cursor)
+        return cls(
+            cursor=state.cursor,
+            seed=state.seed,
+            num_decks=state.num_decks,
+            version=state.version,
+        )
+
+    def __len__(self):
+        return self.remaining()
+
+    def __bool__(self):
+        return self.cursor < self.size
@@ -0,0 +1,112 @@
+"""Worker-szintű készlet előre kevert cipőkből.
+
+Egy háttérszál ``depth`` darab cipőt tart készen, a lapsorrendjük már
+kiszámolva (``Shoe.cards``), így a ``create_deck`` csak kivesz egyet. Ha
+a készlet üres, a cipő a kérésben készül (seed, lusta keverés), mint
+készlet nélkül.
+
+A szál csak akkor ébred, ha a készlet a felére fogyott, és egyben tölti
+fel: a kivétel nem ébreszt szálat, és a keverés (ami a GIL miatt a
+kérésekkel osztozik a CPU-n) ritkább, összefüggő löketekben fut.
+
+A szál folyamatonként az első ``take``-kor indul. Fork után (pre-fork
+szerver workerei) a gyermek üres készlettel, saját zárral és saját
+szállal kezd, így két worker sosem ad ki ugyanolyan cipőt.
+
+A mentett állapotban a cipő továbbra is csak seed + kurzor: hogy az
+osztó kérés ne keverje újra seedből, a kiadott cipők lapsorrendje
+``keep`` bejegyzésig megmarad, és a ``Shoe.cards`` innen veszi
+(``Shoe.cards_source``). A memória így legfeljebb ``(depth + keep)``
+cipőnyi, laponként egy bájt.
+"""
+
+import os
+import threading
+
+from collections import OrderedDict, deque
+
+from my_app.backend.shoe import SHUFFLE_VERSION, Shoe
+
+
+class ShoePool:
+    def __init__(self, num_decks, depth, keep=0):
+        self.num_decks = num_decks
+        self.depth = depth
+        self.keep = keep
+        self._low = depth // 2
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Új folyamat állapota: üres készlet, a szál még nem fut."""
+        self.hits = 0
+        self.misses = 0
+        self._ready = deque()
+        self._refill = threading.Event()
+        self._refill.set()
+        self._issued = OrderedDict()  # seed -> lapsorrend
+        self._lock = threading.Lock()
+        self._filler = None
+
+    def _make(self):
+        shoe = Shoe.shuffled(self.num_decks)
+        shoe.cards  # a keverés itt, a háttérszálon fut le
+        return shoe
+
+    def take(self):
+        """Egy kevert cipő a készletből, üres készlet esetén helyben."""
+        if self._filler is None:
+            self.start()
+        with self._lock:
+            if not self._ready:
+                self.misses += 1
+                shoe = None
+            else:
+                self.hits += 1
+                shoe = self._ready.popleft()
+                if self.keep:
+                    self._issued[shoe.seed] = shoe.cards
+                    while len(self._issued) > self.keep:
+                        self._issued.popitem(last=False)
+
+        if shoe is None:
+            self._refill.set()
+            return Shoe.shuffled(self.num_decks)
+        if len(self._ready) <= self._low:
+            self._refill.set()
+        return shoe
+
+    def lookup(self, seed, version, num_decks):
+        """Egy kiadott cipő lapsorrendje, vagy ``None``."""
+        if version != SHUFFLE_VERSION or num_decks != self.num_decks:
+            return None
+        with self._lock:
+            cards = self._issued.get(seed)
+            if cards is not None:
+                self._issued.move_to_end(seed)
+            return cards
+
+    def start(self):
+        """Háttérszál: fogyáskor a készletet ``depth`` darabra tölti.
+
+        Folyamatonként egyszer indul (a ``take`` hívja, ha még nem fut).
+        """
+
+        def run():
+            while True:
+                self._refill.wait()
+                self._refill.clear()
+                while len(self._ready) < self.depth:
+                    self._ready.append(self._make())
+
+        with self._lock:
+            if self._filler is not None:
+                return self._filler
+            self._filler = threading.Thread(
+                target=run, name="shoe-pool-filler", daemon=True
+            )
+        self._filler.start()
+        return self._filler
+
+    def __len__(self):
+        return len(self._ready)
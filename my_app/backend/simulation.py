@@ -0,0 +1,410 @@
+"""Vektorizált Monte Carlo szimuláció a Game szabályaival.
+
+A ``Game`` objektum egyszerre egy kezet játszik; itt ``lanes`` darab
+független cipő fut egymás mellett NumPy tömbökben, körönként egy
+lépésben. A szabályok a motoréval egyeznek:
+
+- az asztal szabályai szerinti cipő (``TableRules``, alapból 2 pakli),
+  újrakeverés a cut card után (``Game.needs_reshuffle``),
+- osztási sorrend: játékos, dealer (rejtett), játékos, dealer (felfordított),
+- a dealer minden 17-nél megáll (soft 17-nél is), és csak akkor húz,
+  ha van nem besokallt kéz (``Game.stand``),
+- natural: ``floor(2.5 * tét)`` vissza, mindkét natural: tét vissza,
+- dealer natural: minden tét elvész, a duplázás és a split is
+  (nincs "peek", ``Game.rewards``),
+- split legfeljebb 5 kézig (``Game.split_hand``: ``len(players) <= 3``),
+  split után is lehet duplázni, split ászokra egy lap jár,
+- biztosítás: ``ceil(tét / 2)``; dealer naturalnál a kör nullszaldós
+  (``Game.insurance_request``).
+
+A pénz a motorhoz hasonlóan egész tokenekben számolódik (``bet``).
+"""
+
+import math
+
+from typing import Dict
+
+import msgspec
+import numpy as np
+
+from my_app.backend.cards import CARD_VALUE, SINGLE_DECK
+from my_app.backend.dealer_odds import OUTCOME_LABELS, dealer_outcomes, shoe_composition
+from my_app.backend.table_rules import DEFAULT_RULES
+
+MAX_HANDS = 5
+DEALER_STANDS_ON = 17
+
+STAND, HIT, DOUBLE, SPLIT, DOUBLE_OR_STAND = 0, 1, 2, 3, 4
+
+DECK_VALUES = np.array([CARD_VALUE[card] for card in SINGLE_DECK], dtype=np.int8)
+
+OUTCOMES = (
+    "blackjack",
+    "blackjack_push",
+    "dealer_blackjack",
+    "insured",
+    "win",
+    "push",
+    "loss",
+)
+
+
+class Strategy:
+    """Döntési táblák: ``hard[total, upcard]``, ``soft[total, upcard]``,
+    ``pair[value, upcard]`` (bool). Az upcard indexe a lap értéke (ász = 1)."""
+
+    __slots__ = ("hard", "soft", "pair")
+
+    def __init__(self, hard, soft, pair):
+        self.hard = np.asarray(hard, dtype=np.int8)
+        self.soft = np.asarray(soft, dtype=np.int8)
+        self.pair = np.asarray(pair, dtype=bool)
+
+    @classmethod
+    def basic(cls):
+        """Alap stratégia (többpaklis, S17, duplázás split után)."""
+        ups = np.arange(11)
+        weak = (ups >= 2) & (ups <= 6)
+
+        hard = np.full((32, 11), STAND, dtype=np.int8)
+        hard[:12] = HIT
+        hard[9, (ups >= 3) & (ups <= 6)] = DOUBLE
+        hard[10, (ups >= 2) & (ups <= 9)] = DOUBLE
+        hard[11, ups >= 2] = DOUBLE
+        hard[12, ~((ups >= 4) & (ups <= 6))] = HIT
+        hard[13:17, ~weak] = HIT
+
+        soft = np.full((32, 11), STAND, dtype=np.int8)
+        soft[:18] = HIT
+        soft[13:15, (ups >= 5) & (ups <= 6)] = DOUBLE
+        soft[15:17, (ups >= 4) & (ups <= 6)] = DOUBLE
+        soft[17, (ups >= 3) & (ups <= 6)] = DOUBLE
+        soft[18, (ups >= 3) & (ups <= 6)] = DOUBLE_OR_STAND
+        soft[18, (ups == 1) | (ups >= 9)] = HIT
+
+        pair = np.zeros((11, 11), dtype=bool)
+        pair[1, 1:] = True
+        pair[9, (weak | (ups == 8) | (ups == 9))] = True
+        pair[8, 1:] = True
+        pair[7, (ups >= 2) & (ups <= 7)] = True
+        pair[6, weak] = True
+        pair[4, (ups >= 5) & (ups <= 6)] = True
+        pair[3, (ups >= 2) & (ups <= 7)] = True
+        pair[2, (ups >= 2) & (ups <= 7)] = True
+        pair[:, 0] = False
+
+        return cls(hard, soft, pair)
+
+
+class SimulationReport(msgspec.Struct):
+    """Összesített eredmény; a ``merge`` több futás összevonására való."""
+
+    rounds: int = 0
+    hands: int = 0
+    bet: int = 0
+    wagered: int = 0
+    net: int = 0
+    net_sq: int = 0
+    outcomes: Dict[str, int] = {}
+    net_histogram: Dict[int, int] = {}
+
+    @property
+    def house_edge(self):
+        """A ház előnye a kezdő tét arányában (pozitív = a ház nyer)."""
+        if not self.rounds:
+            return 0.0
+        return -self.net / (self.rounds * self.bet)
+
+    @property
+    def edge_per_wagered(self):
+        if not self.wagered:
+            return 0.0
+        return -self.net / self.wagered
+
+    @property
+    def variance(self):
+        """Körönkénti nettó eredmény szórásnégyzete, kezdő tét egységben."""
+        if not self.rounds:
+            return 0.0
+        mean = self.net / self.rounds
+        return (self.net_sq / self.rounds - mean * mean) / (self.bet * self.bet)
+
+    @property
+    def std_error(self):
+        if not self.rounds:
+            return 0.0
+        return math.sqrt(self.variance / self.rounds)
+
+    def merge(self, other):
+        outcomes = dict(self.outcomes)
+        for key, count in other.outcomes.items():
+            outcomes[key] = outcomes.get(key, 0) + count
+        histogram = dict(self.net_histogram)
+        for key, count in other.net_histogram.items():
+            histogram[key] = histogram.get(key, 0) + count
+        return SimulationReport(
+            rounds=self.rounds + other.rounds,
+            hands=self.hands + other.hands,
+            bet=self.bet or other.bet,
+            wagered=self.wagered + other.wagered,
+            net=self.net + other.net,
+            net_sq=self.net_sq + other.net_sq,
+            outcomes=outcomes,
+            net_histogram=dict(sorted(histogram.items())),
+        )
+
+    def summary(self):
+        return {
+            "rounds": self.rounds,
+            "hands": self.hands,
+            "house_edge": self.house_edge,
+            "edge_per_wagered": self.edge_per_wagered,
+            "variance": self.variance,
+            "std_error": self.std_error,
+            "outcomes": {
+                key: count / self.hands if self.hands else 0.0
+                for key, count in self.outcomes.items()
+            },
+        }
+
+
+class _Table:
+    """``lanes`` darab párhuzamos cipő és az aktuális kör kezei."""
+
+    def __init__(self, lanes, rng, rules):
+        self.lanes = lanes
+        self.rng = rng
+        self.reshuffle_below = rules.reshuffle_below
+        self.deck = np.tile(DECK_VALUES, rules.num_decks)
+        self.size = self.deck.size
+        self.shoe = np.empty((lanes, self.size), dtype=np.int8)
+        self.pos = np.zeros(lanes, dtype=np.int64)
+        self._reshuffle(np.arange(lanes))
+
+    def _reshuffle(self, rows):
+        if rows.size:
+            fresh = np.broadcast_to(self.deck, (rows.size, self.size))
+            self.shoe[rows] = self.rng.permuted(fresh, axis=1)
+            self.pos[rows] = 0
+
+    def reshuffle_low(self):
+        self._reshuffle(np.flatnonzero(self.size - self.pos < self.reshuffle_below))
+
+    def draw(self, mask):
+        """Egy lap a ``mask`` sorokban (a többiben 0)."""
+        rows = np.flatnonzero(mask)
+        # Kimerült cipő kör közben: a motor itt hibát dobna, a szimuláció újrakever
+        self._reshuffle(rows[self.pos[rows] >= self.size])
+        values = np.zeros(self.lanes, dtype=np.int16)
+        values[rows] = self.shoe[rows, self.pos[rows]]
+        self.pos[rows] += 1
+        return values
+
+    def composition(self, row):
+        """Egy sáv hátralévő lapjai ``dealer_odds`` összetételként."""
+        rest = self.shoe[row, self.pos[row] :]
+        return tuple(int(n) for n in np.bincount(rest, minlength=11)[1:])
+
+
+def dealer_odds_table(num_decks=DEFAULT_RULES.num_decks):
+    """Teli cipőre a dealer kimenetei upcard szerint: ``[upcard, outcome]``
+    (ász = 1; a sorrend ``dealer_odds.OUTCOME_LABELS``)."""
+    composition = shoe_composition(num_decks)
+    table = np.zeros((11, len(OUTCOME_LABELS)))
+    for upcard in range(1, 11):
+        counts = list(composition)
+        counts[upcard - 1] -= 1
+        table[upcard] = dealer_outcomes(upcard, tuple(counts))
+    return table
+
+
+def _totals(hard, aces):
+    soft = (aces > 0) & (hard + 10 <= 21)
+    return np.where(soft, hard + 10, hard), soft
+
+
+def _play_round(table, strategy, bet, insurance):
+    """Egy kör minden sávon; sávonkénti eredménytömbökkel tér vissza."""
+    lanes = table.lanes
+    everyone = np.ones(lanes, dtype=bool)
+    lane_ix = np.arange(lanes)
+
+    table.reshuffle_low()
+    card1 = table.draw(everyone)
+    hole = table.draw(everyone)
+    card3 = table.draw(everyone)
+    up = table.draw(everyone)
+
+    p_nat = ((card1 == 1) & (card3 == 10)) | ((card1 == 10) & (card3 == 1))
+    d_nat = ((hole == 1) & (up == 10)) | ((hole == 10) & (up == 1))
+
+    net = np.zeros(lanes, dtype=np.int64)
+    net[p_nat & ~d_nat] = math.floor(bet * 2.5) - bet
+    over = p_nat.copy()  # a kör azonnal véget ér
+
+    insured = np.zeros(lanes, dtype=bool)
+    if insurance:
+        offered = (up == 1) & ~p_nat
+        insured = offered & d_nat
+        net[offered & ~d_nat] -= math.ceil(bet / 2)
+        over |= insured
+
+    # Kezek: (lanes, MAX_HANDS)
+    shape = (lanes, MAX_HANDS)
+    hard = np.zeros(shape, dtype=np.int16)
+    aces = np.zeros(shape, dtype=np.int16)
+    ncards = np.zeros(shape, dtype=np.int16)
+    first = np.zeros(shape, dtype=np.int16)
+    second = np.zeros(shape, dtype=np.int16)
+    stake = np.ones(shape, dtype=np.int16)
+    nhands = np.where(over, 0, 1)
+    split_aces = np.zeros(lanes, dtype=bool)
+
+    hard[:, 0] = card1 + card3
+    aces[:, 0] = (card1 == 1).astype(np.int16) + (card3 == 1)
+    ncards[:, 0] = 2
+    first[:, 0] = card1
+    second[:, 0] = card3
+
+    def add_card(mask, h, card):
+        hard[mask, h] += card[mask]
+        aces[mask, h] += card[mask] == 1
+        ncards[mask, h] += 1
+        got_second = mask & (ncards[:, h] == 2)
+        second[got_second, h] = card[got_second]
+
+    for h in range(MAX_HANDS):
+        playing = nhands > h
+        if not playing.any():
+            break
+        if h:
+            # A split után félretett kéz most kapja meg a második lapját
+            add_card(playing, h, table.draw(playing))
+        active = playing & ~split_aces
+        while True:
+            total, soft = _totals(hard[:, h], aces[:, h])
+            active &= total < 21
+            if not active.any():
+                break
+            two = ncards[:, h] == 2
+            action = np.where(soft, strategy.soft[total, up], strategy.hard[total, up])
+            action = np.where((action == DOUBLE_OR_STAND) & ~two, STAND, action)
+            action = np.where(action == DOUBLE_OR_STAND, DOUBLE, action)
+            action = np.where((action == DOUBLE) & ~two, HIT, action)
+            can_split = (
+                two
+                & (first[:, h] == second[:, h])
+                & (nhands < MAX_HANDS)
+                & ~split_aces
+            )
+            action = np.where(can_split & strategy.pair[first[:, h], up], SPLIT, action)
+            action = np.where(active, action, STAND)
+
+            splitting = action == SPLIT
+            if splitting.any():
+                rows = lane_ix[splitting]
+                new = nhands[rows]
+                moved = second[rows, h]
+                hard[rows, new] = moved
+                aces[rows, new] = moved == 1
+                ncards[rows, new] = 1
+                first[rows, new] = moved
+                nhands[rows] += 1
+                hard[rows, h] = first[rows, h]
+                aces[rows, h] = first[rows, h] == 1
+                ncards[rows, h] = 1
+                split_aces[rows] = first[rows, h] == 1
+                add_card(splitting, h, table.draw(splitting))
+
+            hitting = (action == HIT) | (action == DOUBLE)
+            if hitting.any():
+                add_card(hitting, h, table.draw(hitting))
+            stake[action == DOUBLE, h] = 2
+            # Split ászok: egy-egy lap, további döntés nincs
+            active &= ((action == HIT) | splitting) & ~split_aces
+
+    # Dealer: csak akkor húz, ha van nem besokallt kéz
+    totals, _ = _totals(hard, aces)
+    in_play = np.arange(MAX_HANDS) < nhands[:, None]
+    standing = in_play & (totals <= 21)
+    d_hard = hole + up
+    d_aces = (hole == 1).astype(np.int16) + (up == 1)
+    drawing = standing.any(axis=1)
+    while True:
+        d_total, _ = _totals(d_hard, d_aces)
+        drawing &= d_total < DEALER_STANDS_ON
+        if not drawing.any():
+            break
+        card = table.draw(drawing)
+        d_hard += card
+        d_aces += card == 1
+    d_total = _totals(d_hard, d_aces)[0][:, None]
+
+    # Dealer natural mellett minden tét elvész (Game.rewards)
+    beats = standing & ((d_total > 21) | (totals > d_total)) & ~d_nat[:, None]
+    ties = standing & (totals == d_total) & ~d_nat[:, None]
+    lost = in_play & ~beats & ~ties
+
+    wager = stake.astype(np.int64) * bet
+    net += (wager * beats).sum(axis=1) - (wager * lost).sum(axis=1)
+
+    outcomes = np.stack(
+        [
+            p_nat & ~d_nat,
+            p_nat & d_nat,
+            (lost & d_nat[:, None]).sum(axis=1),
+            insured,
+            beats.sum(axis=1),
+            ties.sum(axis=1),
+            (lost & ~d_nat[:, None]).sum(axis=1),
+        ],
+        axis=1,
+    ).astype(np.int64)
+    hands = in_play.sum(axis=1) + over
+    wagered = (wager * in_play).sum(axis=1) + over * bet
+    return net, outcomes, hands, wagered
+
+
+def simulate(
+    rounds,
+    seed=None,
+    lanes=100_000,
+    strategy=None,
+    bet=10,
+    insurance=False,
+    rules=DEFAULT_RULES,
+) -> SimulationReport:
+    """``rounds`` kör lejátszása ``lanes`` párhuzamos cipőn.
+
+    ``seed`` lehet egész vagy ``numpy.random.SeedSequence``; azonos seed
+    azonos eredményt ad.
+    """
+    rng = np.random.default_rng(seed)
+    strategy = strategy or Strategy.basic()
+    lanes = max(1, min(lanes, rounds))
+    table = _Table(lanes, rng, rules)
+
+    report = SimulationReport(bet=bet, outcomes={key: 0 for key in OUTCOMES})
+    played = 0
+    while played < rounds:
+        net, outcomes, hands, wagered = _play_round(table, strategy, bet, insurance)
+        # Az utolsó kör részleges lehet: csak az első `counted` sáv számít
+        counted = min(lanes, rounds - played)
+        net = net[:counted]
+        values, counts = np.unique(net, return_counts=True)
+        report = report.merge(
+            SimulationReport(
+                rounds=counted,
+                hands=int(hands[:counted].sum()),
+                bet=bet,
+                wagered=int(wagered[:counted].sum()),
+                net=int(net.sum()),
+                net_sq=int((net * net).sum()),
+                outcomes=dict(
+                    zip(OUTCOMES, (int(n) for n in outcomes[:counted].sum(axis=0)))
+                ),
+                net_histogram={int(v): int(c) for v, c in zip(values, counts)},
+            )
+        )
+        played += counted
+    return report
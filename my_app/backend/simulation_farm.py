@@ -0,0 +1,108 @@
+"""Párhuzamos szimuláció több processzen.
+
+A köröket fix méretű darabokra (``chunk``) bontjuk; minden darab saját,
+a mester seedből ``SeedSequence(seed, spawn_key=(index,))`` alapján
+származtatott véletlenszám-folyamot kap. Így az eredmény csak a seedtől,
+a körök számától és a darabmérettől függ, a worker processzek számától
+nem: ugyanaz a seed mindig ugyanazt a riportot adja.
+
+Használat::
+
+    python -m my_app.backend.simulation_farm --rounds 100000000 --seed 42
+"""
+
+import argparse
+import json
+import os
+import secrets
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import msgspec
+import numpy as np
+
+from my_app.backend.simulation import SimulationReport, simulate
+from my_app.backend.table_rules import DEFAULT_RULES, TableRules
+
+DEFAULT_CHUNK = 5_000_000
+
+
+def _chunks(rounds, chunk):
+    return [
+        (index, min(chunk, rounds - start))
+        for index, start in enumerate(range(0, rounds, chunk))
+    ]
+
+
+def _run_chunk(seed, index, rounds, options):
+    seq = np.random.SeedSequence(seed, spawn_key=(index,))
+    return simulate(rounds, seed=seq, **options)
+
+
+def run_farm(rounds, seed, workers=None, chunk=DEFAULT_CHUNK, **options):
+    """``rounds`` kör szétosztása ``workers`` processz között, összevont riporttal.
+
+    Az ``options`` a ``simulate`` további paraméterei (``bet``, ``lanes`` ...).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = _chunks(rounds, chunk)
+    report = SimulationReport(bet=options.get("bet", 10))
+
+    if workers == 1:
+        results = [_run_chunk(seed, index, size, options) for index, size in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_chunk, seed, index, size, options)
+                for index, size in tasks
+            ]
+            results = [future.result() for future in futures]
+
+    # Darabsorrendben vonjuk össze, hogy a kimenet bitre azonos legyen
+    for result in results:
+        report = report.merge(result)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Blackjack szabályszimuláció")
+    parser.add_argument("--rounds", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--lanes", type=int, default=100_000)
+    parser.add_argument("--bet", type=int, default=10)
+    parser.add_argument("--insurance", action="store_true")
+    parser.add_argument("--decks", type=int, default=DEFAULT_RULES.num_decks)
+    parser.add_argument("--penetration", type=float, default=DEFAULT_RULES.penetration)
+    parser.add_argument("--output", help="teljes riport JSON fájlba")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else secrets.randbits(64)
+    started = time.perf_counter()
+    report = run_farm(
+        args.rounds,
+        seed,
+        workers=args.workers,
+        chunk=args.chunk,
+        lanes=args.lanes,
+        bet=args.bet,
+        insurance=args.insurance,
+        rules=TableRules(args.decks, args.penetration),
+    )
+    elapsed = time.perf_counter() - started
+
+    summary = report.summary()
+    summary["seed"] = seed
+    summary["seconds"] = round(elapsed, 3)
+    summary["rounds_per_second"] = round(report.rounds / elapsed) if elapsed else None
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(msgspec.json.encode({"seed": seed, "report": report}))
+
+
+if __name__ == "__main__":
+    main()
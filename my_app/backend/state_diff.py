@@ -0,0 +1,31 @@
+"""A mentett játékállapot felső szintű kulcsainak összevetése.
+
+A ``User.current_game_state`` teljes újraírása helyett csak a megváltozott
+felső szintű kulcsokat küldjük (``current_game_state || :patch``). Ha a
+változás nagy (pl. új kör, régi formátumú dokumentum), a teljes írás
+az olcsóbb, ilyenkor ``state_patch`` ``None``-t ad.
+"""
+
+from my_app.backend.game_state import json_encoder
+
+# A patch legfeljebb a teljes dokumentum ekkora hányada lehet
+PARTIAL_WRITE_MAX_RATIO = 0.5
+
+
+def changed_keys(old, new):
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+def state_patch(old, new, max_ratio=PARTIAL_WRITE_MAX_RATIO):
+    """A ``new`` állapot felé vivő patch, ``{}`` ha nincs változás, vagy
+    ``None``, ha teljes írás kell."""
+    if not old or old.keys() - new.keys():
+        # Üres vagy régi sémájú dokumentum: a || nem törölné a kulcsokat
+        return None
+
+    patch = changed_keys(old, new)
+    if not patch:
+        return patch
+    if len(json_encoder.encode(patch)) > max_ratio * len(json_encoder.encode(new)):
+        return None
+    return patch
@@ -0,0 +1,90 @@
+"""Titkosított, hitelesített játékállapot-token a "stateless" módhoz.
+
+A token tartalma a ``GameState`` msgpack alakja, a user id, a tokenegyenleg
+és az állapot verziója (``game_states.version``). Minden sikeres lépés
+növeli a verziót az adatbázisban (a tokenes lépések olvasás nélkül, egy
+UPDATE-tel írják a verziót és a dokumentumot), és a lépés csak az aktuális
+verziójú tokenre sikerül. Így egy régebbi token visszajátszása (pl. egy
+bust visszavonása vagy a cipő újrakeverése) ütközéssel (409) elutasítva,
+a tokent elvesztő kliens pedig a DB-beli állapotból folytatja.
+
+Titkosítás: AES-GCM (``cryptography``), a ``SECRET_KEY``-ből HKDF-fel
+származtatott kulccsal és tokenenként véletlen nonce-szal. A kiállítás
+ideje a titkosított részben utazik, a ``max_age`` ehhez mér.
+"""
+
+import base64
+import os
+import struct
+import time
+
+from typing import Optional
+
+import msgspec
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from my_app.backend.game_state import GameState
+
+NONCE_SIZE = 12
+ASSOCIATED_DATA = b"game-state-token"
+_ISSUED_AT = struct.Struct(">Q")
+
+
+class StateToken(msgspec.Struct, array_like=True):
+    user_id: str
+    version: int
+    tokens: int
+    idempotency_key: Optional[str]
+    state: GameState
+
+
+class TokenUser:
+    """A ``User`` helyett a token adataiból, a dokumentum betöltése nélkül."""
+
+    __slots__ = ("id", "tokens", "idempotency_key", "version", "state")
+
+    def __init__(self, token):
+        self.id = token.user_id
+        self.tokens = token.tokens
+        self.idempotency_key = token.idempotency_key
+        self.version = token.version
+        self.state = token.state
+
+
+class StateTokenCodec:
+    def __init__(self, secret_key, max_age=None, clock=time.time):
+        secret = secret_key.encode() if isinstance(secret_key, str) else secret_key
+        key = HKDF(
+            algorithm=hashes.SHA256(), length=32, salt=None, info=ASSOCIATED_DATA
+        ).derive(secret)
+        self._aead = AESGCM(key)
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder(StateToken)
+        self.max_age = max_age
+        self.clock = clock
+
+    def dumps(self, token):
+        plain = _ISSUED_AT.pack(int(self.clock())) + self._encoder.encode(token)
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = self._aead.encrypt(nonce, plain, ASSOCIATED_DATA)
+        return base64.urlsafe_b64encode(nonce + sealed).decode()
+
+    def loads(self, raw):
+        """A token tartalma, vagy ``None``, ha hiányzik, lejárt vagy hamis."""
+        if not raw:
+            return None
+        try:
+            data = base64.urlsafe_b64decode(raw)
+            plain = self._aead.decrypt(
+                data[:NONCE_SIZE], data[NONCE_SIZE:], ASSOCIATED_DATA
+            )
+            (issued_at,) = _ISSUED_AT.unpack_from(plain)
+            if self.max_age is not None and self.clock() - issued_at > self.max_age:
+                return None
+            return self._decoder.decode(plain[_ISSUED_AT.size :])
+        except (InvalidTag, ValueError, struct.error, msgspec.DecodeError):
+            return None
@@ -0,0 +1,270 @@
+"""Előre számolt EV táblák (stand / hit / double / split) és a lekérdezésük.
+
+A táblát offline generáljuk a ``Game`` szabályaival, paklinként egy
+kompakt msgpack fájlba (``table_path``; a 2 paklis a
+``STRATEGY_TABLE_PATH``); a szerver induláskor az asztal paklijaihoz
+tartozót egyszer tölti be, kérésenként csak egy indexelés történik.
+
+Generálás::
+
+    python -m my_app.backend.strategy
+    python -m my_app.backend.strategy --decks 6
+
+A számítás "total-dependent": a játékos lapjai a teli cipő
+értékeloszlásából jönnek (visszatevéssel), a dealer kimeneteit a
+``dealer_odds`` adja a felfordított lap nélküli teli cipőre. A szabályok:
+a dealer minden 17-nél megáll, nincs "peek" (dealer blackjack ellen a
+duplázott és a splitelt tét is elvész), split után lehet duplázni,
+split ászokra egy lap jár, split utáni 21 nem natural (1:1).
+"""
+
+import argparse
+import os
+
+from array import array
+
+import msgspec
+
+from my_app.backend.dealer_odds import (
+    BLACKJACK,
+    BUST,
+    DEALER_STANDS_ON,
+    dealer_outcomes,
+    shoe_composition,
+)
+from my_app.backend.table_rules import DEFAULT_RULES
+
+STRATEGY_TABLE_PATH = os.path.join(os.path.dirname(__file__), "strategy_table.msgpack")
+
+ACTIONS = ("stand", "hit", "double", "split")
+STAND, HIT, DOUBLE, SPLIT = range(len(ACTIONS))
+
+MAX_TOTAL = 21
+MAX_HANDS = 5  # Game.split_hand: len(players) <= 3
+UPCARDS = range(1, 11)  # ász = 1
+
+NAN = float("nan")
+
+
+def slot(total, soft, pair, upcard):
+    """A ``(total, soft, pair, upcard)`` kulcs helye a lapos EV tömbben."""
+    return (((total * 2 + soft) * 2 + pair) * 11 + upcard) * len(ACTIONS)
+
+
+TABLE_SIZE = slot(MAX_TOTAL + 1, 0, 0, 0)
+
+
+class StrategyTable(msgspec.Struct):
+    """Szabályok + EV-k float32 tömbként (``slot`` szerinti sorrendben)."""
+
+    num_decks: int
+    dealer_stands_on: int
+    ev: bytes
+    natural: bytes  # a játékos natural EV-je upcard szerint
+
+    def dump(self, path=STRATEGY_TABLE_PATH):
+        with open(path, "wb") as f:
+            f.write(msgspec.msgpack.encode(self))
+
+
+class StrategyLookup:
+    """A betöltött tábla; a ``hint`` csak indexel és legfeljebb 4 számot hasonlít."""
+
+    __slots__ = ("ev", "natural")
+
+    def __init__(self, table):
+        self.ev = array("f", table.ev)
+        self.natural = array("f", table.natural)
+
+    def evs(self, total, soft, pair, upcard):
+        start = slot(total, soft, pair, upcard)
+        return dict(zip(ACTIONS, self.ev[start : start + len(ACTIONS)]))
+
+    def hint(self, hand, upcard, can_double=True, can_split=True, split=False):
+        """Legjobb akció és EV egy kézre (``Hand``) és upcard értékre.
+
+        A ``(None, ev)`` eredmény natural kezet jelent (nincs döntés). Split
+        utáni kéznél (``split``) a 2 lapos 21 nem natural: a 21-es sor él.
+        """
+        if not split and hand.is_natural():
+            return None, self.natural[upcard]
+
+        two_cards = len(hand) == 2
+        pair = two_cards and can_split and hand.is_pair()
+        start = slot(min(hand.total, MAX_TOTAL), hand.is_soft, pair, upcard)
+        ev = self.ev
+
+        best = STAND
+        for action in (HIT, DOUBLE, SPLIT):
+            if action == DOUBLE and not (two_cards and can_double):
+                continue
+            value = ev[start + action]
+            if value == value and value > ev[start + best]:  # NaN kihagyása
+                best = action
+        return ACTIONS[best], ev[start + best]
+
+
+def table_path(num_decks):
+    """A ``num_decks`` paklis tábla fájlja."""
+    if num_decks == DEFAULT_RULES.num_decks:
+        return STRATEGY_TABLE_PATH
+    return os.path.join(os.path.dirname(__file__), f"strategy_table_{num_decks}d.msgpack")
+
+
+def load_table(path=None, num_decks=DEFAULT_RULES.num_decks):
+    """Induláskor egyszer: a fájl beolvasása és a szabályok ellenőrzése."""
+    path = path or table_path(num_decks)
+    if not os.path.exists(path):
+        raise ValueError(
+            f"No strategy table for {num_decks} decks at {path}; generate it with "
+            f"'python -m my_app.backend.strategy --decks {num_decks}'."
+        )
+    with open(path, "rb") as f:
+        table = msgspec.msgpack.decode(f.read(), type=StrategyTable)
+    if table.num_decks != num_decks:
+        raise ValueError(
+            f"Strategy table was built for {table.num_decks} decks, "
+            f"the table uses {num_decks}."
+        )
+    return StrategyLookup(table)
+
+
+# =========================================================================
+# GENERÁLÁS
+# =========================================================================
+def _add(total, soft, value):
+    """Egy lap hozzáadása ``(total, soft)`` állapothoz; ``None`` ha besokallt."""
+    if soft:
+        total += value
+        if total > MAX_TOTAL:
+            total -= 10
+            soft = False
+    elif value == 1 and total + 11 <= MAX_TOTAL:
+        total += 11
+        soft = True
+    else:
+        total += value
+    if total > MAX_TOTAL:
+        return None
+    return total, soft
+
+
+class _Solver:
+    def __init__(self, num_decks, upcard):
+        composition = shoe_composition(num_decks)
+        size = sum(composition)
+        self.draw = [(index + 1, count / size) for index, count in enumerate(composition)]
+
+        dealer = list(composition)
+        dealer[upcard - 1] -= 1
+        self.dealer = dealer_outcomes(upcard, tuple(dealer))
+        self._hit = {}
+        self._split = {}
+
+    def stand(self, total):
+        outcomes = self.dealer
+        ev = outcomes[BUST] - outcomes[BLACKJACK]
+        for final, p in enumerate(outcomes[:BUST], start=17):
+            if total > final:
+                ev += p
+            elif total < final:
+                ev -= p
+        return ev
+
+    def hit(self, total, soft):
+        key = (total, soft)
+        if key not in self._hit:
+            ev = 0.0
+            for value, p in self.draw:
+                after = _add(total, soft, value)
+                if after is None:
+                    ev -= p
+                else:
+                    ev += p * max(self.stand(after[0]), self.hit(*after))
+            self._hit[key] = ev
+        return self._hit[key]
+
+    def double(self, total, soft):
+        ev = 0.0
+        for value, p in self.draw:
+            after = _add(total, soft, value)
+            ev += -p if after is None else p * self.stand(after[0])
+        return 2 * ev
+
+    def best(self, total, soft):
+        return max(self.stand(total), self.hit(total, soft), self.double(total, soft))
+
+    def split(self, value):
+        """Két kéz EV-je a ``value`` pár splitelése után."""
+        start = _add(0, False, value)
+        if value == 1:
+            # Split ász: egy lap, nincs további döntés
+            hand = sum(p * self.stand(_add(*start, card)[0]) for card, p in self.draw)
+        else:
+            hand = self._split_hand(start, value, MAX_HANDS - 2)
+        return 2 * hand
+
+    def _split_hand(self, start, value, resplits):
+        # Közelítés: az újrasplit kerete kezenként, nem közösen számolódik
+        key = (value, resplits)
+        if key not in self._split:
+            ev = 0.0
+            for card, p in self.draw:
+                total, soft = _add(*start, card)
+                best = self.best(total, soft)
+                if card == value and resplits:
+                    best = max(best, 2 * self._split_hand(start, value, resplits - 1))
+                ev += p * best
+            self._split[key] = ev
+        return self._split[key]
+
+    def natural(self):
+        return 1.5 * (1 - self.dealer[BLACKJACK])
+
+
+def build_table(num_decks=DEFAULT_RULES.num_decks):
+    ev = array("f", [NAN]) * TABLE_SIZE
+    natural = array("f", [NAN]) * 11
+
+    for upcard in UPCARDS:
+        solver = _Solver(num_decks, upcard)
+        natural[upcard] = solver.natural()
+
+        states = [(total, False) for total in range(4, MAX_TOTAL + 1)]
+        states += [(total, True) for total in range(12, MAX_TOTAL + 1)]
+        for total, soft in states:
+            start = slot(total, soft, False, upcard)
+            ev[start + STAND] = solver.stand(total)
+            ev[start + HIT] = solver.hit(total, soft)
+            ev[start + DOUBLE] = solver.double(total, soft)
+
+        for value in range(1, 11):
+            total, soft = _add(*_add(0, False, value), value)
+            start = slot(total, soft, True, upcard)
+            ev[start + STAND] = solver.stand(total)
+            ev[start + HIT] = solver.hit(total, soft)
+            ev[start + DOUBLE] = solver.double(total, soft)
+            ev[start + SPLIT] = solver.split(value)
+
+    return StrategyTable(
+        num_decks=num_decks,
+        dealer_stands_on=DEALER_STANDS_ON,
+        ev=ev.tobytes(),
+        natural=natural.tobytes(),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stratégia EV tábla generálása")
+    parser.add_argument("--decks", type=int, default=DEFAULT_RULES.num_decks)
+    parser.add_argument("--output", default=None, help="alapból: table_path(decks)")
+    args = parser.parse_args(argv)
+
+    output = args.output or table_path(args.decks)
+    table = build_table(args.decks)
+    table.dump(output)
+    print(f"{output}: {os.path.getsize(output)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Asztalonkénti szabályok: a cipő mérete és a cut card helye.
+
+A ``penetration`` a cut card helye a cipőben, a teli cipő arányában: az
+előtte lévő lapok oszthatók ki. Ha a hátralévő lapok száma a cut card
+mögötti rész (``reshuffle_below``) alá csökken, a következő kör előtt új
+cipő jön (``Game.needs_reshuffle``). A 2 paklis alapérték a korábbi
+"60 lap alatt újrakeverés" szabályt adja (104 - round(104 * 0.42) = 60).
+
+A szabályok a játékállapottal együtt mentődnek; a ``create_deck`` az
+asztal aktuális szabályait veszi át, így a beállítás változása a
+következő új cipőtől érvényes.
+"""
+
+import msgspec
+
+from my_app.backend.cards import CARDS_IN_DECK
+
+MAX_DECKS = 8
+# A cut card mögött legalább ennyi lap marad: egy kör (5 kéz split-tel)
+# sem fogyaszthatja ki a cipőt
+MIN_RESERVE = CARDS_IN_DECK // 2
+
+
+class TableRules(msgspec.Struct, frozen=True):
+    num_decks: int = 2
+    penetration: float = 0.42
+
+    def __post_init__(self):
+        if not 1 <= self.num_decks <= MAX_DECKS:
+            raise ValueError(f"num_decks must be between 1 and {MAX_DECKS}.")
+        if not 0 < self.penetration < 1:
+            raise ValueError("penetration must be between 0 and 1.")
+        if self.reshuffle_below < MIN_RESERVE:
+            raise ValueError(
+                f"At least {MIN_RESERVE} cards must stay behind the cut card."
+            )
+
+    @property
+    def shoe_size(self):
+        return self.num_decks * CARDS_IN_DECK
+
+    @property
+    def cut_card(self):
+        """A cut card előtti (kiosztható) lapok száma."""
+        return round(self.shoe_size * self.penetration)
+
+    @property
+    def reshuffle_below(self):
+        return self.shoe_size - self.cut_card
+
+    def needs_reshuffle(self, remaining):
+        return remaining < self.reshuffle_below
+
+
+DEFAULT_RULES = TableRules()
+
+
+def load_rules(data):
+    """Mentett (dict) vagy élő szabályok; hiányzó mező = alapértelmezés."""
+    if data is None:
+        return DEFAULT_RULES
+    if isinstance(data, TableRules):
+        return data
+    return msgspec.convert(data, TableRules)
@@ -0,0 +1,77 @@
+"""A /api/actions kötegelt végpont: mentés, részleges hiba, idempotencia."""
+
+
+def stored_key(module, user_id):
+    with module.app.app_context():
+        return module.db.session.get(module.User, user_id).idempotency_key
+
+
+def test_batch_is_saved_with_its_key(load_app, api, shoe_seeds):
+    module = load_app()
+    client = api(module)
+    user_id = client.start()
+    batch = {
+        "actions": [{"action": "bet", "bet": 10}, {"action": "create_deck"}],
+        "idempotency_key": "batch-1",
+    }
+
+    response = client.post("actions", batch)
+    assert response.status_code == 200
+    assert [r["action"] for r in response.get_json()["results"]] == [
+        "bet",
+        "create_deck",
+    ]
+    assert stored_key(module, user_id) == "batch-1"
+
+    retry = client.post("actions", batch).get_json()
+    assert retry["idempotent"] is True
+    assert retry["current_tokens"] == 990
+
+
+def test_partial_failure_keeps_done_steps_but_not_the_key(load_app, api, shoe_seeds):
+    module = load_app()
+    client = api(module)
+    user_id = client.start()
+    batch = {
+        "actions": [
+            {"action": "bet", "bet": 10},
+            {"action": "create_deck"},
+            {"action": "bet", "bet": 0},
+        ],
+        "idempotency_key": "batch-2",
+    }
+
+    response = client.post("actions", batch)
+    body = response.get_json()
+    assert response.status_code == 400
+    assert [r["status"] for r in body["results"]] == ["success", "success", "error"]
+    assert body["current_tokens"] == 990
+    assert stored_key(module, user_id) is None
+
+    # A két sikeres lépés mentve: a tét áll, a cipő az első osztást adja
+    state = client.post("start_game").get_json()["game_state"]
+    assert state["bet"] == 10
+    assert state["player"]["sum"] == 11
+
+    # Ugyanazzal a kulccsal nem ad hamis sikert: a köteg újra lefut
+    retry = client.post("actions", batch).get_json()
+    assert "idempotent" not in retry
+    assert retry["status"] == "error"
+
+
+def test_batch_without_key_stays_dirty_until_evicted(load_app, api, shoe_seeds):
+    module = load_app(GAME_CACHE_SIZE=1)
+    client = api(module)
+    client.start()
+    deal = [{"action": "bet", "bet": 10}, {"action": "create_deck"}]
+    batch = {"actions": [*deal, {"action": "start_game"}]}
+    assert client.post("actions", batch).status_code == 200
+    assert client.post("actions", {"actions": [{"action": "hit"}]}).status_code == 200
+
+    # Egy másik user kilakoltatja a bejegyzést: a hit-nek ki kell íródnia
+    api(module).start()
+
+    response = client.post("recover_game_state")
+    assert response.status_code == 200
+    assert len(response.get_json()["game_state"]["player"]["hand"]) == 3
+    assert client.post("initialize_session", {"client_id": None}).status_code == 200
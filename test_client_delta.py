@@ -0,0 +1,92 @@
+"""Delta válaszok: patch a kliens nézetére, ismeretlen alapnál teljes nézet."""
+
+from my_app.backend.client_delta import ViewCache, delta_view, view_patch
+
+DELTA = {"DELTA_RESPONSES": "True"}
+
+
+def apply_delta(old, game_state):
+    """A kliens oldali összefésülés (lásd client_delta)."""
+    if "delta_base" not in game_state:
+        return game_state
+
+    def merge(view, patch):
+        merged = dict(view)
+        for key, value in patch.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                value = merge(merged[key], value)
+            merged[key] = value
+        return merged
+
+    view = merge(old, game_state["patch"])
+    for *path, key in game_state["unset"]:
+        target = view
+        for step in path:
+            target = target[step]
+        del target[key]
+    return view
+
+
+def test_patch_rebuilds_the_new_view():
+    old = {"bet": 10, "player": {"sum": 12, "hand": ["♥5", "♠7"], "x": 1}, "a": 1}
+    new = {"bet": 10, "player": {"sum": 20, "hand": ["♥5", "♠7", "♦8"]}, "a": 1}
+
+    patch, unset = view_patch(old, new)
+    assert patch == {"player": {"sum": 20, "hand": ["♥5", "♠7", "♦8"]}}
+    assert unset == [["player", "x"]]
+    assert apply_delta(old, delta_view(old, new, 7)) == new
+
+
+def test_full_view_when_everything_changed():
+    assert delta_view({"a": 1}, {"a": 2, "b": 3}, 7) == {"a": 2, "b": 3}
+
+
+def test_view_versions_follow_the_content():
+    view = {"bet": 10, "player": {"sum": 12}}
+    worker, other_worker = ViewCache(2), ViewCache(2)
+
+    version = worker.put("user", view)
+    assert other_worker.put("user", view) == version
+    assert other_worker.put("user", {**view, "bet": 20}) != version
+    assert 0 <= version < 2**53  # JavaScriptben is pontos
+
+    assert worker.get("user", version) == view
+    assert worker.get("user", version + 1) is None
+    worker.put("b", view)
+    worker.put("c", view)
+    assert worker.get("user", version) is None  # kilakoltatva
+
+
+def test_endpoints_send_patches_against_the_client_view(load_app, api, shoe_seeds):
+    module = load_app(**DELTA)
+    client = api(module)
+    client.start()
+
+    response = client.post("bet", {"bet": 10})
+    view = response.get_json()["game_state"]
+    version = response.headers[module.VIEW_VERSION_HEADER]
+
+    response = client.post("create_deck", headers={module.CLIENT_VIEW_HEADER: version})
+    game_state = response.get_json()["game_state"]
+    assert game_state["delta_base"] == int(version)
+    view = apply_delta(view, game_state)
+    assert view["bet"] == 10 and view["target_phase"] == "INIT_GAME"
+
+    # Ismeretlen alap (pl. más worker kilakoltatta): teljes nézet
+    response = client.post(
+        "start_game", headers={module.CLIENT_VIEW_HEADER: str(int(version) ^ 1)}
+    )
+    game_state = response.get_json()["game_state"]
+    assert "delta_base" not in game_state
+    assert game_state["player"]["sum"] == 11
+
+
+def test_error_response_has_no_view_version(load_app, api, shoe_seeds):
+    module = load_app(**DELTA)
+    client = api(module)
+    client.start()
+
+    response = client.post("bet", {"bet": 0})
+    assert response.status_code == 400
+    assert module.VIEW_VERSION_HEADER not in response.headers
+    assert "delta_base" not in response.get_json().get("game_state", {})
@@ -0,0 +1,161 @@
+"""A kérésenkénti DB profiler SQLite engine-en."""
+
+import logging
+
+import pytest
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+    update,
+)
+
+from my_app.backend.db_profiler import STATE_COLUMNS, DBProfiler, _state_write_pattern
+
+metadata = MetaData()
+game_states = Table(
+    "game_states",
+    metadata,
+    Column("user_id", String, primary_key=True),
+    Column("version", Integer),
+    Column("snapshot_version", Integer),
+    Column("state", JSON),
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    return engine
+
+
+def profiler_for(engine, **options):
+    settings = {"budget_ms": 10_000, "max_statements": 100, **options}
+    return DBProfiler(engine, **settings)
+
+
+def test_counts_statements_and_commits_per_request(engine):
+    profiler = profiler_for(engine)
+
+    profiler.start()
+    with engine.connect() as conn:
+        conn.execute(insert(game_states).values(user_id="u", version=1, state={}))
+        conn.execute(select(game_states))
+        conn.commit()
+    profile = profiler.finish("bet")
+
+    assert (profile.endpoint, profile.statements, profile.commits) == ("bet", 2, 1)
+    assert profile.state_written
+    assert profile.db_time >= profile.slowest_time > 0
+    assert profile.slowest
+
+    # start nélkül nem számol, a finish None
+    with engine.connect() as conn:
+        conn.execute(select(game_states))
+    assert profiler.finish("hit") is None
+
+    profiler.start()
+    with engine.connect() as conn:
+        conn.execute(select(game_states))
+    profile = profiler.finish("hit")
+    assert (profile.statements, profile.commits, profile.state_written) == (1, 0, False)
+
+
+def test_version_only_update_is_not_a_state_write(engine):
+    profiler = profiler_for(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(game_states).values(user_id="u", version=1, state={}))
+
+    profiler.start()
+    with engine.begin() as conn:
+        conn.execute(
+            update(game_states)
+            .where(game_states.c.user_id == "u", game_states.c.version == 1)
+            .values(version=2, snapshot_version=2)
+        )
+    assert not profiler.finish("hit").state_written
+
+    profiler.start()
+    with engine.begin() as conn:
+        conn.execute(update(game_states).values(version=3, state={"bet": 10}))
+    assert profiler.finish("stand").state_written
+
+
+@pytest.mark.parametrize(
+    "statement, matches",
+    [
+        ("UPDATE game_states SET version=?, state=? WHERE user_id = ?", True),
+        (
+            "UPDATE game_states SET version=%(version)s, "
+            "state=(game_states.state || %(param_1)s::JSONB) "
+            "WHERE game_states.user_id = %(user_id_1)s",
+            True,
+        ),
+        (
+            "INSERT INTO game_states (user_id, version, snapshot_version, state) "
+            "VALUES (?, ?, ?, ?)",
+            True,
+        ),
+        ("UPDATE my_users SET current_game_state=? WHERE my_users.id = ?", True),
+        (
+            "UPDATE game_states SET version=?, snapshot_version=? "
+            "WHERE game_states.user_id = ? AND game_states.version = ?",
+            False,
+        ),
+        ("UPDATE my_users SET last_activity=? WHERE my_users.id = ?", False),
+        ("INSERT INTO game_events (user_id, version, action) VALUES (?, ?, ?)", False),
+        ("SELECT game_states.state FROM game_states", False),
+    ],
+)
+def test_state_write_pattern(statement, matches):
+    assert bool(_state_write_pattern(STATE_COLUMNS).search(statement)) is matches
+
+
+def test_statement_limit_flags_the_request(engine, caplog):
+    profiler = profiler_for(engine, max_statements=1)
+
+    profiler.start()
+    with engine.connect() as conn:
+        conn.execute(select(game_states))
+    assert not profiler.finish("hit").over_budget
+
+    profiler.start()
+    with engine.connect() as conn:
+        conn.execute(select(game_states))
+        conn.execute(select(game_states))
+    with caplog.at_level(logging.WARNING):
+        assert profiler.finish("recover_game_state").over_budget
+    assert "DB budget exceeded" in caplog.text
+    assert [p["endpoint"] for p in profiler.worst()] == ["recover_game_state"]
+
+
+def test_time_budget_flags_the_request(engine, caplog):
+    profiler = profiler_for(engine, budget_ms=0, sample_rate=0)
+
+    profiler.start()
+    with engine.connect() as conn:
+        conn.execute(select(game_states))
+    with caplog.at_level(logging.WARNING):
+        assert profiler.finish("hit").over_budget
+    assert "DB budget exceeded" not in caplog.text  # sample_rate=0: nem naplóz
+    assert len(profiler.worst()) == 1
+
+
+def test_worst_keeps_the_slowest_requests_in_order(engine):
+    profiler = profiler_for(engine, budget_ms=0, keep=3)
+
+    for endpoint, db_time in (("a", 0.2), ("b", 0.5), ("c", 0.1), ("d", 0.4)):
+        profiler.start().db_time = db_time
+        profiler.finish(endpoint)
+
+    worst = profiler.worst()
+    assert [p["endpoint"] for p in worst] == ["b", "d", "a"]
+    assert [p["db_ms"] for p in worst] == [500.0, 400.0, 200.0]
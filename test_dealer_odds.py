@@ -0,0 +1,89 @@
+"""A dealer végső összegének eloszlása és a cache."""
+
+import pytest
+
+from my_app.backend.cards import CARD_VALUE, parse_hand
+from my_app.backend.dealer_odds import (
+    BLACKJACK,
+    BUST,
+    OUTCOME_LABELS,
+    cards_composition,
+    dealer_outcome_map,
+    dealer_outcomes,
+    shoe_composition,
+)
+from my_app.backend.game import Game
+from my_app.backend.hand import Hand
+from my_app.backend.shoe import Shoe
+
+
+def unseen(upcard, num_decks=2):
+    """Teli cipő a felfordított lap nélkül."""
+    counts = list(shoe_composition(num_decks))
+    counts[upcard - 1] -= 1
+    return tuple(counts)
+
+
+@pytest.mark.parametrize("upcard", range(1, 11))
+def test_each_upcard_distribution_sums_to_one(upcard):
+    odds = dealer_outcomes(upcard, unseen(upcard))
+
+    assert len(odds) == len(OUTCOME_LABELS)
+    assert sum(odds) == pytest.approx(1.0)
+    assert min(odds) >= 0.0
+
+
+def test_six_upcard_busts_about_42_percent():
+    # Nagyon sok pakli: a végtelen pakli közelítése (S17: 0.4232)
+    odds = dealer_outcomes(6, shoe_composition(1000))
+
+    assert odds[BUST] == pytest.approx(0.4232, abs=0.001)
+    assert odds[BLACKJACK] == 0.0
+
+
+def test_only_ten_and_ace_upcards_can_make_blackjack():
+    assert dealer_outcomes(1, unseen(1))[BLACKJACK] == pytest.approx(32 / 103)
+    assert dealer_outcomes(10, unseen(10))[BLACKJACK] == pytest.approx(8 / 103)
+    assert all(dealer_outcomes(up, unseen(up))[BLACKJACK] == 0 for up in range(2, 10))
+
+
+def test_upcard_and_composition_decide_the_outcome():
+    # Csak tízesek maradtak: 6 + 10 = 16, a következő tízes bust
+    only_tens = (0,) * 9 + (5,)
+    assert dealer_outcome_map(6, only_tens)["bust"] == 1.0
+    assert dealer_outcome_map(7, only_tens)["17"] == 1.0
+
+
+def test_repeated_compositions_hit_the_cache():
+    composition = shoe_composition(3)
+    dealer_outcomes(4, composition)
+    before = dealer_outcomes.cache_info()
+
+    dealer_outcome_map(4, list(composition))
+    after = dealer_outcomes.cache_info()
+
+    assert after.hits == before.hits + 1
+    assert after.misses == before.misses
+
+
+def test_cards_composition_counts_by_value():
+    cards = parse_hand(["♥A", "♠K", "♦10", "♣2", "♥Q"])
+
+    assert cards_composition(cards) == (1, 1, 0, 0, 0, 0, 0, 0, 0, 3)
+    assert cards_composition(Shoe(seed=1, num_decks=2).cards) == shoe_composition(2)
+
+
+def test_game_odds_hide_the_hole_card():
+    game = Game()
+    game.create_deck(Shoe(seed=1, num_decks=2))
+    game.shoe.cursor = 10
+    # A rejtett lap (első) tízes, a felfordított ász: a blackjack nem biztos
+    game.dealer_unmasked.hand = Hand(parse_hand(["♠K", "♥A"]))
+
+    odds = game.dealer_odds()
+
+    counts = list(game.shoe.composition())
+    counts[CARD_VALUE[game.dealer_unmasked.hand.cards[0]] - 1] += 1
+    assert odds == dealer_outcome_map(1, counts)
+    assert 0 < odds["blackjack"] < 0.5
+    assert Game().dealer_odds() is None
@@ -0,0 +1,176 @@
+"""A write-behind játék-cache: kiírás, ütközések, eldobás."""
+
+import logging
+import os
+import time
+
+import pytest
+
+from my_app.backend.game import Game
+from my_app.backend.game_cache import GameCache
+
+CACHE = {"GAME_CACHE_SIZE": 10}
+
+
+def game_record(module, user_id):
+    with module.app.app_context():
+        record = module.db.session.get(module.GameStateRecord, user_id)
+        return record.version, record.snapshot_version, record.state
+
+
+def test_discard_returns_dirty_state_for_flush():
+    cache = GameCache(4)
+    game = Game()
+    cache.checkin("idle", 3, game, dirty=True)
+    cache.checkin("clean", 1, Game(), dirty=False)
+
+    assert cache.discard("idle") == [("idle", 3, game.serialize())]
+    assert cache.discard("clean") == []
+    assert cache.discard("missing") == []
+
+
+def test_discard_of_checked_out_entry_drops_its_state():
+    cache = GameCache(4)
+    cache.checkin("user", 2, Game(), dirty=True)
+    assert not cache.is_dirty("user")  # csak a kivett bejegyzés számít
+    cache.checkout("user", 2)
+    assert cache.is_dirty("user")
+
+    assert cache.discard("user") == [("user", 2, None)]
+    assert len(cache) == 0
+
+
+def test_flusher_starts_on_first_checkin():
+    cache = GameCache(4)
+    flushed = []
+    cache.start_flusher(0.01, flushed.extend)
+    game = Game()
+    cache.checkin("user", 1, game, dirty=True)
+
+    deadline = time.monotonic() + 5
+    while not flushed:
+        assert time.monotonic() < deadline, "the flusher did not run"
+        time.sleep(0.01)
+    assert flushed == [("user", 1, game.serialize())]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork() is not available")
+def test_forked_worker_starts_with_an_empty_cache():
+    cache = GameCache(4)
+    cache.checkin("user", 1, Game(), dirty=True)
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write, str(len(cache)).encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+
+    assert os.read(read, 16) == b"0"
+    assert len(cache) == 1
+
+
+def test_dirty_steps_are_flushed(load_app, api, shoe_seeds):
+    module = load_app(**CACHE)
+    client = api(module)
+    user_id = client.start()
+    client.deal()
+    assert client.post("hit").status_code == 200
+
+    version, snapshot_version, _ = game_record(module, user_id)
+    assert snapshot_version < version
+
+    module._flush_from_timer(module.game_cache.take_dirty(0))
+
+    version_after, snapshot_version, state = game_record(module, user_id)
+    assert version_after == snapshot_version == version
+    cached = module.game_cache.checkout(user_id, version)
+    assert state == cached.serialize()
+
+
+def test_stale_snapshot_is_a_conflict_until_flushed(load_app, api, shoe_seeds):
+    worker = load_app(**CACHE)
+    client = api(worker)
+    user_id = client.start()
+    client.deal()
+
+    # Egy második worker ugyanazzal az adatbázissal, a sessiont átvéve
+    other = api(load_app(**CACHE))
+    with other.client.session_transaction() as session:
+        session["user_id"] = user_id
+
+    response = other.post("hit")
+    assert response.status_code == 409
+    assert response.get_json()["game_state_hint"] == "STATE_CONFLICT"
+
+    worker._flush_from_timer(worker.game_cache.take_dirty(0))
+    assert other.post("hit").status_code == 200
+
+
+def test_busy_entry_is_a_conflict_and_kept(load_app, api, shoe_seeds):
+    module = load_app(**CACHE)
+    client = api(module)
+    user_id = client.start()
+    client.deal()
+
+    version, _, _ = game_record(module, user_id)
+    game = module.game_cache.checkout(user_id, version)
+    assert client.post("hit").status_code == 409
+
+    # A másik kérés bejegyzése megmaradt, a visszaadása után mehet tovább
+    assert module.game_cache.checkin(user_id, version, game) == []
+    assert client.post("hit").status_code == 200
+
+
+def test_failed_request_keeps_unsaved_steps_from_before_it(
+    load_app, api, shoe_seeds, monkeypatch, caplog
+):
+    module = load_app(**CACHE)
+    client = api(module)
+    user_id = client.start()
+    dealt = client.deal().get_json()["game_state"]
+    version, _, _ = game_record(module, user_id)
+
+    def broken_hit(self, is_double, has_split):
+        raise RuntimeError("engine failure")
+
+    with monkeypatch.context() as patch, caplog.at_level(logging.WARNING):
+        patch.setattr(Game, "hit", broken_hit)
+        assert client.post("hit").status_code == 500
+    assert "Unsaved game steps" not in caplog.text
+
+    # A kérés előtti (osztás utáni) állapot kiírva, a cache-ből eldobva
+    assert len(module.game_cache) == 0
+    _, snapshot_version, state = game_record(module, user_id)
+    assert snapshot_version == version
+    assert Game.deserialize(state).player.hand.cards
+    response = client.post("hit")
+    assert response.status_code == 200
+    hand = response.get_json()["game_state"]["player"]["hand"]
+    assert hand[:2] == dealt["player"]["hand"]
+
+
+def test_handler_failing_halfway_is_not_cached(
+    load_app, api, shoe_seeds, monkeypatch
+):
+    module = load_app(**CACHE)
+    client = api(module)
+    client.start()
+    client.deal()
+
+    def empty_shoe(self, is_double, has_split):
+        raise ValueError("The shoe is empty.")
+
+    # A double a tétet már megduplázta, amikor a hit elbukik
+    with monkeypatch.context() as patch:
+        patch.setattr(Game, "hit", empty_shoe)
+        response = client.post("double_request")
+    assert response.status_code == 400
+
+    state = client.post("recover_game_state").get_json()
+    assert state["current_tokens"] == 990
+    assert state["game_state"]["player"]["bet"] == 10
+    assert len(state["game_state"]["player"]["hand"]) == 2
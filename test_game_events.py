@@ -0,0 +1,44 @@
+"""Eseménynapló: a pillanatkép + az események újrajátszása = az élő játék."""
+
+from my_app.backend.game import Game
+from my_app.backend.game_events import replay
+
+EVENT_LOG = {"GAME_EVENT_LOG": "True", "GAME_CACHE_SIZE": 10}
+PAIR_OF_EIGHTS = 26  # seed: az első osztás 8-8, split után két kéz
+
+SPLIT_HAND_ACTIONS = {
+    "SPLIT_TURN": "add_to_players_list_by_stand",
+    "SPLIT_ACE_TRANSIT": "add_split_player_to_game",
+}
+
+
+def test_replay_reproduces_the_live_game(load_app, api, shoe_seeds):
+    shoe_seeds.append(PAIR_OF_EIGHTS)
+    module = load_app(**EVENT_LOG)
+    client = api(module)
+    user_id = client.start()
+    client.deal()
+
+    # Split, mindkét kéz megáll; a kör a kifizetés előtt még aktív
+    state = client.post("split_request").get_json()["game_state"]
+    while state["target_phase"] != "SPLIT_FINISH":
+        action = SPLIT_HAND_ACTIONS[state["target_phase"]]
+        state = client.post(action).get_json()["game_state"]
+    assert state["dealer_unmasked"]["sum"] == 0
+
+    with module.app.app_context():
+        record = module.db.session.get(module.GameStateRecord, user_id)
+        tail = module.db.session.execute(
+            module.db.select(module.GameEvent.action, module.GameEvent.data)
+            .where(
+                module.GameEvent.user_id == user_id,
+                module.GameEvent.version > record.snapshot_version,
+            )
+            .order_by(module.GameEvent.version)
+        ).all()
+        assert len(tail) == record.version - record.snapshot_version > 0
+        replayed = replay(Game.deserialize(record.state), tail)
+        live = module.game_cache.checkout(user_id, record.version)
+
+    assert live.unmasked_sum_sent
+    assert replayed.serialize() == live.serialize()
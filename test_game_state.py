@@ -0,0 +1,74 @@
+"""A mentett játékállapot (GameState) kódolása és a régi mentések betöltése."""
+
+from my_app.backend.cards import card_labels
+from my_app.backend.game import Game
+from my_app.backend.game_state import (
+    STATE_VERSION,
+    decode_json,
+    encode_json,
+)
+from my_app.backend.phase_state import PhaseState
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import TableRules
+
+
+def dealt_game(seed=26, rules=TableRules()):
+    game = Game(rules)
+    game.create_deck(Shoe(seed=seed, num_decks=rules.num_decks))
+    game.set_bet(10)
+    game.initialize_new_round()
+    return game
+
+
+def test_round_trip_through_json_keeps_the_state():
+    game = dealt_game(rules=TableRules(penetration=0.5))
+    game.split_hand()
+    assert game.players  # a 26-os seed 8-as párt oszt
+
+    data = decode_json(encode_json(game.to_state()))
+    loaded = Game.deserialize(data)
+
+    assert data["v"] == STATE_VERSION
+    assert loaded.serialize() == game.serialize()
+    assert loaded.rules == game.rules
+    assert loaded.shoe.cards == game.shoe.cards
+    assert loaded.shoe.cursor == game.shoe.cursor
+
+
+def test_serialize_matches_the_struct_encoding():
+    game = dealt_game()
+
+    assert decode_json(encode_json(game.serialize())) == decode_json(
+        encode_json(game.to_state())
+    )
+
+
+def legacy_hand(hand):
+    if hand is None:
+        return None
+    return {**hand, "hand": card_labels(hand["hand"]["cards"])}
+
+
+def test_legacy_document_without_version_tag_loads():
+    game = dealt_game()
+    data = game.serialize()
+    legacy = {
+        **{key: value for key, value in data.items() if key not in ("v", "shoe")},
+        "deck": card_labels(game.shoe.cards),
+        "deck_cursor": game.shoe.cursor,
+        "player": legacy_hand(data["player"]),
+        "dealer_masked": legacy_hand(data["dealer_masked"]),
+        "dealer_unmasked": legacy_hand(data["dealer_unmasked"]),
+        "split_player": legacy_hand(data["split_player"]),
+        "players": [legacy_hand(hand) for hand in data["players"]],
+    }
+    del legacy["rules"], legacy["pre_phase"]
+
+    loaded = Game.deserialize(legacy)
+
+    assert loaded.player == game.player
+    assert loaded.dealer_unmasked == game.dealer_unmasked
+    assert loaded.shoe.draw() == game.shoe.draw()
+    assert loaded.target_phase == game.target_phase
+    assert loaded.pre_phase == PhaseState.NONE
+    assert loaded.serialize()["v"] == STATE_VERSION
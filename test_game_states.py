@@ -0,0 +1,73 @@
+"""A game_states sor: verziózott mentés és compare-and-swap ütközés."""
+
+from sqlalchemy import update
+
+from my_app.backend.game import Game
+
+
+def game_record(module, user_id):
+    with module.app.app_context():
+        record = module.db.session.get(module.GameStateRecord, user_id)
+        return record.version, record.snapshot_version
+
+
+def test_every_step_writes_a_new_version(load_app, api, shoe_seeds):
+    module = load_app()
+    client = api(module)
+    user_id = client.start()
+    version, _ = game_record(module, user_id)
+
+    client.deal()
+    assert game_record(module, user_id) == (version + 3, version + 3)
+
+
+def test_concurrent_write_is_a_retryable_conflict(
+    load_app, api, shoe_seeds, monkeypatch
+):
+    module = load_app()
+    client = api(module)
+    user_id = client.start()
+    client.deal()
+    version, _ = game_record(module, user_id)
+    hit = Game.hit
+
+    def hit_with_concurrent_save(game, *args):
+        # Egy másik kérés (pl. másik fül) ment, mialatt ez a kérés fut
+        with module.db.engine.begin() as connection:
+            connection.execute(
+                update(module.GameStateRecord)
+                .where(module.GameStateRecord.user_id == user_id)
+                .values(version=module.GameStateRecord.version + 1)
+            )
+        return hit(game, *args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Game, "hit", hit_with_concurrent_save)
+        response = client.post("hit")
+
+    assert response.status_code == 409
+    assert response.get_json()["retryable"] is True
+    assert game_record(module, user_id) == (version + 1, version)
+
+
+def test_legacy_state_moves_to_game_states(load_app, api):
+    module = load_app()
+    client = api(module)
+    with module.app.app_context():
+        game = Game()
+        game.set_bet(10)
+        user = module.User(tokens=990, current_game_state=game.serialize())
+        module.db.session.add(user)
+        module.db.session.commit()
+        user_id = user.id
+    with client.client.session_transaction() as session:
+        session["user_id"] = user_id
+
+    response = client.post("initialize_session", {"client_id": None})
+    assert response.status_code == 200
+    # A kör nem aktív: az árva tét visszajár
+    assert response.get_json()["tokens"] == 1000
+    with module.app.app_context():
+        user = module.db.session.get(module.User, user_id)
+        assert user.current_game_state is None
+        assert user.game_state.version == 1
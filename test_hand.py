@@ -0,0 +1,49 @@
+"""A kéz inkrementális összege (hard összeg + ászok száma)."""
+
+import pytest
+
+from my_app.backend.cards import parse_hand
+from my_app.backend.hand import Hand
+
+
+def hand(*cards):
+    return Hand(parse_hand(list(cards)))
+
+
+@pytest.mark.parametrize(
+    "cards, total, soft",
+    [
+        (("♥10", "♠A", "♦A"), 12, False),  # csak egy ász számíthat 11-nek
+        (("♥A", "♠A"), 12, True),
+        (("♥A", "♠A", "♦9"), 21, True),
+        (("♥A", "♠6", "♦10"), 17, False),
+        (("♥5", "♠6"), 11, False),
+        (("♥K", "♠Q", "♦2"), 22, False),
+    ],
+)
+def test_totals(cards, total, soft):
+    result = hand(*cards)
+    assert (result.total, result.is_soft) == (total, soft)
+
+
+def test_adding_cards_one_by_one_matches_a_fresh_hand():
+    built = Hand()
+    for card in parse_hand(["♥10", "♠A", "♦A", "♣5"]):
+        built.add(card)
+
+    assert (built.hard, built.aces, built.total) == (17, 2, 17)
+    assert built == hand("♥10", "♠A", "♦A", "♣5")
+
+
+def test_pop_keeps_the_total():
+    pair = hand("♥A", "♠A")
+    pair.pop()
+
+    assert (pair.hard, pair.aces, pair.total) == (1, 1, 11)
+
+
+def test_natural_and_pair():
+    assert hand("♥A", "♠K").is_natural()
+    assert not hand("♥A", "♠5", "♦5").is_natural()
+    assert hand("♥K", "♠Q").is_pair()  # érték szerint
+    assert not hand("♥K", "♠Q", "♦2").is_pair()
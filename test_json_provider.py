@@ -0,0 +1,154 @@
+"""Golden-file teszt: a msgspec JSON provider bájtra a Flask kimenetét adja.
+
+A ``golden/json_responses.txt`` soronként egy válasz törzse, ahogy a
+Flask ``DefaultJSONProvider`` előállítja. Újragenerálás (csak ha a
+válaszok szándékosan változnak)::
+
+    python test_json_provider.py --update
+"""
+
+import dataclasses
+import decimal
+import os
+import sys
+import uuid
+
+from flask import Flask
+from markupsafe import Markup
+from flask.json.provider import DefaultJSONProvider
+
+from my_app.backend.game import Game
+from my_app.backend.game_serializer import ENDPOINT_SERIALIZERS, GameSerializer
+from my_app.backend.hand_state import HandState
+from my_app.backend.json_provider import MsgspecJSONProvider
+from my_app.backend.phase_state import PhaseState
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import DEFAULT_RULES
+from my_app.backend.winner_state import WinnerState
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden", "json_responses.txt")
+
+
+def _game(seed, split=False, stand=False):
+    while True:
+        game = Game()
+        game.set_bet(10)
+        game.set_bet_list(10)
+        game.shoe = Shoe(seed=seed, num_decks=DEFAULT_RULES.num_decks)
+        game.initialize_new_round()
+        # Split esetén az első párral induló seed
+        if not split or game.player.can_split:
+            break
+        seed += 1
+    if split:
+        game.split_hand()
+        game.add_to_players_list_by_stand()
+    if stand:
+        game.stand(False)
+        game.rewards()
+    return game
+
+
+def cases():
+    """A mért válaszok: minden nézet több állapoton + szélső értékek."""
+    games = [Game(), _game(1), _game(2, split=True), _game(3, stand=True)]
+    serializers = sorted(
+        set(ENDPOINT_SERIALIZERS.values()) | {GameSerializer.serialize_for_client_init},
+        key=lambda f: f.__name__,
+    )
+    for game in games:
+        for serializer in serializers:
+            yield {
+                "status": "success",
+                "message": "Rewards processed and tokens updated.",
+                "current_tokens": 998,
+                "game_state": serializer(game),
+                "game_state_hint": "HIT_RECIEVED",
+            }
+
+    yield {
+        "status": "error",
+        "message": "Érvénytelen tét: ♠A \U0001f600 \u2028 \x00\x1f\x7f \"idézet\" \\ /",
+        "game_state_hint": "CLIENT_ERROR_SPECIFIC",
+    }
+    yield {
+        "phase": PhaseState.SPLIT_TURN,
+        "hand_state": HandState.TWENTY_ONE,
+        "winner": WinnerState.BLACKJACK_PLAYER_WON,
+        "ev": [0.1, -0.0123, 1e16, 1e-05, 9.9e-05, 2.0, -0.0, 1.5e300],
+        "big": 2**63,
+        "nested": {"b": [None, True, False, []], "a": {}, "A": (1, 2)},
+    }
+    yield [1, "two", {"z": 0, "y": [{"x": "♥10"}]}]
+
+
+def render(provider_class):
+    app = Flask("golden")
+    app.json = provider_class(app)
+    with app.app_context():
+        return [app.json.response(case).get_data() for case in cases()]
+
+
+def read_golden():
+    with open(GOLDEN_PATH, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_golden_file_matches_flask_default():
+    assert render(DefaultJSONProvider) == read_golden()
+
+
+def test_msgspec_provider_matches_golden_bytes():
+    assert render(MsgspecJSONProvider) == read_golden()
+
+
+def test_dumps_matches_flask_default():
+    app = Flask("golden")
+    default = DefaultJSONProvider(app)
+    fast = MsgspecJSONProvider(app)
+    for case in cases():
+        assert fast.dumps(case) == default.dumps(case)
+        assert fast.dumps(case, separators=(",", ":")) == default.dumps(
+            case, separators=(",", ":")
+        )
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+    y: int
+
+
+def test_response_forms_and_extra_types_match_flask_default():
+    # A datetime a modul leírása szerint eltér (ISO 8601), itt nem szerepel
+    extra = {
+        "id": uuid.UUID(int=1),
+        "amount": decimal.Decimal("1.50"),
+        "point": _Point(1, 2),
+        "html": Markup("<b>♠A</b>"),
+    }
+    calls = [((extra,), {}), ((1, "two"), {}), ((), {"a": 1}), ((), {})]
+    for debug in (False, True):
+        outputs = []
+        for provider_class in (DefaultJSONProvider, MsgspecJSONProvider):
+            app = Flask("golden")
+            app.debug = debug
+            app.json = provider_class(app)
+            with app.app_context():
+                outputs.append(
+                    [app.json.response(*a, **kw).get_data() for a, kw in calls]
+                )
+        assert outputs[0] == outputs[1]
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, "wb") as f:
+            f.writelines(render(DefaultJSONProvider))
+        print(f"{GOLDEN_PATH} frissítve")
+    else:
+        test_golden_file_matches_flask_default()
+        test_msgspec_provider_matches_golden_bytes()
+        test_dumps_matches_flask_default()
+        print("✅ OK")
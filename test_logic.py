@@ -1,7 +1,10 @@
+from my_app.backend.cards import parse_hand
 from my_app.backend.game import Game
+from my_app.backend.hand import Hand, PlayerHand
 from my_app.backend.phase_state import PhaseState
 from my_app.backend.winner_state import WinnerState
 from my_app.backend.game_serializer import GameSerializer
+from my_app.backend.shoe import Shoe
 
 
 def run_diagnostics():
@@ -22,7 +25,7 @@ def run_diagnostics():
 
     for desc, deck_size, active, is_init, expected_pre in client_bet_tests:
         game.clear_up()
-        game.deck = ["X"] * deck_size
+        game.shoe = Shoe([0] * deck_size)
         game.is_round_active = active
         game.is_session_init = is_init
 
@@ -77,11 +80,11 @@ def run_diagnostics():
     for desc, p_hand, d_hand, exp_phase, exp_nat21_visible in bj_test_cases:
         # Manuálisan beállítjuk a környezetet, mintha az initialize_new_round futna
         game.clear_up()
-        game.deck = ["X"] * 10  # Legyen elég lap a pop-hoz, de nem használjuk őket
+        game.shoe = Shoe([0] * 10)  # Legyen elég lap a pop-hoz, de nem használjuk őket
 
         # Szimuláljuk az initialize_new_round logikáját
-        player_hand = p_hand
-        dealer_hand = d_hand
+        player_hand = Hand(parse_hand(p_hand))
+        dealer_hand = Hand(parse_hand(d_hand))
 
         # Lefuttatjuk a belső számításokat
         game.natural_21 = game.init_natural_21_state(player_hand, dealer_hand)
@@ -118,9 +121,9 @@ def run_diagnostics():
 def test_aces_split_flow(game):
     print("\n=== ACES SPLIT & TRANSIT DIAGNOSZTIKA ===")
     game.clear_up()
-    game.deck = ["♦K", "♣Q", "♠10"]
+    game.shoe = Shoe(parse_hand(["♦K", "♣Q", "♠10"]))
     # Alapállapot
-    game.player = {"id": "H-001", "hand": ["♥A", "♠A"], "sum": 12, "stated": False}
+    game.player = PlayerHand(id="H-001", hand=Hand(parse_hand(["♥A", "♠A"])), sum=12)
     game.aces = True
 
     print(f"[Fázis 1: Split indítása]")
@@ -130,7 +133,7 @@ def test_aces_split_flow(game):
     game.players_index = {"H-001": False, "H-002": False}
     # Ha a split_hand nem tette volna be a listába, manuálisan pótoljuk
     if "H-002" not in game.players:
-        game.players["H-002"] = game.deal_card(["♣A"], False, "H-002")
+        game.players["H-002"] = game.deal_card(Hand(parse_hand(["♣A"])), False, "H-002")
 
     print("\n[Fázis 2: H-001 archiválása]")
     game.add_to_players_list_by_stand()
@@ -144,28 +147,28 @@ def test_aces_split_flow(game):
     game.split_player = None
     game.add_split_player_to_game()
 
-    print(f"  - Aktuális ID: {game.player['id']} (Várt: H-002)")
+    print(f"  - Aktuális ID: {game.player.id} (Várt: H-002)")
     print(f"  - Req: {game.get_split_req()} (Várt: 0)")
 
     # Lezárjuk a folyamatot
     game.players_index["H-002"] = True
     game.add_to_players_list_by_stand()
 
-    final_ok = game.player['id'] == "H-002" and game.target_phase == PhaseState.SPLIT_FINISH
+    final_ok = game.player.id == "H-002" and game.target_phase == PhaseState.SPLIT_FINISH
     print(f"\n[Eredmény] {'✅ OK' if final_ok else '❌ HIBA'}")
 
 def test_strict_mode_protection(game):
     print("\n=== REACT STRICT MODE (DUP-CALL) VÉDELEM TESZT ===")
     game.clear_up()
-    game.deck = ["♦9", "♣Q", "♠10"]
-    game.player = {"id": "H-001", "hand": ["♥A", "♠A"], "sum": 12, "stated": False}
+    game.shoe = Shoe(parse_hand(["♦9", "♣Q", "♠10"]))
+    game.player = PlayerHand(id="H-001", hand=Hand(parse_hand(["♥A", "♠A"])), sum=12)
     game.aces = True
 
     # Előkészítjük a terepet (Split + H-001 lezárás)
     game.split_hand()
     game.players_index = {"H-001": True, "H-002": False}
     if "H-002" not in game.players:
-        game.players["H-002"] = game.deal_card(["♣A"], False, "H-002")
+        game.players["H-002"] = game.deal_card(Hand(parse_hand(["♣A"])), False, "H-002")
 
     game.split_player = None # Tiszta lap a teszt elején
 
@@ -173,13 +176,13 @@ def test_strict_mode_protection(game):
     print("[Hívás 1: H-002 beemelése]")
     game.add_split_player_to_game()
     req1 = game.get_split_req()
-    id1 = game.player["id"]
+    id1 = game.player.id
 
     print("[Hívás 2: React Strict Mode ismétli a hívást]")
     # Itt a kódod elvileg a cache-ből (split_player) dolgozik
     game.add_split_player_to_game()
     req2 = game.get_split_req()
-    id2 = game.player["id"]
+    id2 = game.player.id
 
     # Ellenőrzés: Az ID H-002, és a Req megállt 0-nál, nem ment mínuszba
     is_protected = (id1 == id2 == "H-002") and (req1 == req2 == 0)
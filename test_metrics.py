@@ -0,0 +1,31 @@
+"""A /api/metrics végpont: csak bekapcsolva és tokennel olvasható."""
+
+import pytest
+
+METRICS = {"METRICS_ENABLED": "True", "METRICS_TOKEN": "scrape-secret"}
+
+
+def test_metrics_are_off_by_default(load_app):
+    module = load_app()
+    assert module.app.test_client().get("/api/metrics").status_code == 404
+
+
+def test_metrics_cannot_be_enabled_without_a_token(load_app):
+    with pytest.raises(RuntimeError, match="METRICS_TOKEN"):
+        load_app(METRICS_ENABLED="True")
+
+
+def test_metrics_need_the_bearer_token(load_app, api):
+    module = load_app(**METRICS)
+    client = api(module)
+    client.start()
+
+    assert client.client.get("/api/metrics").status_code == 401
+    response = client.client.get("/api/metrics", headers={"Authorization": "Bearer x"})
+    assert response.status_code == 401
+
+    response = client.client.get(
+        "/api/metrics", headers={"Authorization": "Bearer scrape-secret"}
+    )
+    assert response.status_code == 200
+    assert 'endpoint="initialize_session"' in response.get_data(as_text=True)
@@ -0,0 +1,70 @@
+"""A cipő: fix lapsorrend és olvasó kurzor."""
+
+import pytest
+
+from my_app.backend.cards import CARDS_IN_DECK, SINGLE_DECK, parse_hand
+from my_app.backend.shoe import Shoe
+
+
+def test_draw_moves_the_cursor_only():
+    cards = parse_hand(["♥A", "♠K", "♦5"])
+    shoe = Shoe(cards)
+
+    assert shoe.peek(2) == cards[:2]
+    assert [shoe.draw(), shoe.draw()] == cards[:2]
+    assert (shoe.cursor, shoe.remaining(), len(shoe)) == (2, 1, 1)
+    assert list(shoe.cards) == cards
+
+
+def test_empty_shoe_raises():
+    shoe = Shoe(parse_hand(["♥A"]))
+    shoe.draw()
+
+    assert not shoe
+    with pytest.raises(ValueError, match="empty"):
+        shoe.draw()
+
+
+def test_penetration_and_composition():
+    shoe = Shoe(parse_hand(["♥A", "♠K", "♦K", "♣5"]))
+    shoe.draw()
+
+    assert shoe.penetration() == 0.25
+    # Értékenként, ász = 1 ... 10
+    assert shoe.composition() == (0, 0, 0, 0, 1, 0, 0, 0, 0, 2)
+
+
+def test_shuffled_shoe_has_every_card():
+    shoe = Shoe.shuffled(2)
+
+    assert shoe.remaining() == 2 * CARDS_IN_DECK
+    assert sorted(shoe.cards) == sorted(SINGLE_DECK * 2)
+
+
+def test_seeded_shoe_is_saved_as_seed_and_cursor():
+    shoe = Shoe(seed=42, num_decks=2)
+    drawn = [shoe.draw() for _ in range(5)]
+    state = shoe.to_state()
+
+    assert (state.seed, state.cursor, state.cards) == (42, 5, None)
+    restored = Shoe.from_state(state)
+    assert restored.cards == shoe.cards
+    assert restored.draw() == shoe.draw()
+    assert Shoe(seed=42, num_decks=2).peek(5) == drawn
+
+
+def test_missing_shuffle_version_means_the_first_shuffler():
+    # Hiányzó verziómező: az első keverő (a régi mentések ezt kapják)
+    state = {"cursor": 3, "seed": 7, "num_decks": 1}
+    shoe = Shoe.from_state(state)
+
+    assert shoe.version == 1
+    assert shoe.cards == Shoe(seed=7, num_decks=1, version=1).cards
+
+
+def test_card_list_state_round_trip():
+    shoe = Shoe(parse_hand(["♥A", "♠K", "♦5"]), cursor=1)
+    restored = Shoe.from_state(shoe.to_state())
+
+    assert (list(restored.cards), restored.cursor) == (list(shoe.cards), 1)
+
@@ -0,0 +1,74 @@
+"""Az előre kevert cipők készlete."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from my_app.backend.shoe_pool import ShoePool
+
+
+def wait_for_refill(pool, timeout=5):
+    """Az első ``take`` után: a szál legalább ``depth - 1`` cipőt készít."""
+    deadline = time.monotonic() + timeout
+    while len(pool) < pool.depth - 1:
+        assert time.monotonic() < deadline, "the filler did not run"
+        time.sleep(0.01)
+
+
+def test_filler_starts_on_first_take():
+    pool = ShoePool(2, depth=4, keep=2)
+    assert len(pool) == 0
+
+    first = pool.take()
+    wait_for_refill(pool)
+    issued = [pool.take() for _ in range(3)]
+
+    assert pool.hits + pool.misses == 4 and pool.hits >= 3
+    assert first.remaining() == 104
+    # A kiadott cipők közül az utolsó ``keep`` lapsorrendje marad meg
+    assert pool.lookup(issued[0].seed, issued[0].version, 2) is None
+    assert pool.lookup(issued[2].seed, issued[2].version, 2) == issued[2].cards
+    assert pool.lookup(issued[2].seed, issued[2].version, 6) is None
+
+
+def test_counters_are_exact_under_concurrent_takes():
+    pool = ShoePool(1, depth=8)
+    takes = 50
+
+    def worker():
+        for _ in range(takes):
+            pool.take()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.hits + pool.misses == 8 * takes
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork() is not available")
+def test_forked_worker_starts_with_its_own_empty_pool():
+    pool = ShoePool(2, depth=4)
+    pool.take()
+    wait_for_refill(pool)
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.write(write, f"{len(pool)} {pool.hits + pool.misses}".encode())
+            pool.take()
+            wait_for_refill(pool)  # a gyermekben saját töltő szál indult
+            code = 0
+        finally:
+            os._exit(code)
+    os.close(write)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.read(read, 64) == b"0 0"
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,70 @@
+"""A vektorizált szimuláció és a több processzes futtatás."""
+
+import numpy as np
+
+from my_app.backend.simulation import (
+    HIT,
+    OUTCOMES,
+    SimulationReport,
+    Strategy,
+    simulate,
+)
+from my_app.backend.simulation_farm import run_farm
+from my_app.backend.table_rules import TableRules
+
+
+def test_same_seed_gives_the_same_report():
+    first = simulate(5_000, seed=7, lanes=1_000)
+
+    assert first == simulate(5_000, seed=7, lanes=1_000)
+    assert first != simulate(5_000, seed=8, lanes=1_000)
+
+
+def test_report_counts_are_consistent():
+    report = simulate(5_003, seed=1, lanes=1_000)  # részleges utolsó kör
+
+    assert report.rounds == 5_003
+    assert sum(report.net_histogram.values()) == report.rounds
+    assert sum(net * n for net, n in report.net_histogram.items()) == report.net
+    assert set(report.outcomes) == set(OUTCOMES)
+    assert sum(report.outcomes.values()) == report.hands >= report.rounds
+    assert report.wagered >= report.rounds * report.bet
+
+
+def test_basic_strategy_edge_is_small():
+    report = simulate(200_000, seed=1, lanes=20_000)
+
+    assert abs(report.house_edge) < 4 * report.std_error + 0.01
+
+
+def test_always_hit_loses_more_than_basic():
+    basic = Strategy.basic()
+    reckless = Strategy(
+        np.full_like(basic.hard, HIT), np.full_like(basic.soft, HIT), basic.pair
+    )
+    report = simulate(50_000, seed=3, lanes=10_000, strategy=reckless)
+
+    assert report.house_edge > 0.2
+    assert report.outcomes["push"] < report.hands * 0.02
+
+
+def test_merge_adds_up_the_parts():
+    first = simulate(3_000, seed=1, lanes=1_000)
+    second = simulate(2_000, seed=2, lanes=1_000, rules=TableRules(num_decks=6))
+    merged = first.merge(second)
+
+    assert merged.rounds == 5_000
+    assert merged.net == first.net + second.net
+    assert merged.net_sq == first.net_sq + second.net_sq
+    assert merged.outcomes["win"] == first.outcomes["win"] + second.outcomes["win"]
+    assert list(merged.net_histogram) == sorted(merged.net_histogram)
+    assert SimulationReport(bet=10).merge(first) == first
+
+
+def test_farm_result_does_not_depend_on_the_worker_count():
+    options = dict(rounds=6_000, seed=42, chunk=2_500, lanes=1_000)
+
+    single = run_farm(workers=1, **options)
+
+    assert single.rounds == 6_000
+    assert run_farm(workers=2, **options) == single
@@ -0,0 +1,98 @@
+"""Részleges állapotírás: a felső szintű patch és a teljes írásra visszaesés."""
+
+from sqlalchemy.dialects import postgresql
+
+from my_app.backend.game import Game
+from my_app.backend.shoe import Shoe
+from my_app.backend.state_diff import state_patch
+
+
+def dealt_state():
+    game = Game()
+    game.create_deck(Shoe(seed=0, num_decks=2))
+    game.set_bet(10)
+    game.initialize_new_round()
+    return game, game.serialize()
+
+
+def test_unchanged_state_needs_no_write():
+    _, state = dealt_state()
+
+    assert state_patch(state, dict(state)) == {}
+
+
+def test_nested_change_sends_the_whole_top_level_key():
+    game, before = dealt_state()
+    game.hit(False, False)
+    after = game.serialize()
+
+    patch = state_patch(before, after)
+
+    assert set(patch) <= {"player", "shoe", "target_phase", "pre_phase", "aces"}
+    assert {"player", "shoe"} <= set(patch)
+    assert patch["player"] == after["player"]  # nem mélyebb szintű diff
+    assert {**before, **patch} == after
+
+
+def test_removed_or_missing_keys_fall_back_to_a_full_write():
+    _, state = dealt_state()
+    legacy = {**state, "deck": []}  # a || nem törölné a régi kulcsot
+
+    assert state_patch(legacy, state) is None
+    assert state_patch({}, state) is None
+    assert state_patch(None, state) is None
+
+
+def test_large_patch_falls_back_to_a_full_write():
+    _, state = dealt_state()
+    fresh = Game().serialize()
+
+    assert state_patch(state, fresh) is None
+    small = {**state, "bet": 20}
+    assert state_patch(state, small) == {"bet": 20}
+    assert state_patch(state, small, max_ratio=0.0) is None
+
+
+def stored_state(module, user_id):
+    with module.app.app_context():
+        return module.db.session.get(module.GameStateRecord, user_id).state
+
+
+def test_patched_write_stores_the_same_document(load_app, api, shoe_seeds):
+    module = load_app()
+    client = api(module)
+    user_id = client.start()
+    documents = [stored_state(module, user_id)]
+    for action, body in (
+        ("bet", {"bet": 10}),
+        ("create_deck", None),
+        ("start_game", None),
+        ("hit", None),
+        ("stand_and_rewards", None),
+    ):
+        assert client.post(action, body).status_code == 200
+        documents.append(stored_state(module, user_id))
+
+    # A || a felső szintű kulcsokat cseréli: ugyanaz, mint a teljes írás
+    patches = [state_patch(old, new) for old, new in zip(documents, documents[1:])]
+    for old, new, patch in zip(documents, documents[1:], patches):
+        if patch is not None:
+            assert {**old, **patch} == new
+    assert any(patches)
+
+
+def test_partial_write_uses_the_jsonb_concat(load_app, monkeypatch):
+    module = load_app()
+    _, state = dealt_state()
+    record = module.GameStateRecord(state=state)
+
+    assert module.state_values(record, state) == {"state": state}
+
+    monkeypatch.setattr(module, "JSONB_PATCH", True)
+    assert module.state_values(record, dict(state)) == {}
+    values = module.state_values(record, {**state, "bet": 20})
+    sql = str(values["state"].compile(dialect=postgresql.dialect()))
+    assert "||" in sql
+    assert module.state_values(record, Game().serialize()) == {
+        "state": Game().serialize()
+    }
@@ -0,0 +1,119 @@
+"""Állapot-tokenek: titkosítás, lejárat, és a régi tokenek elutasítása."""
+
+import pytest
+
+from my_app.backend.game import Game
+from my_app.backend.state_token import StateToken, StateTokenCodec
+
+TOKENS = {"GAME_STATE_TOKENS": "True"}
+
+
+def make_token(version=1):
+    return StateToken(
+        user_id="user",
+        version=version,
+        tokens=990,
+        idempotency_key=None,
+        state=Game().to_state(),
+    )
+
+
+def test_codec_round_trip_hides_the_state():
+    codec = StateTokenCodec("secret")
+    raw = codec.dumps(make_token())
+
+    assert codec.loads(raw) == make_token()
+    assert "user" not in raw
+    assert codec.dumps(make_token()) != raw  # tokenenként új nonce
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda raw: raw[:-2] + ("AA" if raw[-2:] != "AA" else "BB"),
+        lambda raw: raw[:20],
+        lambda raw: "not base64!",
+        lambda raw: "",
+    ],
+)
+def test_codec_rejects_tampered_tokens(mangle):
+    codec = StateTokenCodec("secret")
+    assert codec.loads(mangle(codec.dumps(make_token()))) is None
+
+
+def test_codec_rejects_other_keys_and_expired_tokens():
+    now = [1_000_000]
+    codec = StateTokenCodec("secret", max_age=60, clock=lambda: now[0])
+    raw = codec.dumps(make_token())
+
+    assert StateTokenCodec("other").loads(raw) is None
+    now[0] += 60
+    assert codec.loads(raw) is not None
+    now[0] += 1
+    assert codec.loads(raw) is None
+
+
+def test_every_step_retires_the_previous_token(load_app, api, shoe_seeds):
+    client = api(load_app(**TOKENS))
+    client.start()
+    client.deal()
+    header = client.module.STATE_TOKEN_HEADER
+    before_hit = client.headers[header]
+
+    assert client.post("hit").status_code == 200
+    # Egy bust visszavonása: a hit előtti tokennel folytatva
+    response = client.post("stand_and_rewards", headers={header: before_hit})
+    assert response.status_code == 409
+    assert response.get_json()["game_state_hint"] == "STATE_CONFLICT"
+    response = client.post("hit", headers={header: before_hit})
+    assert response.status_code == 409
+
+    assert client.post("stand_and_rewards").status_code == 200
+
+
+def test_old_token_cannot_reshuffle_the_shoe(load_app, api, shoe_seeds):
+    client = api(load_app(**TOKENS))
+    client.start()
+    assert client.post("bet", {"bet": 10}).status_code == 200
+    header = client.module.STATE_TOKEN_HEADER
+    after_bet = client.headers[header]
+    assert client.post("create_deck").status_code == 200
+    assert client.post("start_game").status_code == 200
+
+    response = client.post("create_deck", headers={header: after_bet})
+    assert response.status_code == 409
+
+
+def test_client_that_lost_its_token_continues_from_the_database(
+    load_app, api, shoe_seeds
+):
+    client = api(load_app(**TOKENS))
+    client.start()
+    dealt = client.deal().get_json()["game_state"]
+    assert client.post("hit").status_code == 200
+
+    # Oldalfrissítés: a kliens fejléc nélkül jön vissza
+    client.headers.clear()
+    response = client.post("initialize_session", {"client_id": None})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["tokens"] == 990  # a folyó kör tétje nem jár vissza
+    assert body["game_state"]["target_phase"] == "RECOVERY_DECISION"
+
+    state = client.post("recover_game_state").get_json()["game_state"]
+    assert state["player"]["hand"][:2] == dealt["player"]["hand"]
+    assert len(state["player"]["hand"]) == 3
+    assert client.post("stand_and_rewards").status_code == 200
+
+
+def test_stale_token_conflict_is_not_retryable(load_app, api, shoe_seeds):
+    client = api(load_app(**TOKENS))
+    client.start()
+    client.deal()
+    header = client.module.STATE_TOKEN_HEADER
+    stale = client.headers[header]
+    assert client.post("hit").status_code == 200
+
+    response = client.post("hit", headers={header: stale})
+    assert response.status_code == 409
+    assert response.get_json()["retryable"] is False
@@ -0,0 +1,66 @@
+"""Az EV tábla lekérdezése és betöltése."""
+
+import pytest
+
+from my_app.backend.cards import parse_hand
+from my_app.backend.hand import Hand
+from my_app.backend.strategy import STAND, STRATEGY_TABLE_PATH, load_table, slot
+
+TABLE = load_table()
+
+
+def hand(*cards):
+    return Hand(parse_hand(list(cards)))
+
+
+def test_natural_has_no_decision():
+    assert TABLE.hint(hand("♥A", "♠K"), 10) == (None, TABLE.natural[10])
+
+
+def test_two_card_21_after_split_is_not_a_natural():
+    action, ev = TABLE.hint(hand("♥A", "♠K"), 10, split=True)
+
+    assert action == "stand"
+    assert ev == TABLE.ev[slot(21, True, False, 10) + STAND]
+    assert ev < TABLE.natural[10]
+
+
+def test_double_and_split_only_when_allowed():
+    eights = hand("♣8", "♥8")
+    assert TABLE.hint(eights, 6)[0] == "split"
+    assert TABLE.hint(eights, 6, can_split=False)[0] != "split"
+    assert TABLE.hint(hand("♣6", "♥5"), 6)[0] == "double"
+    assert TABLE.hint(hand("♣6", "♥5"), 6, can_double=False)[0] == "hit"
+
+
+def test_missing_table_names_the_generator(tmp_path):
+    with pytest.raises(ValueError, match="--decks 4"):
+        load_table(num_decks=4)
+    with pytest.raises(ValueError, match="No strategy table"):
+        load_table(str(tmp_path / "missing.msgpack"))
+
+
+def test_table_for_other_decks_is_rejected():
+    with pytest.raises(ValueError, match="built for 2 decks"):
+        load_table(STRATEGY_TABLE_PATH, num_decks=6)
+
+
+def test_hint_endpoint(load_app, api, shoe_seeds):
+    client = api(load_app())
+    client.start()
+    client.deal()
+
+    response = client.post("strategy_hint")
+    assert response.status_code == 200
+    assert response.get_json()["action"] == "double"  # 11 a 0-s seeddel
+
+
+def test_deck_count_without_table_only_disables_hints(load_app, api, shoe_seeds):
+    client = api(load_app(TABLE_DECKS=4))
+    client.start()
+    assert client.deal().status_code == 200
+
+    response = client.post("strategy_hint")
+    assert response.status_code == 501
+    assert response.get_json()["game_state_hint"] == "STRATEGY_HINT_UNAVAILABLE"
+    assert client.post("hit").status_code == 200
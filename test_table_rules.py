@@ -0,0 +1,79 @@
+"""Asztalszabályok: cipőméret, cut card és az újrakeverés döntése."""
+
+import msgspec
+import pytest
+
+from my_app.backend.game import Game
+from my_app.backend.shoe import Shoe
+from my_app.backend.table_rules import DEFAULT_RULES, TableRules, load_rules
+
+
+@pytest.mark.parametrize(
+    "num_decks, penetration",
+    [(0, 0.42), (9, 0.42), (2, 0.0), (2, 1.0), (1, 0.75)],
+)
+def test_invalid_rules_are_rejected(num_decks, penetration):
+    with pytest.raises(ValueError):
+        TableRules(num_decks=num_decks, penetration=penetration)
+
+
+def test_default_rules_keep_the_old_60_card_threshold():
+    assert (DEFAULT_RULES.shoe_size, DEFAULT_RULES.cut_card) == (104, 44)
+    assert DEFAULT_RULES.reshuffle_below == 60
+    assert not DEFAULT_RULES.needs_reshuffle(60)
+    assert DEFAULT_RULES.needs_reshuffle(59)
+
+
+def test_six_deck_shoe():
+    rules = TableRules(num_decks=6, penetration=0.75)
+
+    assert (rules.shoe_size, rules.cut_card, rules.reshuffle_below) == (312, 234, 78)
+
+
+def test_load_rules():
+    assert load_rules(None) is DEFAULT_RULES
+    rules = TableRules(num_decks=6)
+    assert load_rules(rules) is rules
+    assert load_rules({"num_decks": 6}) == rules
+    with pytest.raises(msgspec.ValidationError):
+        load_rules({"num_decks": 12})
+
+
+def game_with_remaining(remaining, rules=DEFAULT_RULES):
+    game = Game(rules)
+    game.create_deck(Shoe(seed=1, num_decks=rules.num_decks))
+    game.shoe.cursor = rules.shoe_size - remaining
+    game.is_round_active = True
+    return game
+
+
+def test_game_reshuffles_after_the_cut_card():
+    rules = TableRules(num_decks=6, penetration=0.75)
+
+    assert game_with_remaining(312, rules).needs_reshuffle()  # még teli cipő
+    assert not game_with_remaining(78, rules).needs_reshuffle()
+    assert game_with_remaining(77, rules).needs_reshuffle()
+
+
+def test_create_deck_takes_the_table_rules():
+    game = Game()
+    game.create_deck(rules=TableRules(num_decks=6))
+
+    assert game.rules.num_decks == 6
+    assert len(game.shoe.cards) == game.deck_len_init == 312
+
+    game.restart_game()
+    assert game.rules.num_decks == 6
+
+
+def test_app_uses_the_configured_table(load_app, api, shoe_seeds):
+    module = load_app(TABLE_DECKS=6, TABLE_PENETRATION=0.75)
+    client = api(module)
+
+    init = client.post("initialize_session", {"client_id": None}).get_json()
+    assert init["total_initial_cards"] == 312
+    bet = client.post("bet", {"bet": 10}).get_json()["game_state"]
+    assert bet["pre_phase"] == "SHUFFLING"
+
+    assert client.post("create_deck").get_json()["game_state"]["deck_len"] == 312
+    assert client.post("start_game").get_json()["game_state"]["deck_len"] == 308